@@ -1,10 +1,12 @@
 """Data Transfer Objects for recommendations."""
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
-class GenerateRecommendationsRequest(BaseModel):
-    """Request for generating recommendations."""
+class RecommendationRequestItem(BaseModel):
+    """Per-user parameters for generating recommendations."""
 
     user_id: str = Field(..., description="User ID to generate recommendations for")
     limit: int = Field(50, ge=1, le=100, description="Maximum number of recommendations")
@@ -13,6 +15,12 @@ class GenerateRecommendationsRequest(BaseModel):
     )
 
 
+class GenerateRecommendationsRequest(RecommendationRequestItem):
+    """Request for generating recommendations."""
+
+    engine: str | None = Field(None, description="Recommendation engine (configured default)")
+
+
 class RecommendationDTO(BaseModel):
     """Recommendation data transfer object."""
 
@@ -27,4 +35,24 @@ class GenerateRecommendationsResponse(BaseModel):
     user_id: str
     recommendations: list[RecommendationDTO]
     count: int
-    model_version: str = "collaborative_filtering_v1"
+    # Engine that answered, and the generation and training time of its model;
+    # all None for precomputed recommendations, whose model is not recorded
+    model_version: str | None = "unknown"
+    model_generation: str | None = None
+    trained_at: datetime | None = None
+
+
+class GenerateBatchRecommendationsRequest(BaseModel):
+    """Request for generating recommendations for many users at once."""
+
+    requests: list[RecommendationRequestItem] = Field(
+        ..., min_length=1, max_length=500, description="Per-user recommendation requests"
+    )
+    engine: str | None = Field(None, description="Recommendation engine (configured default)")
+
+
+class GenerateBatchRecommendationsResponse(BaseModel):
+    """Response containing recommendations for every requested user."""
+
+    results: list[GenerateRecommendationsResponse]
+    count: int
@@ -0,0 +1,86 @@
+"""Generate recommendations for many users use case."""
+
+from app.application.dto.recommendation_dto import (
+    GenerateBatchRecommendationsRequest,
+    GenerateBatchRecommendationsResponse,
+    GenerateRecommendationsResponse,
+    RecommendationDTO,
+)
+from app.domain.entities.model_generation import ModelGeneration
+from app.domain.entities.recommendation import RecommendationQuery
+from app.domain.services.recommender_interface import RecommenderInterface
+
+
+class GenerateBatchRecommendationsUseCase:
+    """Use case for generating recommendations for several users in one call.
+
+    Responses name the model ``generation`` the recommenders belong to, if given.
+    """
+
+    def __init__(
+        self,
+        recommender: RecommenderInterface,
+        cold_start_recommender: RecommenderInterface | None = None,
+        generation: ModelGeneration | None = None,
+    ):
+        self.recommender = recommender
+        self.cold_start_recommender = cold_start_recommender
+        self.generation = generation
+
+    async def execute(
+        self, request: GenerateBatchRecommendationsRequest
+    ) -> GenerateBatchRecommendationsResponse:
+        """Execute the use case to generate recommendations for every requested user.
+
+        Args:
+            request: Request containing per-user parameters
+
+        Returns:
+            Response containing one recommendation list per user, in request order
+        """
+        queries = [
+            RecommendationQuery(
+                user_id=item.user_id,
+                limit=item.limit,
+                exclude_post_ids=item.exclude_post_ids,
+            )
+            for item in request.requests
+        ]
+
+        # Generate all recommendations in a single model call
+        batches = await self.recommender.generate_batch_recommendations(queries)
+        model_versions = [self.recommender.model_version] * len(queries)
+
+        # Answer users without recommendations in one cold-start call
+        empty = [position for position, batch in enumerate(batches) if not batch]
+        if empty and self.cold_start_recommender is not None:
+            fallback = await self.cold_start_recommender.generate_batch_recommendations(
+                [queries[position] for position in empty]
+            )
+            for position, recommendations in zip(empty, fallback, strict=True):
+                batches[position] = recommendations
+                model_versions[position] = self.cold_start_recommender.model_version
+
+        # Convert to DTOs
+        results = [
+            GenerateRecommendationsResponse(
+                user_id=query.user_id,
+                recommendations=[
+                    RecommendationDTO(
+                        post_id=rec.post_id,
+                        score=rec.score,
+                        reason=rec.reason,
+                    )
+                    for rec in recommendations
+                ],
+                count=len(recommendations),
+                model_version=model_version,
+                model_generation=self.generation.id if self.generation else None,
+                trained_at=self.generation.trained_at if self.generation else None,
+            )
+            for query, recommendations, model_version in zip(
+                queries, batches, model_versions, strict=True
+            )
+        ]
+
+        return GenerateBatchRecommendationsResponse(results=results, count=len(results))
@@ -1,26 +1,37 @@
 """Generate recommendations use case."""
 
-from typing import TYPE_CHECKING
-
 from app.application.dto.recommendation_dto import (
     GenerateRecommendationsRequest,
     GenerateRecommendationsResponse,
     RecommendationDTO,
 )
-from app.domain.repositories.interaction_repository import InteractionRepository
-from app.infrastructure.ml.collaborative_filter import CollaborativeFilterRecommender
-
-
-if TYPE_CHECKING:
-    from app.domain.services.recommender_interface import RecommenderInterface
+from app.domain.entities.model_generation import ModelGeneration
+from app.domain.entities.recommendation import Recommendation
+from app.domain.repositories.recommendation_repository import RecommendationRepository
+from app.domain.services.recommender_interface import RecommenderInterface
 
 
 class GenerateRecommendationsUseCase:
-    """Use case for generating personalized recommendations."""
+    """Use case for generating personalized recommendations.
+
+    Users the recommender has nothing for (typically new users) are answered
+    by the optional cold-start recommender instead. Responses scored online
+    name the engine and the model ``generation`` the recommenders belong to,
+    if given; precomputed ones were produced by the offline job's own model,
+    which is not recorded, so they leave those fields empty.
+    """
 
-    def __init__(self, interaction_repository: InteractionRepository):
-        self.interaction_repository = interaction_repository
-        self.recommender: RecommenderInterface | None = None
+    def __init__(
+        self,
+        recommender: RecommenderInterface,
+        recommendation_repository: RecommendationRepository | None = None,
+        cold_start_recommender: RecommenderInterface | None = None,
+        generation: ModelGeneration | None = None,
+    ):
+        self.recommender = recommender
+        self.recommendation_repository = recommendation_repository
+        self.cold_start_recommender = cold_start_recommender
+        self.generation = generation
 
     async def execute(
         self, request: GenerateRecommendationsRequest
@@ -33,22 +44,35 @@ class GenerateRecommendationsUseCase:
         Returns:
             Response containing list of recommendations
         """
-        # Load all interactions for the recommender
-        interactions = await self.interaction_repository.get_all_interactions()
+        # Serve precomputed recommendations; score online only on a miss or expiry
+        recommendations = await self._get_precomputed(request)
+        if recommendations:
+            # Produced by the offline job's model, not by this generation
+            return self._response(request, recommendations, None, None)
 
-        # Initialize and train recommender if not already done
-        if self.recommender is None:
-            self.recommender = CollaborativeFilterRecommender(interactions=interactions)
-            await self.recommender.train()
-
-        # Generate recommendations
-        recommendations = await self.recommender.generate_recommendations(
+        recommender = self.recommender
+        recommendations = await recommender.generate_recommendations(
             user_id=request.user_id,
             limit=request.limit,
             exclude_post_ids=request.exclude_post_ids,
         )
+        if not recommendations and self.cold_start_recommender is not None:
+            recommender = self.cold_start_recommender
+            recommendations = await recommender.generate_recommendations(
+                user_id=request.user_id,
+                limit=request.limit,
+                exclude_post_ids=request.exclude_post_ids,
+            )
+        return self._response(request, recommendations, recommender.model_version, self.generation)
 
-        # Convert to DTOs
+    @staticmethod
+    def _response(
+        request: GenerateRecommendationsRequest,
+        recommendations: list[Recommendation],
+        model_version: str | None,
+        generation: ModelGeneration | None,
+    ) -> GenerateRecommendationsResponse:
+        """Wrap recommendations as DTOs, naming the model that produced them if known."""
         recommendation_dtos = [
             RecommendationDTO(
                 post_id=rec.post_id,
@@ -62,4 +86,27 @@ class GenerateRecommendationsUseCase:
             user_id=request.user_id,
             recommendations=recommendation_dtos,
             count=len(recommendation_dtos),
+            model_version=model_version,
+            model_generation=generation.id if generation else None,
+            trained_at=generation.trained_at if generation else None,
+        )
+
+    async def _get_precomputed(
+        self, request: GenerateRecommendationsRequest
+    ) -> list[Recommendation]:
+        """Get unexpired precomputed recommendations minus the excluded posts.
+
+        Returns an empty list (a miss) unless the stored rows fill ``request.limit``,
+        so a short stored list is scored online rather than served truncated.
+        """
+        if self.recommendation_repository is None:
+            return []
+
+        excluded = set(request.exclude_post_ids)
+        stored = await self.recommendation_repository.get_user_recommendations(
+            request.user_id, limit=request.limit + len(excluded)
         )
+        recommendations = [rec for rec in stored if rec.post_id not in excluded]
+        if len(recommendations) < request.limit:
+            return []
+        return recommendations[: request.limit]
@@ -0,0 +1,212 @@
+"""Append-only interning of string IDs to stable int32 indices."""
+
+import os
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+
+class _Arrays(NamedTuple):
+    """One consistent version of the dictionary, swapped in as a whole."""
+
+    sorted_keys: np.ndarray  # fixed-width bytes, ascending
+    order: np.ndarray  # int32 index of each sorted key
+    rank: np.ndarray  # int32 sorted position of each index
+
+
+class IdDictionary:
+    """Maps string IDs (UUIDs) to int32 indices that never change once assigned.
+
+    New IDs get the next free index in the order they are first interned, so
+    existing indices, and any array or cache keyed by them, stay valid as
+    users and posts are added. Keys are stored once as a sorted fixed-width
+    bytes array plus two int32 permutations (about 44 bytes per UUID instead
+    of 150+ for a dict and a list of Python strings), and looked up in bulk
+    with binary search.
+
+    Reads are lock-free: each append publishes a new set of arrays at once,
+    so concurrent readers see either the old or the new version.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        """Create a dictionary holding ``keys`` at indices 0..n-1.
+
+        Args:
+            keys: Initial IDs in index order
+        """
+        self._arrays = _Arrays(np.empty(0, dtype="S1"), _empty_indices(), _empty_indices())
+        self._lock = threading.Lock()
+        keys = list(keys)
+        if keys:
+            self.intern(keys)
+
+    def __getstate__(self) -> dict:
+        """Pickle the arrays only (e.g. for a training process); the lock is per process."""
+        return {"_arrays": self._arrays}
+
+    def __setstate__(self, state: dict) -> None:
+        self._arrays = state["_arrays"]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._arrays.order.size
+
+    def __getitem__(self, index: int) -> str:
+        """ID at an index."""
+        arrays = self._arrays
+        return arrays.sorted_keys[arrays.rank[index]].decode()
+
+    def __iter__(self) -> Iterator[str]:
+        """IDs in index order."""
+        return iter(self.decode(np.arange(len(self))))
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str) -> int | None:
+        """Index of one ID, or ``None`` if it was never interned."""
+        # Scalar binary search; several times faster than a one-element ``lookup``
+        arrays = self._arrays
+        encoded = key.encode()
+        if len(encoded) > arrays.sorted_keys.itemsize:
+            return None
+        position = int(np.searchsorted(arrays.sorted_keys, encoded))
+        if position < arrays.sorted_keys.size and arrays.sorted_keys[position] == encoded:
+            return int(arrays.order[position])
+        return None
+
+    def lookup(self, keys: Sequence[str]) -> np.ndarray:
+        """Indices of many IDs at once.
+
+        Returns:
+            Int32 index per key, -1 for keys never interned
+        """
+        return self._lookup(self._arrays, _encode(keys))
+
+    def decode(self, indices: Sequence[int] | np.ndarray) -> list[str]:
+        """IDs at many indices."""
+        arrays = self._arrays
+        return [key.decode() for key in arrays.sorted_keys[arrays.rank[np.asarray(indices)]]]
+
+    def intern(self, keys: Sequence[str]) -> np.ndarray:
+        """Indices of many IDs, assigning new indices to unseen ones.
+
+        Returns:
+            Int32 index per key
+        """
+        encoded = _encode(keys)
+        if not encoded.size:
+            return _empty_indices()
+
+        with self._lock:
+            arrays = self._arrays
+            indices = self._lookup(arrays, encoded)
+            missing = indices < 0
+            if missing.any():
+                # First-seen order among the new keys decides their indices
+                new_keys, first = np.unique(encoded[missing], return_index=True)
+                new_keys = new_keys[np.argsort(first, kind="stable")]
+                self._arrays = arrays = self._append(arrays, new_keys)
+                indices[missing] = self._lookup(arrays, encoded[missing])
+            return indices
+
+    def save(self, directory: str | Path, name: str) -> None:
+        """Write the dictionary as ``{name}.keys.npy`` and ``{name}.order.npy``.
+
+        The on-disk dictionary may only be extended: if it holds an ID at an
+        index this one does not agree with, nothing is written.
+
+        Raises:
+            ValueError: If the saved dictionary is not a prefix of this one
+        """
+        directory = Path(directory)
+        saved = IdDictionary.load(directory, name, mmap=True)
+        if len(saved) > len(self) or (
+            len(saved) and not np.array_equal(self.lookup(list(saved)), np.arange(len(saved)))
+        ):
+            raise ValueError(f"Saved {name} dictionary is not a prefix of this one")
+
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = self._arrays
+        for suffix, array in (("keys", arrays.sorted_keys), ("order", arrays.order)):
+            path = directory / f"{name}.{suffix}.npy"
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as file:
+                np.save(file, array)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, directory: str | Path, name: str, mmap: bool = False) -> "IdDictionary":
+        """Read a saved dictionary; an empty one if none was saved yet.
+
+        Args:
+            directory: Directory passed to ``save``
+            name: Name passed to ``save``
+            mmap: Memory-map the arrays read-only instead of reading them
+        """
+        directory = Path(directory)
+        keys_path = directory / f"{name}.keys.npy"
+        order_path = directory / f"{name}.order.npy"
+        dictionary = cls()
+        if not keys_path.exists() or not order_path.exists():
+            return dictionary
+
+        sorted_keys = np.load(keys_path, mmap_mode="r" if mmap else None)
+        order = np.load(order_path, mmap_mode="r" if mmap else None)
+        dictionary._arrays = _Arrays(sorted_keys, order, _inverse(order))
+        return dictionary
+
+    @staticmethod
+    def _lookup(arrays: _Arrays, encoded: np.ndarray) -> np.ndarray:
+        """Binary-search encoded keys; -1 where absent."""
+        indices = np.full(encoded.size, -1, dtype=np.int32)
+        sorted_keys = arrays.sorted_keys
+        if not sorted_keys.size:
+            return indices
+
+        # Keys wider than the stored width cannot be present (and would be truncated)
+        fits = np.char.str_len(encoded) <= sorted_keys.itemsize
+        candidates = encoded[fits].astype(sorted_keys.dtype)
+        positions = np.minimum(np.searchsorted(sorted_keys, candidates), sorted_keys.size - 1)
+        found = sorted_keys[positions] == candidates
+        indices[np.flatnonzero(fits)[found]] = arrays.order[positions[found]]
+        return indices
+
+    @staticmethod
+    def _append(arrays: _Arrays, new_keys: np.ndarray) -> _Arrays:
+        """New arrays with ``new_keys`` (absent, in index order) appended."""
+        width = max(arrays.sorted_keys.itemsize, new_keys.itemsize)
+        sorted_keys = arrays.sorted_keys.astype(f"S{width}")
+        new_keys = new_keys.astype(f"S{width}")
+        new_indices = np.arange(
+            len(arrays.order), len(arrays.order) + new_keys.size, dtype=np.int32
+        )
+
+        by_key = np.argsort(new_keys, kind="stable")
+        positions = np.searchsorted(sorted_keys, new_keys[by_key])
+        order = np.insert(arrays.order, positions, new_indices[by_key])
+        return _Arrays(np.insert(sorted_keys, positions, new_keys[by_key]), order, _inverse(order))
+
+
+def _encode(keys: Sequence[str]) -> np.ndarray:
+    """Encode IDs as a fixed-width bytes array."""
+    if not len(keys):
+        return np.empty(0, dtype="S1")
+    try:
+        return np.array(keys, dtype="S")
+    except UnicodeEncodeError:
+        return np.array([key.encode() for key in keys], dtype="S")
+
+
+def _inverse(order: np.ndarray) -> np.ndarray:
+    """Inverse of a permutation."""
+    rank = np.empty(order.size, dtype=np.int32)
+    rank[order] = np.arange(order.size, dtype=np.int32)
+    return rank
+
+
+def _empty_indices() -> np.ndarray:
+    return np.empty(0, dtype=np.int32)
@@ -23,7 +23,9 @@ class Interaction:
         "like": 0.7,
         "share": 1.0,
     }
+    # Weight of any other interaction type
+    DEFAULT_WEIGHT = 0.1
 
     def get_weight(self) -> float:
         """Get the weight for this interaction type."""
-        return self.INTERACTION_WEIGHTS.get(self.interaction_type, 0.1)
+        return self.INTERACTION_WEIGHTS.get(self.interaction_type, self.DEFAULT_WEIGHT)
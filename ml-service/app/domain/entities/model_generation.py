@@ -0,0 +1,66 @@
+"""Model generation domain entity."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from app.domain.services.recommender_interface import RecommenderInterface
+
+
+if TYPE_CHECKING:
+    from app.domain.entities.id_dictionary import IdDictionary
+
+
+@dataclass(frozen=True, eq=False)
+class ModelGeneration:
+    """One published set of trained recommenders, replaced as a whole.
+
+    A rebuild trains its recommenders off to the side and publishes them as
+    a new generation, and so do incremental updates, which fold new
+    interactions into copies of the changed recommenders; a published
+    generation is never modified. A request holds on to the generation it
+    started with, so it finishes on those models even if a newer generation
+    is published meanwhile, and a replaced generation is freed once the
+    last request holding it is done.
+
+    The generation also carries the ID dictionaries its recommenders index
+    into, so a snapshot saved from it never pairs the arrays of one training
+    with the dictionaries of another.
+
+    An update keeps the ``epoch`` of the generation it updated and records
+    the users whose rows it changed, so a response cache can keep every
+    other user's entries across it.
+    """
+
+    # Increases with every generation a process publishes
+    number: int
+    # Training time in UTC, plus the time of the last incremental update if any;
+    # shared by every process serving the same snapshot
+    id: str
+    trained_at: datetime | None
+    recommenders: Mapping[str, RecommenderInterface] = field(default_factory=dict)
+    cold_start_engine: str = ""
+    users: "IdDictionary | None" = None
+    posts: "IdDictionary | None" = None
+    updated_at: datetime | None = None
+    # Number of the generation the models were trained or restored in; kept by updates
+    epoch: int = 0
+    # Number of the generation whose update last changed each user's rows, since ``epoch``
+    user_changes: Mapping[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        """Freeze the engine and user mappings."""
+        object.__setattr__(self, "recommenders", MappingProxyType(dict(self.recommenders)))
+        object.__setattr__(self, "user_changes", MappingProxyType(dict(self.user_changes)))
+
+    def changed_at(self, user_id: str) -> int:
+        """Number of the generation that last changed the models' rows of ``user_id``."""
+        return self.user_changes.get(user_id, self.epoch)
+
+    def cold_start_for(self, engine: str) -> RecommenderInterface | None:
+        """Fallback recommender for users ``engine`` has nothing for, if any."""
+        if not self.cold_start_engine or self.cold_start_engine == engine:
+            return None
+        return self.recommenders.get(self.cold_start_engine)
@@ -1,6 +1,6 @@
 """Recommendation domain entity."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -16,3 +16,12 @@ class Recommendation:
         """Validate recommendation score."""
         if not 0.0 <= self.score <= 1.0:
             raise ValueError(f"Score must be between 0 and 1, got {self.score}")
+
+
+@dataclass
+class RecommendationQuery:
+    """Parameters for one user's recommendations within a batch."""
+
+    user_id: str
+    limit: int = 50
+    exclude_post_ids: list[str] = field(default_factory=list)
@@ -1,10 +1,18 @@
 """Interaction repository interface (port)."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
 from app.domain.entities.interaction import Interaction
 
 
+if TYPE_CHECKING:
+    from app.domain.entities.id_dictionary import IdDictionary
+    from app.domain.entities.interaction_columns import InteractionColumns, TimeDecay
+
+
 class InteractionRepository(ABC):
     """Repository interface for user interactions."""
 
@@ -20,6 +28,47 @@ class InteractionRepository(ABC):
         """Get all interactions in the system."""
         pass
 
+    @abstractmethod
+    async def load_interaction_columns(
+        self,
+        batch_size: int = 50_000,
+        users: "IdDictionary | None" = None,
+        posts: "IdDictionary | None" = None,
+        decay: "TimeDecay | None" = None,
+        window: timedelta | None = None,
+    ) -> "InteractionColumns":
+        """Stream every interaction into columnar arrays for training."""
+        pass
+
+    @abstractmethod
+    async def load_aggregated_interaction_columns(
+        self,
+        batch_size: int = 50_000,
+        users: "IdDictionary | None" = None,
+        posts: "IdDictionary | None" = None,
+        decay: "TimeDecay | None" = None,
+        window: timedelta | None = None,
+    ) -> "InteractionColumns":
+        """Stream one summed weight per (user, post) pair into columnar arrays for training."""
+        pass
+
+    @abstractmethod
+    def iter_interaction_rows(
+        self,
+        since: datetime | None = None,
+        batch_size: int = 50_000,
+        ordered: bool = False,
+    ) -> AsyncIterator[Sequence[Sequence[Any]]]:
+        """Stream ``(id, user_id, post_id, interaction_type, created_at)`` rows in batches."""
+        pass
+
+    @abstractmethod
+    async def get_interactions_since(
+        self, since: datetime, limit: int | None = None
+    ) -> list[Interaction]:
+        """Get interactions created at or after ``since``, oldest first."""
+        pass
+
     @abstractmethod
     async def save_interaction(self, interaction: Interaction) -> None:
         """Save a new interaction."""
@@ -0,0 +1,14 @@
+"""Recommendation repository interface (port)."""
+
+from abc import ABC, abstractmethod
+
+from app.domain.entities.recommendation import Recommendation
+
+
+class RecommendationRepository(ABC):
+    """Repository interface for precomputed recommendations."""
+
+    @abstractmethod
+    async def get_user_recommendations(self, user_id: str, limit: int) -> list[Recommendation]:
+        """Get a user's unexpired precomputed recommendations, highest score first."""
+        pass
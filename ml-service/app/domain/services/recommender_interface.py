@@ -1,13 +1,21 @@
 """Recommender service interface (port)."""
 
 from abc import ABC, abstractmethod
+from datetime import datetime
 
-from app.domain.entities.recommendation import Recommendation
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
 
 
 class RecommenderInterface(ABC):
     """Interface for recommendation algorithms."""
 
+    # Engine identifier reported to clients as the response's model_version
+    model_version: str = "unknown"
+
+    # Newest interaction ``created_at`` folded into the model, if tracked
+    watermark: datetime | None = None
+
     @abstractmethod
     async def generate_recommendations(
         self,
@@ -27,7 +35,45 @@ class RecommenderInterface(ABC):
         """
         pass
 
+    async def generate_batch_recommendations(
+        self, queries: list[RecommendationQuery]
+    ) -> list[list[Recommendation]]:
+        """Generate recommendations for several users at once.
+
+        Implementations that can share work across users should override this;
+        the default simply answers each query in turn.
+
+        Args:
+            queries: Per-user parameters
+
+        Returns:
+            One recommendation list per query, in the same order
+        """
+        return [
+            await self.generate_recommendations(
+                user_id=query.user_id,
+                limit=query.limit,
+                exclude_post_ids=query.exclude_post_ids,
+            )
+            for query in queries
+        ]
+
     @abstractmethod
     async def train(self) -> None:
         """Train or update the recommendation model."""
         pass
+
+    async def update(self, interactions: list[Interaction]) -> bool:
+        """Fold interactions newer than ``watermark`` into the trained model.
+
+        The registry updates a shallow copy of the published model, so
+        implementations must replace the attributes they change rather than
+        modify them in place.
+
+        Args:
+            interactions: Interactions created at or after ``watermark``
+
+        Returns:
+            False if this engine cannot update incrementally and needs a full retrain
+        """
+        return False
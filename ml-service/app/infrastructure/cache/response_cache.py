@@ -0,0 +1,131 @@
+"""In-process LRU response cache with TTL and model-version invalidation."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class CacheStats:
+    """Counters since the cache was created."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    # Entries dropped because a model update changed them since they were stored
+    stale: int = 0
+    size: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Counters as a plain dict."""
+        return asdict(self)
+
+
+class ResponseCache:
+    """Bounded map from request keys to ready responses.
+
+    Entries expire ``ttl_seconds`` after they were stored and the least
+    recently used entry is evicted beyond ``max_entries``. Every call
+    passes the model version (the epoch of the generation, which only a
+    rebuild or a restore advances) the caller reads or computed with; a
+    newer version than the entries were stored under drops the whole cache,
+    and a value computed by an older model is not stored.
+
+    Incremental updates keep the version. Each entry remembers the generation
+    number it was computed by, and a read passes the number of the
+    generation that last changed its key; an entry computed before that is
+    stale and dropped, so an update only costs the entries of its users.
+
+    Meant for one event loop: operations are plain dict work with no
+    awaits, so they never interleave.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create an empty cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Lifetime of an entry
+            clock: Monotonic time source in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._version = -1
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: int, changed_at: int = 0) -> Any | None:
+        """Cached value of ``key`` under model ``version``, or ``None`` on a miss.
+
+        Args:
+            key: Request key
+            version: Model version the caller reads
+            changed_at: Number of the generation that last changed ``key``'s answer;
+                values computed by an earlier generation are stale
+        """
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+
+        expires_at, computed_by, value = entry
+        if expires_at <= self._clock() or computed_by < changed_at:
+            del self._entries[key]
+            if computed_by < changed_at:
+                self._stats.stale += 1
+            else:
+                self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, version: int, computed_by: int = 0) -> None:
+        """Store ``value`` for ``key``, computed by model ``version``.
+
+        Args:
+            key: Request key
+            value: Response to cache
+            version: Model version the value was computed with
+            computed_by: Number of the generation that computed it
+        """
+        self._check_version(version)
+        if version < self._version:
+            return
+        self._entries[key] = (self._clock() + self.ttl_seconds, computed_by, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the counters and the current size."""
+        return CacheStats(**{**self._stats.as_dict(), "size": len(self._entries)})
+
+    def _check_version(self, version: int) -> None:
+        """Drop everything computed by an older model."""
+        if version > self._version:
+            if self._entries:
+                self._stats.invalidations += 1
+                self._entries.clear()
+            self._version = version
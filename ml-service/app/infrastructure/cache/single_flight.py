@@ -0,0 +1,53 @@
+"""Coalescing of concurrent identical async computations."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time.
+
+    The first caller for a key starts the computation as a task; callers
+    arriving while it runs await that same task instead of starting their
+    own, and all of them get its result or exception. The task is shielded,
+    so a caller that is cancelled (e.g. a client disconnect) does not cancel
+    the work the others wait for. The key is free again once it finishes:
+    results are not cached here.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Computations in flight."""
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await the in-flight computation for ``key``, starting ``fn()`` if there is none.
+
+        Args:
+            key: Identity of the computation
+            fn: Starts the computation; only called by the first caller
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        """Free the key and mark the outcome retrieved even if every caller left."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,124 @@
+"""Application settings loaded from environment variables."""
+
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """ML service configuration.
+
+    Every field can be overridden with an environment variable of the same
+    name in upper case (e.g. ``MODEL_REFRESH_INTERVAL_SECONDS=300``).
+    """
+
+    model_config = SettingsConfigDict(
+        env_file=".env", extra="ignore", protected_namespaces=("settings_",)
+    )
+
+    # Model registry
+    model_refresh_interval_seconds: float = 600.0
+    model_update_interval_seconds: float = 5.0
+    # Rows fetched per server-side cursor batch when loading interactions for training
+    training_load_batch_size: int = 50_000
+    # Sum weights per (user, post) in SQL (GROUP BY) instead of loading every interaction
+    training_aggregate_in_sql: bool = True
+    # Local day-partitioned Parquet copy of the interaction log; when set, training
+    # syncs it from the created_at watermark and reads it instead of the database
+    interaction_snapshot_dir: str | None = None
+    # Versioned, memory-mappable snapshots of the trained models: every rebuild saves
+    # one (the newest model_snapshot_keep are kept) and a starting process serves
+    # the newest instead of training first. With model_snapshot_only, refreshes
+    # only load newer snapshots written by a training job and never train.
+    model_snapshot_dir: str | None = None
+    model_snapshot_keep: int = 2
+    model_snapshot_only: bool = False
+    # With model_snapshot_shared, the processes using model_snapshot_dir (e.g. the
+    # uvicorn workers of a pod) share one model: a lock file elects one publisher,
+    # which trains, updates and saves snapshots (after every rebuild, and after
+    # updates at most every model_snapshot_publish_interval_seconds); the others
+    # map the newest snapshot read-only, check for a newer one every
+    # model_snapshot_poll_seconds and take over if the publisher exits.
+    model_snapshot_shared: bool = False
+    model_snapshot_publish_interval_seconds: float = 60.0
+    model_snapshot_poll_seconds: float = 1.0
+    # Directory persisting the user/post ID dictionaries so indices survive restarts
+    id_dictionary_dir: str | None = None
+    # Exponential decay of interaction weights with age: half-life in days (0 disables),
+    # optionally per interaction type, e.g. {"view": 3, "like": 30}
+    weight_half_life_days: float = 0.0
+    weight_half_life_days_by_type: dict[str, float] = {}
+    # Train on interactions from the last N days only (0 loads the full history)
+    training_window_days: float = 0.0
+
+    # Engine used when a request does not select one: "user_based", "item_based",
+    # "als" or "trending"
+    recommender_engine: str = "user_based"
+
+    # Engine answering users the requested engine has no recommendations for
+    # (cold start); empty disables the fallback
+    cold_start_engine: str = "trending"
+
+    # Trending engine: half-life of an interaction's weight, posts kept ranked
+    trending_half_life_hours: float = 24.0
+    trending_n_top: int = 1000
+
+    # Item-based engine: neighbours kept per post, recent posts scored per user
+    item_n_similar_posts: int = 50
+    item_n_recent_posts: int = 20
+
+    # Implicit ALS engine; als_workers=0 uses every core
+    als_factors: int = 64
+    als_regularization: float = 0.1
+    als_alpha: float = 40.0
+    als_iterations: int = 15
+    als_workers: int = 0
+
+    # User similarity search: "brute" (exact) or "lsh" (approximate)
+    neighbor_index: str = "brute"
+    lsh_n_tables: int = 16
+    lsh_n_bits: int = 10
+    lsh_n_components: int = 64
+    lsh_max_candidates: int = 2000
+
+    # Training diagnostics (MLflow params, metrics, heatmaps, model artifact).
+    # Opt-in; a sampled fraction of trainings is logged by a background worker
+    # with a bounded queue, on at most diagnostics_sample_size users and posts.
+    diagnostics_enabled: bool = False
+    diagnostics_sample_rate: float = 1.0
+    diagnostics_sample_size: int = 50
+    diagnostics_queue_size: int = 4
+
+    # Precomputed recommendations (user_recommendation table)
+    serve_precomputed: bool = True
+
+    # CPU-bound model work runs off the event loop. Scoring and incremental updates
+    # use compute_workers threads (0 keeps them on the loop); once compute_queue_size
+    # more calls wait, further requests are rejected with 503. Full rebuilds train
+    # on a "thread" or "process" pool of training_workers (0: on the loop).
+    compute_workers: int = 2
+    compute_queue_size: int = 64
+    training_executor: str = "thread"
+    training_workers: int = 1
+
+    # Concurrent /recommendations/generate calls are scored together: a batch is
+    # flushed at micro_batch_max_size queries or micro_batch_max_delay_us after its
+    # first one; micro_batch_max_size <= 1 disables batching
+    micro_batch_max_size: int = 64
+    micro_batch_max_delay_us: float = 500.0
+
+    # In-process cache of /recommendations/generate responses, dropped whenever
+    # rebuilt models are swapped in; response_cache_size=0 disables it
+    response_cache_size: int = 10_000
+    response_cache_ttl_seconds: float = 30.0
+
+    # Preload-and-fork server (python -m app.serve): workers forked from the process
+    # that loaded the models, and how often it logs their RSS and PSS (0: never)
+    server_workers: int = 2
+    server_memory_report_seconds: float = 60.0
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Get cached application settings."""
+    return Settings()
@@ -1,12 +1,22 @@
-"""Database connection and session management."""
+"""Database connection and session management.
+
+Engines are created on first use rather than at import, so importing the app
+does not load the database drivers or build connection pools.
+"""
 
 import os
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.infrastructure.database.models import Base
@@ -23,25 +33,37 @@ SYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg2:/
 ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
 
-# Sync engine for scripts and non-async operations
-sync_engine = create_engine(SYNC_DATABASE_URL, echo=False, pool_pre_ping=True)
-SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+@lru_cache
+def get_sync_engine() -> Engine:
+    """Get the sync engine for scripts and non-async operations, creating it on first use."""
+    return create_engine(SYNC_DATABASE_URL, echo=False, pool_pre_ping=True)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """Get the async engine for FastAPI, creating it on first use."""
+    return create_async_engine(ASYNC_DATABASE_URL, echo=False, pool_pre_ping=True)
+
 
+@lru_cache
+def _sync_session_factory() -> sessionmaker[Session]:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())
 
-# Async engine for FastAPI
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, pool_pre_ping=True)
-AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+@lru_cache
+def _async_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_async_engine(), class_=AsyncSession, expire_on_commit=False)
 
 
 def get_sync_session() -> Session:
     """Get a synchronous database session."""
-    return SyncSessionLocal()
+    return _sync_session_factory()()
 
 
 @asynccontextmanager
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Get an asynchronous database session."""
-    async with AsyncSessionLocal() as session:
+    async with _async_session_factory()() as session:
         try:
             yield session
             await session.commit()
@@ -52,6 +74,21 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def dispose_engines() -> None:
+    """Close the pooled connections of any engine created so far.
+
+    The next use creates a new engine, e.g. in a process forked afterwards.
+    """
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+        get_async_engine.cache_clear()
+        _async_session_factory.cache_clear()
+    if get_sync_engine.cache_info().currsize:
+        get_sync_engine().dispose()
+        get_sync_engine.cache_clear()
+        _sync_session_factory.cache_clear()
+
+
 def init_db() -> None:
     """Initialize database (create tables if they don't exist)."""
-    Base.metadata.create_all(bind=sync_engine)
+    Base.metadata.create_all(bind=get_sync_engine())
@@ -1,6 +1,11 @@
 """Interaction repository implementation using SQLAlchemy."""
 
-from sqlalchemy import select
+import math
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ColumnElement, Float, Row, case, cast, extract, func, literal, null, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.entities.interaction import Interaction
@@ -8,6 +13,11 @@ from app.domain.repositories.interaction_repository import InteractionRepository
 from app.infrastructure.database.models import UserInteraction
 
 
+if TYPE_CHECKING:
+    from app.domain.entities.id_dictionary import IdDictionary
+    from app.domain.entities.interaction_columns import InteractionColumns, TimeDecay
+
+
 class SQLAlchemyInteractionRepository(InteractionRepository):
     """SQLAlchemy implementation of interaction repository."""
 
@@ -58,6 +68,171 @@ class SQLAlchemyInteractionRepository(InteractionRepository):
             for db_int in db_interactions
         ]
 
+    async def load_interaction_columns(
+        self,
+        batch_size: int = 50_000,
+        users: "IdDictionary | None" = None,
+        posts: "IdDictionary | None" = None,
+        decay: "TimeDecay | None" = None,
+        window: timedelta | None = None,
+    ) -> "InteractionColumns":
+        """Stream every interaction into columnar arrays for training.
+
+        Only the columns training reads are selected, and rows are fetched
+        through a server-side cursor ``batch_size`` at a time. Each batch is
+        encoded to NumPy arrays before the next one is fetched, so no ORM
+        objects or ``Interaction`` entities are built.
+
+        Args:
+            batch_size: Rows per fetched batch
+            users: Dictionary to intern user IDs into (a new one by default)
+            posts: Dictionary to intern post IDs into (a new one by default)
+            decay: Time decay of the weights, measured back from the newest interaction
+            window: Only interactions this close to the newest one
+        """
+        # NumPy is imported on first training, not when the app starts
+        from app.domain.entities.interaction_columns import InteractionColumnsBuilder
+
+        reference = await self._latest_created_at() if decay or window else None
+        since = reference - window if reference is not None and window else None
+
+        builder = InteractionColumnsBuilder(users, posts)
+        async for rows in self.iter_interaction_rows(since=since, batch_size=batch_size):
+            builder.append(rows)
+        columns = builder.build()
+        if decay is not None and reference is not None:
+            columns.decay = decay.at(reference)
+        return columns
+
+    async def iter_interaction_rows(
+        self,
+        since: datetime | None = None,
+        batch_size: int = 50_000,
+        ordered: bool = False,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Stream ``(id, user_id, post_id, interaction_type, created_at)`` rows in batches.
+
+        Rows come through a server-side cursor ``batch_size`` at a time.
+
+        Args:
+            since: Only rows created at or after this time
+            batch_size: Rows per batch
+            ordered: Oldest first, so a consumer can checkpoint after each
+                batch (served by the ``created_at`` index)
+        """
+        stmt = select(
+            UserInteraction.id,
+            UserInteraction.user_id,
+            UserInteraction.post_id,
+            UserInteraction.interaction_type,
+            UserInteraction.created_at,
+        ).execution_options(yield_per=batch_size)
+        if since is not None:
+            stmt = stmt.where(UserInteraction.created_at >= since)
+        if ordered:
+            stmt = stmt.order_by(UserInteraction.created_at)
+
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def load_aggregated_interaction_columns(
+        self,
+        batch_size: int = 50_000,
+        users: "IdDictionary | None" = None,
+        posts: "IdDictionary | None" = None,
+        decay: "TimeDecay | None" = None,
+        window: timedelta | None = None,
+    ) -> "InteractionColumns":
+        """Stream one summed weight per (user, post) pair into columnar arrays for training.
+
+        Interaction types are mapped to ``Interaction.INTERACTION_WEIGHTS`` in
+        SQL and summed with ``GROUP BY user_id, post_id``, so repeated views
+        and clicks of a pair cross the wire once. Each pair also carries its
+        latest ``created_at``. The aggregate and the IDs at the newest
+        timestamp are read from one repeatable-read snapshot, so the
+        watermark matches exactly the rows that were summed.
+
+        Args:
+            batch_size: Rows per fetched batch
+            users: Dictionary to intern user IDs into (a new one by default)
+            posts: Dictionary to intern post IDs into (a new one by default)
+            decay: Time decay applied to each interaction before summing,
+                measured back from the newest interaction
+            window: Only interactions this close to the newest one
+        """
+        # NumPy is imported on first training, not when the app starts
+        from app.domain.entities.interaction_columns import InteractionColumnsBuilder
+
+        # Must run before the session's first statement to apply to its transaction
+        await self.session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        reference = await self._latest_created_at() if decay or window else None
+        weight = case(
+            Interaction.INTERACTION_WEIGHTS,
+            value=UserInteraction.interaction_type,
+            else_=Interaction.DEFAULT_WEIGHT,
+        )
+        if decay is not None and reference is not None:
+            decay = decay.at(reference)
+            weight = weight * self._decay_factor(decay)
+        stmt = (
+            select(
+                UserInteraction.user_id,
+                UserInteraction.post_id,
+                cast(func.sum(weight), Float),
+                func.max(UserInteraction.created_at),
+            )
+            .group_by(UserInteraction.user_id, UserInteraction.post_id)
+            .execution_options(yield_per=batch_size)
+        )
+        if reference is not None and window:
+            stmt = stmt.where(UserInteraction.created_at >= reference - window)
+
+        builder = InteractionColumnsBuilder(users, posts)
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            builder.append_aggregated(rows)
+        columns = builder.build()
+
+        if columns.watermark is not None:
+            ids = await self.session.scalars(
+                select(UserInteraction.id).where(UserInteraction.created_at == columns.watermark)
+            )
+            columns.watermark_ids = set(ids)
+        columns.decay = decay if reference is not None else None
+        return columns
+
+    async def get_interactions_since(
+        self, since: datetime, limit: int | None = None
+    ) -> list[Interaction]:
+        """Get interactions created at or after ``since``, oldest first.
+
+        Served by the ``created_at`` index.
+        """
+        stmt = (
+            select(UserInteraction)
+            .where(UserInteraction.created_at >= since)
+            .order_by(UserInteraction.created_at)
+        )
+        if limit:
+            stmt = stmt.limit(limit)
+
+        result = await self.session.execute(stmt)
+        db_interactions = result.scalars().all()
+
+        return [
+            Interaction(
+                id=db_int.id,
+                user_id=db_int.user_id,
+                post_id=db_int.post_id,
+                interaction_type=db_int.interaction_type,
+                created_at=db_int.created_at,
+                metadata=db_int.interaction_metadata,
+            )
+            for db_int in db_interactions
+        ]
+
     async def save_interaction(self, interaction: Interaction) -> None:
         """Save a new interaction."""
         db_interaction = UserInteraction(
@@ -70,3 +245,24 @@ class SQLAlchemyInteractionRepository(InteractionRepository):
         )
         self.session.add(db_interaction)
         await self.session.flush()
+
+    async def _latest_created_at(self) -> datetime | None:
+        """Newest interaction time, the reference for decay and training windows."""
+        return await self.session.scalar(select(func.max(UserInteraction.created_at)))
+
+    @staticmethod
+    def _decay_factor(decay: "TimeDecay") -> ColumnElement[float]:
+        """SQL expression for ``TimeDecay.factors`` of one row."""
+        # A NULL half-life (no decay) makes the power NULL, coalesced to a factor of 1
+        whens = {
+            t: decay.half_life(t)
+            for t in Interaction.INTERACTION_WEIGHTS
+            if decay.half_life(t) != math.inf
+        }
+        default = decay.half_life("")
+        default = literal(default) if default != math.inf else null()
+        half_life_days = (
+            case(whens, value=UserInteraction.interaction_type, else_=default) if whens else default
+        )
+        age_days = extract("epoch", literal(decay.reference) - UserInteraction.created_at) / 86400
+        return func.coalesce(func.power(0.5, age_days / half_life_days), 1.0)
@@ -0,0 +1,37 @@
+"""Recommendation repository implementation using SQLAlchemy."""
+
+from datetime import UTC, datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.recommendation import Recommendation
+from app.domain.repositories.recommendation_repository import RecommendationRepository
+from app.infrastructure.database.models import UserRecommendation
+
+
+class SQLAlchemyRecommendationRepository(RecommendationRepository):
+    """SQLAlchemy implementation of recommendation repository."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_user_recommendations(self, user_id: str, limit: int) -> list[Recommendation]:
+        """Get a user's unexpired precomputed recommendations, highest score first.
+
+        Served by the ``(user_id, score desc)`` index.
+        """
+        now = datetime.now(UTC).replace(tzinfo=None)
+        stmt = (
+            select(UserRecommendation.post_id, UserRecommendation.score)
+            .where(UserRecommendation.user_id == user_id)
+            .where(UserRecommendation.expires_at > now)
+            .order_by(UserRecommendation.score.desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+
+        return [
+            Recommendation(user_id=user_id, post_id=post_id, score=score)
+            for post_id, score in result.all()
+        ]
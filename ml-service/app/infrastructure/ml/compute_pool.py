@@ -0,0 +1,200 @@
+"""Runs CPU-bound model work on worker threads or processes, off the event loop."""
+
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
+from app.domain.services.recommender_interface import RecommenderInterface
+
+
+T = TypeVar("T")
+
+
+class ComputePoolFullError(RuntimeError):
+    """Raised when a pool's workers are busy and its queue is full."""
+
+
+@dataclass
+class StageStats:
+    """Timing of one kind of work: how often it ran, how long it waited and ran."""
+
+    count: int = 0
+    queued_seconds: float = 0.0
+    run_seconds: float = 0.0
+    max_run_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+def _execute(fn: Callable[..., Awaitable[T]], args: tuple) -> tuple[T, float]:
+    """Run a coroutine function to completion on the worker and time it."""
+    start = time.perf_counter()
+    result = asyncio.run(fn(*args))
+    return result, time.perf_counter() - start
+
+
+class ComputePool:
+    """Executes the engines' CPU-bound coroutines without blocking the event loop.
+
+    The engines' ``train``, ``update`` and scoring methods are coroutines
+    that do only synchronous NumPy, SciPy and scikit-learn work. Run through
+    a pool, each call gets its own event loop on a worker thread (NumPy and
+    BLAS release the GIL) or a worker process (``kind="process"``, for
+    training; arguments and results are pickled). ``workers=0`` runs them on
+    the caller's loop, as before.
+
+    At most ``workers + queue_size`` calls are admitted at a time; further
+    calls raise ``ComputePoolFullError`` instead of piling up. A call sent to
+    a worker counts until the worker is done with it, even if its caller
+    gave up. Queue wait and run time are recorded per stage.
+    """
+
+    def __init__(self, workers: int = 0, queue_size: int = 64, kind: str = "thread"):
+        """Create a pool; worker threads or processes start on first use.
+
+        Args:
+            workers: Worker threads or processes; 0 runs calls on the event loop
+            queue_size: Calls admitted beyond the busy workers
+            kind: ``"thread"`` or ``"process"``
+
+        Raises:
+            ValueError: If ``kind`` is unknown
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown compute pool kind: {kind}")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.kind = kind
+        self._executor: Executor | None = None
+        if workers > 0:
+            self._executor = (
+                ThreadPoolExecutor(workers, thread_name_prefix="compute")
+                if kind == "thread"
+                # Forking a process that runs threads can deadlock the child
+                else ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            )
+        self._stages: dict[str, StageStats] = {}
+        self.pending = 0
+        self.rejected = 0
+
+    async def run(
+        self,
+        stage: str,
+        fn: Callable[..., Awaitable[T]],
+        *args: Any,
+    ) -> T:
+        """Run ``fn(*args)`` on a worker and await its result.
+
+        Args:
+            stage: Name the timing is recorded under
+            fn: Coroutine function; picklable, with picklable arguments, for a
+                process pool (its effects on them stay in the worker)
+            *args: Arguments of ``fn``
+
+        Raises:
+            ComputePoolFullError: If the workers are busy and the queue is full
+        """
+        if self.pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise ComputePoolFullError(f"Compute pool full ({self.pending} calls pending)")
+
+        self.pending += 1
+        submitted = time.perf_counter()
+        if self._executor is None:
+            try:
+                result = await fn(*args)
+            finally:
+                self.pending -= 1
+            run_seconds = time.perf_counter() - submitted
+        else:
+            try:
+                future = asyncio.get_running_loop().run_in_executor(
+                    self._executor, _execute, fn, args
+                )
+            except BaseException:
+                # Never reached a worker (e.g. the pool is shut down)
+                self.pending -= 1
+                raise
+            # Counted until the worker is done, even if the caller is cancelled
+            future.add_done_callback(self._finish)
+            result, run_seconds = await asyncio.shield(future)
+
+        self.record(stage, time.perf_counter() - submitted - run_seconds, run_seconds)
+        return result
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Record the time spent in the block under ``stage``, for work run on the loop."""
+        started = time.perf_counter()
+        yield
+        self.record(stage, 0.0, time.perf_counter() - started)
+
+    def record(self, stage: str, queued_seconds: float, run_seconds: float) -> None:
+        """Add one run of ``stage`` to its timing."""
+        stats = self._stages.setdefault(stage, StageStats())
+        stats.count += 1
+        stats.queued_seconds += queued_seconds
+        stats.run_seconds += run_seconds
+        stats.max_run_seconds = max(stats.max_run_seconds, run_seconds)
+
+    def stats(self) -> dict[str, StageStats]:
+        """Timing per stage, since the pool was created."""
+        return {stage: StageStats(**asdict(stats)) for stage, stats in self._stages.items()}
+
+    def shutdown(self) -> None:
+        """Stop the workers once the calls already submitted finished."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, future: asyncio.Future) -> None:
+        """Stop counting a worker call and mark its outcome retrieved even if its caller left."""
+        self.pending -= 1
+        if not future.cancelled():
+            future.exception()
+
+
+class PooledRecommender(RecommenderInterface):
+    """Recommender whose scoring runs on a ``ComputePool``.
+
+    Training and updates are delegated as is; the registry runs them on its
+    own pools.
+    """
+
+    def __init__(self, recommender: RecommenderInterface, pool: ComputePool):
+        self.recommender = recommender
+        self.pool = pool
+        self.model_version = recommender.model_version
+        self.watermark = recommender.watermark
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        """Score one user on a worker."""
+        return await self.pool.run(
+            "score", self.recommender.generate_recommendations, user_id, limit, exclude_post_ids
+        )
+
+    async def generate_batch_recommendations(
+        self, queries: list[RecommendationQuery]
+    ) -> list[list[Recommendation]]:
+        """Score every query in one call on a worker."""
+        return await self.pool.run(
+            "score", self.recommender.generate_batch_recommendations, queries
+        )
+
+    async def train(self) -> None:
+        await self.recommender.train()
+
+    async def update(self, interactions: list[Interaction]) -> bool:
+        return await self.recommender.update(interactions)
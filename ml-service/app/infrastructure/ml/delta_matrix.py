@@ -0,0 +1,270 @@
+"""Matrices whose changed rows are kept in a small side matrix until compaction."""
+
+import numpy as np
+from scipy import sparse
+
+
+class DeltaCSRMatrix:
+    """A large CSR matrix with some of its rows replaced, without rewriting it.
+
+    ``base`` is never modified, so it can stay memory-mapped and shared by
+    forked workers. ``rows`` lists, sorted, the rows replaced by the rows of
+    the small ``delta`` matrix; rows past the end of ``base`` that were never
+    replaced are empty. Replacing rows and reading them costs time in the size
+    of ``delta`` and of the rows read, not in the size of ``base``;
+    ``compact`` merges the two into one CSR once ``delta`` has grown.
+
+    Instances are immutable: ``replace_rows`` returns a new matrix sharing
+    ``base``, so a reader holding one never sees a half-applied change.
+    """
+
+    def __init__(
+        self,
+        base: sparse.csr_matrix,
+        shape: tuple[int, int] | None = None,
+        rows: np.ndarray | None = None,
+        delta: sparse.csr_matrix | None = None,
+    ):
+        """Wrap a CSR matrix.
+
+        Args:
+            base: Matrix holding every row not in ``rows``; not copied
+            shape: Logical shape, at least the shape of ``base`` and ``delta``
+            rows: Sorted indices of the rows held by ``delta``
+            delta: The replacement rows, one per entry of ``rows``
+        """
+        self.base = base
+        self.shape = shape or base.shape
+        self.rows = np.empty(0, dtype=np.int64) if rows is None else rows
+        self.delta = (
+            sparse.csr_matrix((0, self.shape[1]), dtype=base.dtype) if delta is None else delta
+        )
+
+    def resized(self, shape: tuple[int, int]) -> "DeltaCSRMatrix":
+        """The same matrix with empty rows and columns appended up to ``shape``."""
+        return DeltaCSRMatrix(self.base, shape, self.rows, self.delta)
+
+    def take(self, idx: np.ndarray) -> sparse.csr_matrix:
+        """The current content of rows ``idx``, as a len(idx) x n_columns CSR matrix."""
+        idx = np.asarray(idx, dtype=np.int64)
+        pos, replaced = self._locate(idx)
+        in_base = ~replaced & (idx < self.base.shape[0])
+        if in_base.all():
+            return self._with_columns(self.base[idx], self.shape[1])
+
+        # Stack the rows read from each source, then put them back in query order
+        empty = ~replaced & ~in_base
+        stacked = sparse.vstack(
+            [
+                self._with_columns(self.base[idx[in_base]], self.shape[1]),
+                self._with_columns(self.delta[pos[replaced]], self.shape[1]),
+                sparse.csr_matrix((int(empty.sum()), self.shape[1]), dtype=self.base.dtype),
+            ],
+            format="csr",
+        )
+        source_order = np.concatenate(
+            [np.flatnonzero(in_base), np.flatnonzero(replaced), np.flatnonzero(empty)]
+        )
+        return stacked[np.argsort(source_order, kind="stable")]
+
+    def row_indices(self, row: int) -> np.ndarray:
+        """Column indices of the stored entries of one row."""
+        pos, replaced = self._locate(np.array([row], dtype=np.int64))
+        if replaced[0]:
+            matrix, row = self.delta, int(pos[0])
+        elif row < self.base.shape[0]:
+            matrix = self.base
+        else:
+            return np.empty(0, dtype=np.int32)
+        return matrix.indices[matrix.indptr[row] : matrix.indptr[row + 1]]
+
+    def left_multiply(self, weights: sparse.csr_matrix) -> sparse.csr_matrix:
+        """``weights @ matrix`` for a sparse k x n_rows weight matrix."""
+        weights = weights.tocoo()
+        pos, replaced = self._locate(weights.col.astype(np.int64))
+        in_base = ~replaced & (weights.col < self.base.shape[0])
+
+        # Weights of replaced rows go to the delta, the others to the base
+        from_base = sparse.csr_matrix(
+            (weights.data[in_base], (weights.row[in_base], weights.col[in_base])),
+            shape=(weights.shape[0], self.base.shape[0]),
+        )
+        product = self._with_columns(from_base @ self.base, self.shape[1])
+        if replaced.any():
+            from_delta = sparse.csr_matrix(
+                (weights.data[replaced], (weights.row[replaced], pos[replaced])),
+                shape=(weights.shape[0], self.delta.shape[0]),
+            )
+            product = product + self._with_columns(from_delta @ self.delta, self.shape[1])
+        return product.tocsr()
+
+    def replace_rows(self, rows: np.ndarray, row_matrix: sparse.csr_matrix) -> "DeltaCSRMatrix":
+        """A matrix with rows ``rows`` (sorted, unique) replaced by those of ``row_matrix``.
+
+        The matrix grows to cover rows and columns past its current shape.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        shape = (
+            max(self.shape[0], int(rows[-1]) + 1 if rows.size else 0),
+            max(self.shape[1], row_matrix.shape[1]),
+        )
+        kept = ~np.isin(self.rows, rows)
+        merged_rows = np.concatenate([self.rows[kept], rows])
+        order = np.argsort(merged_rows, kind="stable")
+        delta = sparse.vstack(
+            [
+                self._with_columns(self.delta[np.flatnonzero(kept)], shape[1]),
+                self._with_columns(row_matrix.tocsr(), shape[1]),
+            ],
+            format="csr",
+        )[order]
+        return DeltaCSRMatrix(self.base, shape, merged_rows[order], delta)
+
+    def compact(self) -> sparse.csr_matrix:
+        """The whole matrix as one CSR, with the replaced rows merged into ``base``."""
+        base = self.base
+        if not self.rows.size:
+            return self._with_columns(self._with_rows(base, self.shape[0]), self.shape[1])
+
+        # Drop the replaced rows' old entries, then add the delta's entries in their place
+        base_rows = np.repeat(np.arange(base.shape[0]), np.diff(base.indptr))
+        stale = np.zeros(base.shape[0], dtype=bool)
+        stale[self.rows[self.rows < base.shape[0]]] = True
+        keep = ~stale[base_rows]
+        delta = self.delta.tocoo()
+        matrix = sparse.csr_matrix(
+            (
+                np.concatenate([base.data[keep], delta.data]),
+                (
+                    np.concatenate([base_rows[keep], self.rows[delta.row]]),
+                    np.concatenate([base.indices[keep], delta.col]),
+                ),
+            ),
+            shape=self.shape,
+            dtype=base.dtype,
+        )
+        matrix.sum_duplicates()
+        return matrix
+
+    def compacted(self) -> "DeltaCSRMatrix":
+        """This matrix with nothing left in ``delta``: itself, or one over ``compact()``."""
+        if not self.rows.size and self.shape == self.base.shape:
+            return self
+        return DeltaCSRMatrix(self.compact())
+
+    def _locate(self, idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Position in ``delta`` of each row in ``idx``, and whether it is replaced."""
+        pos = np.searchsorted(self.rows, idx)
+        replaced = pos < self.rows.size
+        replaced[replaced] = self.rows[pos[replaced]] == idx[replaced]
+        return pos, replaced
+
+    @staticmethod
+    def _with_columns(matrix: sparse.csr_matrix, n_columns: int) -> sparse.csr_matrix:
+        """``matrix`` widened to ``n_columns`` empty-padded columns, without copying."""
+        if matrix.shape[1] == n_columns:
+            return matrix
+        return sparse.csr_matrix(
+            (matrix.data, matrix.indices, matrix.indptr),
+            shape=(matrix.shape[0], n_columns),
+            copy=False,
+        )
+
+    @staticmethod
+    def _with_rows(matrix: sparse.csr_matrix, n_rows: int) -> sparse.csr_matrix:
+        """``matrix`` with empty rows appended up to ``n_rows``; only ``indptr`` is copied."""
+        if matrix.shape[0] == n_rows:
+            return matrix
+        return sparse.csr_matrix(
+            (
+                matrix.data,
+                matrix.indices,
+                np.pad(matrix.indptr, (0, n_rows - matrix.shape[0]), mode="edge"),
+            ),
+            shape=(n_rows, matrix.shape[1]),
+            copy=False,
+        )
+
+
+class DeltaArray:
+    """A large dense 2-D array with some of its rows replaced, without rewriting it.
+
+    The dense counterpart of ``DeltaCSRMatrix``: ``base`` is never modified,
+    ``rows`` lists, sorted, the rows replaced by those of ``delta``, and rows
+    past the end of ``base`` that were never replaced are zero. Instances are
+    immutable; ``replace_rows`` returns a new array sharing ``base``.
+    """
+
+    def __init__(
+        self,
+        base: np.ndarray,
+        n_rows: int | None = None,
+        rows: np.ndarray | None = None,
+        delta: np.ndarray | None = None,
+    ):
+        """Wrap an array.
+
+        Args:
+            base: Array holding every row not in ``rows``; not copied
+            n_rows: Logical number of rows, at least that of ``base``
+            rows: Sorted indices of the rows held by ``delta``
+            delta: The replacement rows, one per entry of ``rows``
+        """
+        self.base = base
+        self.n_rows = base.shape[0] if n_rows is None else n_rows
+        self.rows = np.empty(0, dtype=np.int64) if rows is None else rows
+        self.delta = np.empty((0, base.shape[1]), dtype=base.dtype) if delta is None else delta
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.n_rows, self.base.shape[1]
+
+    def resized(self, n_rows: int) -> "DeltaArray":
+        """The same array with zero rows appended up to ``n_rows``."""
+        return DeltaArray(self.base, n_rows, self.rows, self.delta)
+
+    def take(self, idx: np.ndarray) -> np.ndarray:
+        """The current content of rows ``idx``, as a new len(idx) x n_columns array."""
+        idx = np.asarray(idx, dtype=np.int64)
+        pos, replaced = self._locate(idx)
+        in_base = ~replaced & (idx < self.base.shape[0])
+        if in_base.all():
+            return self.base[idx]
+
+        taken = np.zeros((idx.size, self.base.shape[1]), dtype=self.base.dtype)
+        taken[in_base] = self.base[idx[in_base]]
+        taken[replaced] = self.delta[pos[replaced]]
+        return taken
+
+    def replace_rows(self, rows: np.ndarray, values: np.ndarray) -> "DeltaArray":
+        """An array with rows ``rows`` (sorted, unique) replaced by ``values``.
+
+        The array grows to cover rows past its current end.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        n_rows = max(self.n_rows, int(rows[-1]) + 1 if rows.size else 0)
+        kept = ~np.isin(self.rows, rows)
+        merged_rows = np.concatenate([self.rows[kept], rows])
+        order = np.argsort(merged_rows, kind="stable")
+        delta = np.concatenate([self.delta[kept], values.astype(self.base.dtype, copy=False)])
+        return DeltaArray(self.base, n_rows, merged_rows[order], delta[order])
+
+    def compact(self) -> np.ndarray:
+        """The whole array, with the replaced rows written into a copy of ``base``."""
+        array = np.zeros(self.shape, dtype=self.base.dtype)
+        array[: self.base.shape[0]] = self.base
+        array[self.rows] = self.delta
+        return array
+
+    def compacted(self) -> "DeltaArray":
+        """This array with nothing left in ``delta``: itself, or one over ``compact()``."""
+        if not self.rows.size and self.n_rows == self.base.shape[0]:
+            return self
+        return DeltaArray(self.compact())
+
+    def _locate(self, idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Position in ``delta`` of each row in ``idx``, and whether it is replaced."""
+        pos = np.searchsorted(self.rows, idx)
+        replaced = pos < self.rows.size
+        replaced[replaced] = self.rows[pos[replaced]] == idx[replaced]
+        return pos, replaced
@@ -0,0 +1,242 @@
+"""Opt-in training diagnostics, logged to MLflow by a background worker.
+
+Training only takes a small, detached snapshot of what it wants to record and
+hands it to a single worker thread through a bounded queue. Rendering
+heatmaps, uploading artifacts and logging models happen there, so they never
+run on the event loop, never delay a model swap and never fail a training.
+When the queue is full the snapshot is dropped.
+
+MLflow, matplotlib and seaborn are imported on the worker thread the first
+time a run is logged, so serving processes that never record diagnostics
+never load them.
+"""
+
+import logging
+import queue
+import random
+import tempfile
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from scipy import sparse
+
+from app.infrastructure.config.settings import get_settings
+
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrainingDiagnostics:
+    """Snapshot of one training run, detached from the live model."""
+
+    params: dict[str, Any]
+    metrics: dict[str, float] = field(default_factory=dict)
+    # Small user x post sample of the interaction matrix, with its labels
+    matrix_sample: sparse.csr_matrix | None = None
+    user_labels: list[str] = field(default_factory=list)
+    post_labels: list[str] = field(default_factory=list)
+    # Fitted sklearn estimator to log as the run's model
+    sklearn_model: Any | None = None
+
+
+class DiagnosticsWorker:
+    """Single daemon thread draining a bounded queue of diagnostics jobs."""
+
+    def __init__(self, max_queue_size: int = 4):
+        """Initialize an idle worker.
+
+        Args:
+            max_queue_size: Jobs waiting at most; further submissions are dropped
+        """
+        self._queue: queue.Queue[Callable[[], None]] = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, job: Callable[[], None]) -> bool:
+        """Queue a job without blocking.
+
+        Returns:
+            False if the queue was full and the job was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Diagnostics queue full; dropped a job (%d so far)", self.dropped)
+            return False
+        return True
+
+    def join(self) -> None:
+        """Block until every queued job has run."""
+        self._queue.join()
+
+    def _ensure_started(self) -> None:
+        """Start the worker thread on first use."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="training-diagnostics", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Run jobs forever; a failing job is logged and skipped."""
+        while True:
+            job = self._queue.get()
+            try:
+                job()
+            except Exception:
+                logger.exception("Training diagnostics job failed")
+            finally:
+                self._queue.task_done()
+
+
+@lru_cache
+def get_diagnostics_worker() -> DiagnosticsWorker:
+    """Get the process-wide diagnostics worker."""
+    return DiagnosticsWorker(max_queue_size=get_settings().diagnostics_queue_size)
+
+
+def should_record() -> bool:
+    """Whether this training run is sampled for diagnostics (``DIAGNOSTICS_ENABLED``)."""
+    settings = get_settings()
+    return settings.diagnostics_enabled and random.random() < settings.diagnostics_sample_rate
+
+
+def sample_matrix(
+    matrix: sparse.csr_matrix,
+    user_labels: Sequence[str],
+    post_labels: Sequence[str],
+    size: int | None = None,
+) -> tuple[sparse.csr_matrix, list[str], list[str]]:
+    """Sample random users and their most interacted posts from a user-item matrix.
+
+    Args:
+        matrix: User-item matrix
+        user_labels: User ID per row
+        post_labels: Post ID per column
+        size: Users and posts kept (``DIAGNOSTICS_SAMPLE_SIZE`` by default)
+
+    Returns:
+        Copied sub-matrix and its user and post labels
+    """
+    size = size or get_settings().diagnostics_sample_size
+    rng = np.random.default_rng()
+    users = np.sort(rng.choice(matrix.shape[0], min(size, matrix.shape[0]), replace=False))
+    rows = matrix[users]
+    counts = np.bincount(rows.indices, minlength=matrix.shape[1])
+    posts = np.sort(np.argsort(-counts, kind="stable")[: min(size, matrix.shape[1])])
+    return (
+        rows[:, posts].tocsr(),
+        [user_labels[i] for i in users],
+        [post_labels[i] for i in posts],
+    )
+
+
+def record_training(diagnostics: TrainingDiagnostics) -> bool:
+    """Hand a training snapshot to the background worker.
+
+    Returns:
+        False if the snapshot was dropped because the queue was full
+    """
+    return get_diagnostics_worker().submit(lambda: log_training_run(diagnostics))
+
+
+def log_training_run(diagnostics: TrainingDiagnostics) -> None:
+    """Log one training snapshot as an MLflow run (runs on the worker thread)."""
+    import mlflow
+    import mlflow.sklearn
+
+    with mlflow.start_run():
+        mlflow.log_params(diagnostics.params)
+        if diagnostics.metrics:
+            mlflow.log_metrics(diagnostics.metrics)
+
+        if diagnostics.matrix_sample is not None and diagnostics.matrix_sample.shape[0]:
+            _log_matrix_heatmap(diagnostics)
+            _log_similarity_heatmap(diagnostics)
+
+        # Cloudpickle keeps a fitted CSR matrix loadable
+        if diagnostics.sklearn_model is not None:
+            mlflow.sklearn.log_model(
+                diagnostics.sklearn_model, name="knn_model", serialization_format="cloudpickle"
+            )
+
+
+def _log_matrix_heatmap(diagnostics: TrainingDiagnostics) -> None:
+    """Render the sampled user-item matrix as a heatmap artifact."""
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    sample = diagnostics.matrix_sample
+    show_labels = max(sample.shape) <= 20
+
+    # Figure objects instead of pyplot: no global state shared with other threads
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    sns.heatmap(
+        sample.toarray(),
+        cmap="YlOrRd",
+        ax=ax,
+        cbar_kws={"label": "Interaction Weight"},
+        xticklabels=diagnostics.post_labels if show_labels else False,
+        yticklabels=diagnostics.user_labels if show_labels else False,
+    )
+    ax.set_title(f"User-Item Interaction Matrix (sample {sample.shape[0]}x{sample.shape[1]})")
+    ax.set_xlabel("Posts")
+    ax.set_ylabel("Users")
+    _log_figure(fig, dpi=100)
+
+
+def _log_similarity_heatmap(diagnostics: TrainingDiagnostics) -> None:
+    """Render cosine similarity between up to 20 sampled users as a heatmap artifact."""
+    import seaborn as sns
+    from matplotlib.figure import Figure
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    n_users = min(20, diagnostics.matrix_sample.shape[0])
+    similarity = cosine_similarity(diagnostics.matrix_sample[:n_users])
+    labels = diagnostics.user_labels[:n_users]
+
+    fig = Figure(figsize=(12, 10))
+    ax = fig.subplots()
+    sns.heatmap(
+        similarity,
+        annot=n_users <= 10,
+        fmt=".2f",
+        cmap="YlOrRd",
+        square=True,
+        cbar_kws={"label": "Cosine Similarity"},
+        xticklabels=labels,
+        yticklabels=labels,
+        vmin=0,
+        vmax=1,
+        ax=ax,
+    )
+    ax.set_title(f"User-User Similarity Matrix (Cosine Similarity)\n{n_users} users", fontsize=14)
+    ax.set_xlabel("Users", fontsize=12)
+    ax.set_ylabel("Users", fontsize=12)
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.tick_params(axis="y", labelrotation=0)
+    _log_figure(fig, dpi=150)
+
+
+def _log_figure(fig: "Figure", dpi: int) -> None:
+    """Save a figure to a temporary PNG and log it as an artifact."""
+    import mlflow
+
+    with tempfile.NamedTemporaryFile(suffix=".png") as tmp:
+        fig.tight_layout()
+        fig.savefig(tmp.name, dpi=dpi, bbox_inches="tight")
+        mlflow.log_artifact(tmp.name, "visualizations")
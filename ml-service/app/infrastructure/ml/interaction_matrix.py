@@ -0,0 +1,333 @@
+"""Shared sparse user-item matrix state for matrix-based recommenders."""
+
+import operator
+from collections.abc import Callable
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from scipy import sparse
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import InteractionColumns, TimeDecay
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
+from app.domain.services.recommender_interface import RecommenderInterface
+from app.infrastructure.ml.delta_matrix import DeltaCSRMatrix
+
+
+if TYPE_CHECKING:
+    from app.domain.entities.id_dictionary import IdDictionary
+
+
+class InteractionMatrixRecommender(RecommenderInterface):
+    """Base for recommenders that score posts from a weighted user-item matrix.
+
+    Owns the ID dictionaries, the float32 CSR matrix, the ``created_at``
+    watermark for incremental updates and the top-k ranking of candidate
+    scores. Subclasses decide how a user's score row is computed, and add
+    their own trained arrays to model snapshots.
+
+    Updates replace the rows of the users they touch in a small side matrix
+    (see ``DeltaCSRMatrix``) instead of rewriting the trained one; scoring
+    reads through ``_matrix``, and ``user_item_matrix`` merges the two.
+    """
+
+    # Reason attached to every recommendation this engine produces
+    reason: str = "collaborative_filtering"
+    # Merge the updated rows into the trained matrix once they hold this share of its entries
+    delta_compaction_ratio: float = 0.1
+
+    def __init__(self, interactions: InteractionColumns | list[Interaction]):
+        """Initialize recommender with interaction data.
+
+        Args:
+            interactions: User-post interactions, as columns or as entities
+        """
+        if not isinstance(interactions, InteractionColumns):
+            interactions = InteractionColumns.from_interactions(interactions)
+        self.interactions = interactions
+        self._matrix: DeltaCSRMatrix | None = None
+        # Shared, append-only ID dictionaries; matrix rows and columns are their indices
+        self.users: IdDictionary = interactions.users
+        self.posts: IdDictionary = interactions.posts
+        # Users and posts covered by the model; IDs interned later are unknown to it
+        self.n_users = 0
+        self.n_posts = 0
+        self.watermark: datetime | None = None
+        self._watermark_ids: set[str] = set()
+
+    @property
+    def user_item_matrix(self) -> sparse.csr_matrix | None:
+        """The user-item matrix, with the rows changed by updates merged in."""
+        if self._matrix is None:
+            return None
+        self._matrix = self._matrix.compacted()
+        return self._matrix.base
+
+    @user_item_matrix.setter
+    def user_item_matrix(self, matrix: sparse.csr_matrix | None) -> None:
+        self._matrix = None if matrix is None else DeltaCSRMatrix(matrix)
+
+    def _index_ids(self) -> None:
+        """Cover every user and post interned so far (indices never change)."""
+        self.n_users = len(self.users)
+        self.n_posts = len(self.posts)
+
+    def _user_index(self, user_id: str) -> int | None:
+        """Matrix row of a user, or ``None`` if the model does not cover them."""
+        idx = self.users.get(user_id)
+        return idx if idx is not None and idx < self.n_users else None
+
+    def _known_queries(self, queries: list[RecommendationQuery]) -> list[tuple[int, int]]:
+        """``(position, matrix row)`` of each query whose user the model covers."""
+        known = []
+        for position, query in enumerate(queries):
+            idx = self._user_index(query.user_id)
+            if idx is not None:
+                known.append((position, idx))
+        return known
+
+    def _unseen_interactions(self, interactions: list[Interaction]) -> InteractionColumns:
+        """Drop interactions already folded in at or before the watermark, as columns."""
+        # Rows sharing the watermark timestamp may be returned again; skip them
+        return InteractionColumns.from_interactions(
+            [
+                i
+                for i in interactions
+                if i.id not in self._watermark_ids
+                and (self.watermark is None or i.created_at >= self.watermark)
+            ],
+            self.users,
+            self.posts,
+            # Same decay reference as training, so old and new entries stay comparable
+            self.interactions.decay,
+        )
+
+    def _fold_in(self, interactions: InteractionColumns) -> np.ndarray:
+        """Cover new IDs and add the interactions to the user-item matrix.
+
+        Only the rows of the users in ``interactions`` are rebuilt, into the
+        side matrix of ``_matrix``; the trained matrix is left untouched until
+        the side matrix outgrows ``delta_compaction_ratio`` of it. The result
+        equals a full rebuild over all interactions (with the same time decay
+        reference).
+
+        Returns:
+            Sorted indices of the users whose rows changed
+        """
+        self._index_ids()
+        changed = np.unique(interactions.user_codes.astype(np.int64))
+        self._matrix = self._merge_rows(
+            self._matrix, changed, self._build_user_item_matrix(interactions, changed)
+        )
+        self._advance_watermark(interactions)
+        return changed
+
+    def _merge_rows(
+        self,
+        matrix: DeltaCSRMatrix,
+        rows: np.ndarray,
+        new_entries: sparse.csr_matrix,
+        combine: Callable[[sparse.csr_matrix, sparse.csr_matrix], Any] = operator.add,
+    ) -> DeltaCSRMatrix:
+        """Merge new entries into some rows of a user-by-post matrix.
+
+        Args:
+            matrix: Matrix to update; not modified
+            rows: Sorted indices of the rows to update
+            new_entries: One row of new entries per index in ``rows``
+            combine: How a current row and its new entries merge
+
+        Returns:
+            The updated matrix, compacted once its side matrix grew too large
+        """
+        matrix = matrix.resized((self.n_users, self.n_posts))
+        merged = sparse.csr_matrix(combine(matrix.take(rows), new_entries))
+        matrix = matrix.replace_rows(rows, merged)
+        if matrix.delta.nnz > self.delta_compaction_ratio * matrix.base.nnz:
+            matrix = DeltaCSRMatrix(matrix.compact())
+        return matrix
+
+    def _advance_watermark(self, interactions: InteractionColumns) -> None:
+        """Move the watermark to the newest ``created_at`` folded into the model."""
+        newest = interactions.watermark
+        if newest is None:
+            return
+
+        if self.watermark is None or newest > self.watermark:
+            self.watermark = newest
+            self._watermark_ids = set()
+        if newest == self.watermark:
+            # A new set: the one of the published model may be shared with this copy
+            self._watermark_ids = self._watermark_ids | set(interactions.watermark_ids)
+
+    def _build_user_item_matrix(
+        self, interactions: InteractionColumns, rows: np.ndarray | None = None
+    ) -> sparse.csr_matrix:
+        """Build the float32 CSR user-item matrix, summing repeated interactions.
+
+        Args:
+            interactions: Interactions to add up
+            rows: Sorted users to build rows for, covering every user in
+                ``interactions``; every user by default
+        """
+        # COO -> CSR conversion sums duplicate (user, post) entries
+        matrix = sparse.coo_matrix(
+            (
+                interactions.weights(),
+                (self._row_codes(interactions, rows), interactions.post_codes),
+            ),
+            shape=(self.n_users if rows is None else rows.size, self.n_posts),
+            dtype=np.float32,
+        ).tocsr()
+        matrix.eliminate_zeros()
+        return matrix
+
+    @staticmethod
+    def _row_codes(interactions: InteractionColumns, rows: np.ndarray | None) -> np.ndarray:
+        """Matrix row of each interaction: its user, or the user's position in ``rows``."""
+        if rows is None:
+            return interactions.user_codes
+        return np.searchsorted(rows, interactions.user_codes)
+
+    def _post_indices(self, post_ids: list[str] | None) -> np.ndarray:
+        """Map known post IDs to matrix column indices, dropping unknown ones."""
+        indices = self.posts.lookup(post_ids or [])
+        return indices[(indices >= 0) & (indices < self.n_posts)]
+
+    def _top_candidates(
+        self,
+        scores: sparse.csr_matrix,
+        user_idx: int,
+        exclude_idx: np.ndarray,
+        limit: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Select the top-``limit`` unseen, non-excluded posts from a 1 x n_posts score row.
+
+        Returns:
+            Post indices and their raw scores, sorted by score (descending)
+        """
+        return self._select_top(scores.indices, scores.data, user_idx, exclude_idx, limit)
+
+    def _select_top(
+        self,
+        candidates: np.ndarray,
+        candidate_scores: np.ndarray,
+        user_idx: int,
+        exclude_idx: np.ndarray,
+        limit: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Select the top-``limit`` unseen, non-excluded posts among scored candidates.
+
+        Returns:
+            Post indices and their raw scores, sorted by score (descending)
+        """
+        # Drop non-positive scores, posts the user already interacted with and excluded posts
+        seen_idx = self._matrix.row_indices(user_idx)
+        mask = (candidate_scores > 0) & ~np.isin(candidates, seen_idx)
+        if exclude_idx.size:
+            mask &= ~np.isin(candidates, exclude_idx)
+        candidates = candidates[mask]
+        candidate_scores = candidate_scores[mask]
+
+        # Partial selection, keeping every candidate tied with the k-th score
+        if candidates.size > limit:
+            kth_score = -np.partition(-candidate_scores, limit - 1)[limit - 1]
+            top = candidate_scores >= kth_score
+            candidates = candidates[top]
+            candidate_scores = candidate_scores[top]
+        # Sort the selection by score, then by index so ties break deterministically
+        order = np.lexsort((candidates, -candidate_scores))[:limit]
+        return candidates[order], candidate_scores[order]
+
+    def _to_recommendations(
+        self, user_id: str, post_indices: np.ndarray, post_scores: np.ndarray
+    ) -> list[Recommendation]:
+        """Normalize ranked scores to the 0-1 range and wrap them as recommendations."""
+        if post_scores.size == 0 or post_scores[0] <= 0:
+            return []
+
+        max_score = post_scores[0]
+        return [
+            Recommendation(
+                user_id=user_id,
+                post_id=post_id,
+                score=min(float(score / max_score), 1.0),
+                reason=self.reason,
+            )
+            for post_id, score in zip(self.posts.decode(post_indices), post_scores, strict=True)
+        ]
+
+    def snapshot_state(self) -> tuple[dict[str, np.ndarray], dict[str, Any]] | None:
+        """Trained state as named arrays plus JSON-serializable metadata, for a snapshot.
+
+        Returns:
+            ``None`` if the model has not been trained on any interaction
+        """
+        if self.watermark is None:
+            return None
+
+        arrays = self._snapshot_arrays()
+        if self.user_item_matrix is not None:
+            arrays.update(self._csr_arrays("user_item_matrix", self.user_item_matrix))
+        decay = self.interactions.decay
+        metadata = {
+            "n_users": self.n_users,
+            "n_posts": self.n_posts,
+            "watermark": self.watermark.isoformat(),
+            "watermark_ids": sorted(self._watermark_ids),
+            "decay": None
+            if decay is None
+            else {
+                "half_life_days": decay.half_life_days,
+                "half_life_days_by_type": decay.half_life_days_by_type,
+                "reference": decay.reference.isoformat() if decay.reference else None,
+            },
+        }
+        return arrays, metadata
+
+    def restore_state(self, arrays: dict[str, np.ndarray], metadata: dict[str, Any]) -> None:
+        """Adopt a state written by ``snapshot_state`` instead of training.
+
+        The arrays are used as they are, typically memory-mapped read-only,
+        and must be indexed by this recommender's ID dictionaries.
+        """
+        self.n_users = metadata["n_users"]
+        self.n_posts = metadata["n_posts"]
+        self.watermark = datetime.fromisoformat(metadata["watermark"])
+        self._watermark_ids = set(metadata["watermark_ids"])
+        if (decay := metadata["decay"]) is not None:
+            reference = decay["reference"] and datetime.fromisoformat(decay["reference"])
+            # Folded-in interactions must decay from the reference the model was trained at
+            self.interactions.decay = TimeDecay(
+                decay["half_life_days"], decay["half_life_days_by_type"], reference
+            )
+        if "user_item_matrix.data" in arrays:
+            self.user_item_matrix = self._csr_from_arrays(arrays, "user_item_matrix")
+        self._restore_arrays(arrays)
+
+    def _snapshot_arrays(self) -> dict[str, np.ndarray]:
+        """The subclass's own trained arrays, for ``snapshot_state``."""
+        return {}
+
+    def _restore_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        """Adopt the subclass's own arrays, once the shared state is restored."""
+
+    @staticmethod
+    def _csr_arrays(name: str, matrix: sparse.csr_matrix) -> dict[str, np.ndarray]:
+        """A CSR matrix as arrays named ``{name}.data``, ``.indices``, ``.indptr``, ``.shape``."""
+        return {
+            f"{name}.data": matrix.data,
+            f"{name}.indices": matrix.indices,
+            f"{name}.indptr": matrix.indptr,
+            f"{name}.shape": np.array(matrix.shape, dtype=np.int64),
+        }
+
+    @staticmethod
+    def _csr_from_arrays(arrays: dict[str, np.ndarray], name: str) -> sparse.csr_matrix:
+        """The CSR matrix stored by ``_csr_arrays``, without copying its arrays."""
+        return sparse.csr_matrix(
+            (arrays[f"{name}.data"], arrays[f"{name}.indices"], arrays[f"{name}.indptr"]),
+            shape=tuple(int(n) for n in arrays[f"{name}.shape"]),
+            copy=False,
+        )
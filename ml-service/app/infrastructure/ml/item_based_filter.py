@@ -0,0 +1,251 @@
+"""Item-based collaborative filtering with precomputed post neighbour lists."""
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import InteractionColumns
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
+from app.infrastructure.ml.delta_matrix import DeltaCSRMatrix
+from app.infrastructure.ml.diagnostics import (
+    TrainingDiagnostics,
+    record_training,
+    should_record,
+)
+from app.infrastructure.ml.interaction_matrix import InteractionMatrixRecommender
+
+
+class ItemBasedRecommender(InteractionMatrixRecommender):
+    """Item-based collaborative filtering recommender.
+
+    Training precomputes, for every post, its ``n_similar_posts`` most similar
+    posts by cosine similarity of their user vectors. A user is scored by
+    summing the neighbour lists of their ``n_recent_posts`` most recently
+    touched posts, weighted by their interaction weight, so serving cost does
+    not depend on the number of users.
+    """
+
+    model_version = "item_based_v1"
+    reason = "item_based_filtering"
+
+    def __init__(
+        self,
+        interactions: InteractionColumns | list[Interaction],
+        n_similar_posts: int = 50,
+        n_recent_posts: int = 20,
+        block_size: int = 1024,
+    ):
+        """Initialize recommender with interaction data.
+
+        Args:
+            interactions: User-post interactions, as columns or as entities
+            n_similar_posts: Neighbours kept per post after pruning
+            n_recent_posts: Most recent posts per user used for scoring
+            block_size: Posts per block of the item-item product (bounds peak memory)
+        """
+        super().__init__(interactions)
+        self.n_similar_posts = n_similar_posts
+        self.n_recent_posts = n_recent_posts
+        self.block_size = block_size
+        self.item_similarity: sparse.csr_matrix | None = None
+        self._last_interacted: DeltaCSRMatrix | None = None
+
+    @property
+    def last_interacted(self) -> sparse.csr_matrix | None:
+        """Latest interaction timestamp per (user, post), with updated rows merged in."""
+        if self._last_interacted is None:
+            return None
+        self._last_interacted = self._last_interacted.compacted()
+        return self._last_interacted.base
+
+    @last_interacted.setter
+    def last_interacted(self, matrix: sparse.csr_matrix | None) -> None:
+        self._last_interacted = None if matrix is None else DeltaCSRMatrix(matrix)
+
+    async def train(self) -> None:
+        """Build the user-item matrix and the pruned item-item similarity lists."""
+        if not self.interactions:
+            return
+
+        self._index_ids()
+        self.user_item_matrix = self._build_user_item_matrix(self.interactions)
+        self.last_interacted = self._build_last_interacted(self.interactions)
+        self._advance_watermark(self.interactions)
+
+        self.item_similarity = self._build_item_similarity(self.user_item_matrix)
+
+        if should_record():
+            record_training(
+                TrainingDiagnostics(
+                    params={
+                        "engine": "item_based",
+                        "n_similar_posts": self.n_similar_posts,
+                        "n_recent_posts": self.n_recent_posts,
+                        "n_users": self.n_users,
+                        "n_posts": self.n_posts,
+                        "n_interactions": len(self.interactions),
+                    },
+                    metrics={
+                        "avg_neighbors_per_post": self.item_similarity.nnz / max(self.n_posts, 1)
+                    },
+                )
+            )
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        """Generate recommendations from the neighbours of the user's recent posts."""
+        query = RecommendationQuery(
+            user_id=user_id, limit=limit, exclude_post_ids=exclude_post_ids or []
+        )
+        return self._recommend_batch([query])[0]
+
+    async def generate_batch_recommendations(
+        self, queries: list[RecommendationQuery]
+    ) -> list[list[Recommendation]]:
+        """Generate recommendations for many users with one sparse matrix product."""
+        return self._recommend_batch(queries)
+
+    async def update(self, interactions: list[Interaction]) -> bool:
+        """Fold interactions newer than the watermark into the user histories.
+
+        Item neighbour lists change slowly and are kept until the next full
+        rebuild; posts first seen here have no neighbours until then.
+        """
+        if self.item_similarity is None or self._matrix is None:
+            return False
+
+        interactions = self._unseen_interactions(interactions)
+        if not interactions:
+            return True
+
+        changed = self._fold_in(interactions)
+        self._last_interacted = self._merge_rows(
+            self._last_interacted,
+            changed,
+            self._build_last_interacted(interactions, changed),
+            sparse.csr_matrix.maximum,
+        )
+
+        n_new_posts = self.n_posts - self.item_similarity.shape[0]
+        if n_new_posts:
+            similarity = self.item_similarity
+            self.item_similarity = sparse.csr_matrix(
+                (
+                    similarity.data,
+                    similarity.indices,
+                    np.pad(similarity.indptr, (0, n_new_posts), mode="edge"),
+                ),
+                shape=(self.n_posts, self.n_posts),
+            )
+        return True
+
+    def _snapshot_arrays(self) -> dict[str, np.ndarray]:
+        """The recent-post history and the pruned neighbour lists."""
+        return {
+            **self._csr_arrays("last_interacted", self.last_interacted),
+            **self._csr_arrays("item_similarity", self.item_similarity),
+        }
+
+    def _restore_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        self.last_interacted = self._csr_from_arrays(arrays, "last_interacted")
+        self.item_similarity = self._csr_from_arrays(arrays, "item_similarity")
+
+    def _recommend_batch(self, queries: list[RecommendationQuery]) -> list[list[Recommendation]]:
+        """Score all queries together and rank each user's candidates."""
+        results: list[list[Recommendation]] = [[] for _ in queries]
+        if self.item_similarity is None or self._matrix is None:
+            return results
+
+        # Cold start users have no row in the matrix and keep an empty result
+        known = self._known_queries(queries)
+        if not known:
+            return results
+        user_idx = np.fromiter((idx for _, idx in known), dtype=np.int64, count=len(known))
+
+        # Each history row selects a few short neighbour lists; one product sums them
+        scores = self._recent_history(user_idx) @ self.item_similarity
+
+        for row, (position, idx) in enumerate(known):
+            query = queries[position]
+            post_indices, post_scores = self._top_candidates(
+                scores[row], idx, self._post_indices(query.exclude_post_ids), query.limit
+            )
+            results[position] = self._to_recommendations(query.user_id, post_indices, post_scores)
+
+        return results
+
+    def _recent_history(self, user_idx: np.ndarray) -> sparse.csr_matrix:
+        """Interaction weights of each user's ``n_recent_posts`` most recent posts."""
+        last = self._last_interacted.take(user_idx)
+        rows = np.repeat(np.arange(last.shape[0]), np.diff(last.indptr))
+        keep = self._rank_within_rows(rows, last.data) < self.n_recent_posts
+        recent = sparse.csr_matrix(
+            (np.ones(int(keep.sum()), dtype=np.float32), (rows[keep], last.indices[keep])),
+            shape=last.shape,
+        )
+        return self._matrix.take(user_idx).multiply(recent).tocsr()
+
+    def _build_item_similarity(self, matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Compute cosine item-item similarity in row blocks, pruned to the top neighbours.
+
+        Only one ``block_size`` x n_posts slice of X^T X exists at a time, and
+        each is pruned to ``n_similar_posts`` entries per row before the next.
+        """
+        items = normalize(matrix.T.tocsr(), norm="l2").astype(np.float32)
+        users = items.T.tocsr()
+
+        blocks = [
+            self._prune(items[start : start + self.block_size] @ users, start)
+            for start in range(0, items.shape[0], self.block_size)
+        ]
+        return sparse.vstack(blocks, format="csr", dtype=np.float32)
+
+    def _prune(self, block: sparse.csr_matrix, offset: int) -> sparse.csr_matrix:
+        """Keep each row's ``n_similar_posts`` strongest neighbours, excluding itself."""
+        block = block.tocoo()
+        keep = (block.col != block.row + offset) & (block.data > 0)
+        rows, cols, data = block.row[keep], block.col[keep], block.data[keep]
+
+        keep = self._rank_within_rows(rows, data) < self.n_similar_posts
+        return sparse.csr_matrix(
+            (data[keep], (rows[keep], cols[keep])), shape=block.shape, dtype=np.float32
+        )
+
+    def _build_last_interacted(
+        self, interactions: InteractionColumns, users: np.ndarray | None = None
+    ) -> sparse.csr_matrix:
+        """Build a CSR matrix of the latest interaction timestamp per (user, post).
+
+        Args:
+            interactions: Interactions to take the timestamps from
+            users: Sorted users to build rows for, covering every user in
+                ``interactions``; every user by default
+        """
+        rows = self._row_codes(interactions, users).astype(np.int64)
+        cols = interactions.post_codes.astype(np.int64)
+        # Seconds since the epoch; only their order matters
+        timestamps = interactions.created_at.astype("datetime64[us]").astype(np.float64) / 1e6
+
+        # Newest first within each (user, post) pair, then keep the first of each
+        keys = rows * self.n_posts + cols
+        order = np.lexsort((-timestamps, keys))
+        _, first = np.unique(keys[order], return_index=True)
+        latest = order[first]
+        return sparse.csr_matrix(
+            (timestamps[latest], (rows[latest], cols[latest])),
+            shape=(self.n_users if users is None else users.size, self.n_posts),
+        )
+
+    @staticmethod
+    def _rank_within_rows(rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Rank of each entry among the entries of its row, largest value first."""
+        order = np.lexsort((-values, rows))
+        sorted_rows = rows[order]
+        ranks = np.empty(rows.size, dtype=np.int64)
+        ranks[order] = np.arange(rows.size) - np.searchsorted(sorted_rows, sorted_rows, "left")
+        return ranks
@@ -0,0 +1,130 @@
+"""Groups concurrent single-user recommendation calls into batched model calls."""
+
+import asyncio
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
+from app.domain.services.recommender_interface import RecommenderInterface
+from app.infrastructure.ml.compute_pool import ComputePool
+
+
+class MicroBatcher:
+    """Collects queries per recommender and answers them with one batched call.
+
+    A batch is flushed when it holds ``max_batch_size`` queries or
+    ``max_delay_us`` microseconds after its first query arrived, whichever
+    comes first. The flush runs ``generate_batch_recommendations`` once, so
+    the engines' one kneighbors call and one sparse product serve every
+    user in the batch, and the results are fanned back out to the waiting
+    callers. Queries are grouped by recommender instance, so a batch never
+    mixes the model before and after a swap. With a ``pool``, batches are
+    scored on its workers while the next one fills up.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 64,
+        max_delay_us: float = 500.0,
+        pool: ComputePool | None = None,
+    ):
+        """Create an idle batcher.
+
+        Args:
+            max_batch_size: Queries that trigger an immediate flush
+            max_delay_us: Longest a query waits for others to join its batch
+            pool: Runs the batched calls off the event loop; on the loop by default
+        """
+        self.max_batch_size = max_batch_size
+        self.max_delay_us = max_delay_us
+        self.pool = pool or ComputePool()
+        self._pending: dict[int, tuple[RecommenderInterface, list]] = {}
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.queries = 0
+
+    async def submit(
+        self, recommender: RecommenderInterface, query: RecommendationQuery
+    ) -> list[Recommendation]:
+        """Queue a query for ``recommender`` and await its share of the batch result."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[Recommendation]] = loop.create_future()
+        key = id(recommender)
+        _, batch = self._pending.setdefault(key, (recommender, []))
+        batch.append((query, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.max_delay_us / 1e6, self._flush, key)
+        return await future
+
+    def _flush(self, key: int) -> None:
+        """Start the batched call for one recommender's pending queries."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        recommender, batch = self._pending.pop(key, (None, []))
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(recommender, batch))
+        # Keep a reference until done; the event loop only holds weak ones
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, recommender: RecommenderInterface, batch: list) -> None:
+        """Score a batch and resolve each caller's future."""
+        self.batches += 1
+        self.queries += len(batch)
+        try:
+            results = await self.pool.run(
+                "score", recommender.generate_batch_recommendations, [q for q, _ in batch]
+            )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), recommendations in zip(batch, results, strict=True):
+            # Callers that gave up (cancelled) have a done future already
+            if not future.done():
+                future.set_result(recommendations)
+
+
+class BatchedRecommender(RecommenderInterface):
+    """Recommender whose single-user calls go through a shared ``MicroBatcher``.
+
+    Everything else is delegated to the wrapped recommender.
+    """
+
+    def __init__(self, recommender: RecommenderInterface, batcher: MicroBatcher):
+        self.recommender = recommender
+        self.batcher = batcher
+        self.model_version = recommender.model_version
+        self.watermark = recommender.watermark
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        """Answer one user as part of the next batch."""
+        query = RecommendationQuery(
+            user_id=user_id, limit=limit, exclude_post_ids=exclude_post_ids or []
+        )
+        return await self.batcher.submit(self.recommender, query)
+
+    async def generate_batch_recommendations(
+        self, queries: list[RecommendationQuery]
+    ) -> list[list[Recommendation]]:
+        """Already batched; call the recommender directly."""
+        return await self.recommender.generate_batch_recommendations(queries)
+
+    async def train(self) -> None:
+        await self.recommender.train()
+
+    async def update(self, interactions: list[Interaction]) -> bool:
+        return await self.recommender.update(interactions)
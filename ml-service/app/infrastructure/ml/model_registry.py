@@ -0,0 +1,815 @@
+"""Process-wide registry holding the trained recommenders."""
+
+import asyncio
+import contextlib
+import copy
+import logging
+import weakref
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.model_generation import ModelGeneration
+from app.domain.services.recommender_interface import RecommenderInterface
+from app.infrastructure.cache.single_flight import SingleFlight
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.database.connection import get_async_session
+from app.infrastructure.database.interaction_repository_impl import (
+    SQLAlchemyInteractionRepository,
+)
+from app.infrastructure.ml.compute_pool import ComputePool
+
+
+if TYPE_CHECKING:
+    from app.domain.entities.id_dictionary import IdDictionary
+    from app.domain.entities.interaction_columns import InteractionColumns
+    from app.infrastructure.storage.model_snapshot import ModelSnapshot, ModelSnapshotStore
+
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+RecommenderFactory = Callable[["InteractionColumns"], RecommenderInterface]
+
+# Engine modules (and scikit-learn behind them) are imported by their builder
+# on first training, not when the app starts.
+
+
+def build_user_based_recommender(interactions: "InteractionColumns") -> RecommenderInterface:
+    """Build the user-based collaborative filtering recommender."""
+    from app.infrastructure.ml.collaborative_filter import CollaborativeFilterRecommender
+    from app.infrastructure.ml.neighbors import create_neighbor_index
+
+    settings = get_settings()
+    neighbor_index = create_neighbor_index(
+        settings.neighbor_index,
+        n_tables=settings.lsh_n_tables,
+        n_bits=settings.lsh_n_bits,
+        n_components=settings.lsh_n_components,
+        max_candidates=settings.lsh_max_candidates,
+    )
+    return CollaborativeFilterRecommender(interactions=interactions, neighbor_index=neighbor_index)
+
+
+def build_item_based_recommender(interactions: "InteractionColumns") -> RecommenderInterface:
+    """Build the item-based collaborative filtering recommender."""
+    from app.infrastructure.ml.item_based_filter import ItemBasedRecommender
+
+    settings = get_settings()
+    return ItemBasedRecommender(
+        interactions=interactions,
+        n_similar_posts=settings.item_n_similar_posts,
+        n_recent_posts=settings.item_n_recent_posts,
+    )
+
+
+def build_als_recommender(interactions: "InteractionColumns") -> RecommenderInterface:
+    """Build the implicit ALS matrix factorization recommender."""
+    from app.infrastructure.ml.als_recommender import ImplicitALSRecommender
+
+    settings = get_settings()
+    return ImplicitALSRecommender(
+        interactions=interactions,
+        factors=settings.als_factors,
+        regularization=settings.als_regularization,
+        alpha=settings.als_alpha,
+        iterations=settings.als_iterations,
+        n_workers=settings.als_workers or None,
+    )
+
+
+def build_trending_recommender(interactions: "InteractionColumns") -> RecommenderInterface:
+    """Build the time-decayed popularity recommender used for cold-start users."""
+    from app.infrastructure.ml.trending import TrendingRecommender
+
+    settings = get_settings()
+    return TrendingRecommender(
+        interactions=interactions,
+        half_life_hours=settings.trending_half_life_hours,
+        n_top=settings.trending_n_top,
+    )
+
+
+# Inputs a recommender shares with the registry; a process pool trains copies of them
+SHARED_STATE = ("interactions", "users", "posts")
+
+
+async def train_detached(recommender: RecommenderInterface) -> dict:
+    """Train ``recommender`` and return its trained state, without the shared inputs.
+
+    On a process pool the recommender is trained as a copy in the worker; the
+    caller applies the returned state to its own instance, which keeps the
+    registry's ID dictionaries.
+    """
+    await recommender.train()
+    return {key: value for key, value in vars(recommender).items() if key not in SHARED_STATE}
+
+
+def generation_id(trained_at: datetime, updated_at: datetime | None = None) -> str:
+    """ID of a model generation: its UTC training time, then its last update time if any."""
+    stamp = trained_at.astimezone(UTC).strftime("%Y%m%dT%H%M%S.%fZ")
+    if updated_at is None:
+        return stamp
+    return f"{stamp}+{updated_at.astimezone(UTC).strftime('%Y%m%dT%H%M%S.%fZ')}"
+
+
+def trending_training_window() -> timedelta:
+    """Age past which an interaction adds under a millionth of its trending weight."""
+    return timedelta(hours=get_settings().trending_half_life_hours * 20)
+
+
+# Engines trained on the raw, undecayed interaction rows of a recent window (returned
+# by the function) instead of the shared training columns, which may be pre-aggregated
+# per (user, post) and carry the training decay
+RAW_WINDOW_ENGINES: dict[str, Callable[[], timedelta]] = {"trending": trending_training_window}
+
+# Engines selectable per request or through RECOMMENDER_ENGINE
+RECOMMENDER_FACTORIES: dict[str, RecommenderFactory] = {
+    "user_based": build_user_based_recommender,
+    "item_based": build_item_based_recommender,
+    "als": build_als_recommender,
+    "trending": build_trending_recommender,
+}
+
+
+class ModelRegistry:
+    """Holds one trained recommender per engine, shared by every request.
+
+    The default engine is built at startup; other engines are built the first
+    time a request selects them. Models are rebuilt only by the periodic
+    refresh loop started in the app lifespan or by an explicit call to
+    ``refresh()``, which reloads the interactions once for all built engines.
+    Between rebuilds, a faster loop folds interactions newer than each model's
+    watermark into it with ``update()``. Requests read the current models and
+    never train them themselves, except for the first request for an engine
+    that has not been built yet.
+
+    The trained recommenders are published together as an immutable
+    ``ModelGeneration``: a rebuild trains off to the side, then swaps the
+    registry's reference to a new generation in one assignment. A request
+    pins the current generation with ``acquire()`` and finishes on it; a
+    replaced generation is freed when its last request lets go.
+
+    Builds are single-flight: concurrent refreshes share one rebuild, and
+    concurrent first requests for an engine share one build. A request that
+    arrives before the startup refresh finishes waits for that refresh
+    instead of training the same model again.
+
+    The cold-start engine (``COLD_START_ENGINE``) is built and refreshed
+    together with the default engine and answers users the requested engine
+    has nothing for.
+
+    Every model interns user and post IDs into the same two append-only
+    dictionaries, so an ID keeps its matrix index across rebuilds and, with
+    ``ID_DICTIONARY_DIR`` set, across restarts.
+
+    Training runs on ``training_pool`` and incremental updates on
+    ``compute_pool``, off the event loop when the pools have workers, so
+    the app keeps answering (``/health`` included) during a rebuild. Updates
+    fold into shallow copies of the models and publish them as a new
+    generation, so a request never sees a half-applied update and scoring
+    does not pause for one.
+
+    With ``MODEL_SNAPSHOT_DIR`` set, every rebuild saves the trained models
+    as a memory-mappable snapshot, and a process starting up serves the
+    newest snapshot within milliseconds instead of training first; the
+    incremental updates then catch it up. With ``MODEL_SNAPSHOT_ONLY``, the
+    process never trains the default engine: each refresh reloads the
+    newest snapshot written by a separate training job.
+
+    With ``MODEL_SNAPSHOT_SHARED``, the processes sharing the snapshot
+    directory share one model: the one holding the directory's publisher
+    lock trains, updates and publishes snapshots, the others follow in
+    snapshot-only mode. Followers skip incremental updates, which would copy
+    the mapped arrays into private memory, and poll for newer snapshots
+    instead, so adding a worker adds little beyond its own interpreter. A
+    follower takes the lock over when the publisher exits.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = get_async_session,
+        recommender_factories: dict[str, RecommenderFactory] | None = None,
+        default_engine: str | None = None,
+        refresh_interval_seconds: float | None = None,
+        update_interval_seconds: float | None = None,
+        cold_start_engine: str | None = None,
+        compute_pool: ComputePool | None = None,
+        training_pool: ComputePool | None = None,
+        snapshot_dir: str | None = None,
+        snapshot_only: bool | None = None,
+        snapshot_shared: bool | None = None,
+    ):
+        """Initialize an empty registry.
+
+        Args:
+            session_factory: Async context manager factory yielding DB sessions
+            recommender_factories: Engine name -> builder of an untrained recommender
+            default_engine: Engine used when a request does not select one
+                (``RECOMMENDER_ENGINE`` by default)
+            refresh_interval_seconds: Period of the background rebuild; ``None``
+                or a non-positive value disables the schedule
+            update_interval_seconds: Period of the incremental update; ``None``
+                or a non-positive value disables it
+            cold_start_engine: Fallback engine for users without recommendations
+                (``COLD_START_ENGINE`` by default); empty disables it
+            compute_pool: Runs incremental updates; on the event loop by default
+            training_pool: Runs full rebuilds' training; on the event loop by default
+            snapshot_dir: Directory of model snapshots (``MODEL_SNAPSHOT_DIR`` by
+                default); empty disables them
+            snapshot_only: Only load snapshots, never train the default engine
+                (``MODEL_SNAPSHOT_ONLY`` by default)
+            snapshot_shared: Share the model with the other processes using
+                ``snapshot_dir`` (``MODEL_SNAPSHOT_SHARED`` by default); decides
+                ``snapshot_only`` when the registry starts
+
+        Raises:
+            ValueError: If the default or cold-start engine is unknown
+        """
+        self._session_factory = session_factory
+        self._recommender_factories = recommender_factories or RECOMMENDER_FACTORIES
+        self.default_engine = default_engine or get_settings().recommender_engine
+        if self.default_engine not in self._recommender_factories:
+            raise ValueError(f"Unknown recommender engine: {self.default_engine}")
+        self.cold_start_engine = (
+            get_settings().cold_start_engine if cold_start_engine is None else cold_start_engine
+        )
+        if self.cold_start_engine and self.cold_start_engine not in self._recommender_factories:
+            raise ValueError(f"Unknown recommender engine: {self.cold_start_engine}")
+        settings = get_settings()
+        self.snapshot_dir = settings.model_snapshot_dir if snapshot_dir is None else snapshot_dir
+        self.snapshot_only = (
+            settings.model_snapshot_only if snapshot_only is None else snapshot_only
+        )
+        self.snapshot_shared = bool(self.snapshot_dir) and (
+            settings.model_snapshot_shared if snapshot_shared is None else snapshot_shared
+        )
+        # Version of the snapshot the published models were saved as or loaded from
+        self.snapshot_version: str | None = None
+        self._snapshots: ModelSnapshotStore | None = None
+        self._published_at = 0.0
+        self.compute_pool = compute_pool or ComputePool()
+        self.training_pool = training_pool or ComputePool()
+        self._refresh_interval_seconds = refresh_interval_seconds
+        self._update_interval_seconds = update_interval_seconds
+        self._generation = ModelGeneration(number=0, id="", trained_at=None)
+        # Replaced generations still held by requests; entries vanish once freed
+        self._retired: weakref.WeakSet[ModelGeneration] = weakref.WeakSet()
+        self._lock = asyncio.Lock()
+        self._flights = SingleFlight()
+        self._tasks: list[asyncio.Task] = []
+        # Created on first load, which keeps NumPy out of startup
+        self._users: IdDictionary | None = None
+        self._posts: IdDictionary | None = None
+
+    @property
+    def engines(self) -> list[str]:
+        """Names of the selectable engines."""
+        return list(self._recommender_factories)
+
+    @property
+    def current(self) -> ModelGeneration:
+        """The published generation."""
+        return self._generation
+
+    @property
+    def generation(self) -> int:
+        """Number of the published generation; incremented by every swap."""
+        return self._generation.number
+
+    @property
+    def trained_at(self) -> datetime | None:
+        """When the published generation was trained."""
+        return self._generation.trained_at
+
+    @property
+    def retired_in_use(self) -> int:
+        """Replaced generations not freed yet, because requests still hold them."""
+        return len(self._retired)
+
+    @property
+    def recommender(self) -> RecommenderInterface | None:
+        """Currently published recommender of the default engine, if any."""
+        return self._generation.recommenders.get(self.default_engine)
+
+    async def acquire(self, engine: str | None = None) -> ModelGeneration:
+        """Pin the current generation for a request, once it holds ``engine`` and its fallback.
+
+        Args:
+            engine: Engine name; the default engine when ``None``
+
+        Raises:
+            ValueError: If the engine is unknown
+        """
+        await self.get_recommender(engine)
+        await self.get_cold_start_recommender(engine)
+        return self._generation
+
+    async def get_recommender(self, engine: str | None = None) -> RecommenderInterface:
+        """Get the shared recommender of an engine, building it once if none exists yet.
+
+        Args:
+            engine: Engine name; the default engine when ``None``
+
+        Raises:
+            ValueError: If the engine is unknown
+        """
+        engine = engine or self.default_engine
+        if engine not in self._recommender_factories:
+            raise ValueError(f"Unknown recommender engine: {engine}")
+
+        if engine not in self._generation.recommenders:
+            if engine in (self.default_engine, self.cold_start_engine):
+                # Built by every refresh; join the one in flight (e.g. at startup)
+                await self.warm_start()
+            else:
+                await self._flights.do(("build", engine), lambda: self._build(engine))
+        return self._generation.recommenders[engine]
+
+    async def get_cold_start_recommender(
+        self, engine: str | None = None
+    ) -> RecommenderInterface | None:
+        """Get the fallback recommender for users ``engine`` has nothing for.
+
+        Returns:
+            The cold-start engine's recommender, or ``None`` if it is disabled
+            or is the requested engine itself
+        """
+        if not self.cold_start_engine or self.cold_start_engine == (engine or self.default_engine):
+            return None
+        return await self.get_recommender(self.cold_start_engine)
+
+    async def refresh(self) -> RecommenderInterface:
+        """Rebuild every built engine from the current interactions and publish them.
+
+        Concurrent calls share one rebuild. In snapshot-only mode, the newest
+        snapshot is loaded instead.
+
+        Returns:
+            The new recommender of the default engine
+        """
+        return await self._flights.do("refresh", self._refresh)
+
+    async def warm_start(self) -> RecommenderInterface:
+        """Publish the newest model snapshot if there is one, else rebuild.
+
+        Shares the flight of ``refresh()``, so requests arriving during either
+        wait for the same models.
+
+        Returns:
+            The recommender of the default engine
+        """
+        return await self._flights.do("refresh", lambda: self._refresh(from_snapshot=True))
+
+    async def update(self) -> bool:
+        """Fold interactions newer than each model's watermark into a copy of it.
+
+        The copies that changed are published as a new generation with the same
+        training time and epoch, so requests pinned to the current one keep
+        reading the models as they were, and only the cached responses of the
+        users in the new interactions are dropped. Falls
+        back to a full rebuild for models that cannot update incrementally.
+        The publisher of a shared model saves the updated models as a snapshot
+        at most every ``MODEL_SNAPSHOT_PUBLISH_INTERVAL_SECONDS``; its followers
+        do not update.
+
+        Returns:
+            False if there was no model to update yet, or it is followed
+        """
+        async with self._lock:
+            generation = self._generation
+            if not generation.recommenders or (self.snapshot_shared and self.snapshot_only):
+                return False
+
+            stale = []
+            updated = {}
+            changed_users: set[str] = set()
+            for engine, recommender in generation.recommenders.items():
+                if recommender.watermark is None:
+                    stale.append(engine)
+                    continue
+
+                async with self._session_factory() as session:
+                    repository = SQLAlchemyInteractionRepository(session)
+                    interactions = await repository.get_interactions_since(recommender.watermark)
+
+                # Engines replace the attributes they change, so the published one is untouched
+                candidate = copy.copy(recommender)
+                if not await self.compute_pool.run("update", candidate.update, interactions):
+                    stale.append(engine)
+                elif candidate.watermark != recommender.watermark:
+                    updated[engine] = candidate
+                    # Includes the users of rows at the old watermark, which may be folded already
+                    changed_users.update(interaction.user_id for interaction in interactions)
+
+            if updated:
+                self._publish(
+                    updated,
+                    generation.trained_at,
+                    generation.users,
+                    generation.posts,
+                    updated_at=datetime.now(UTC),
+                    changed_users=changed_users,
+                )
+            if stale:
+                await self._rebuild(stale)
+            elif updated and self.snapshot_shared:
+                interval = get_settings().model_snapshot_publish_interval_seconds
+                if asyncio.get_running_loop().time() - self._published_at >= interval:
+                    await self._save_snapshot()
+            return True
+
+    async def _refresh(self, from_snapshot: bool = False) -> RecommenderInterface:
+        """Rebuild the default, cold-start and built engines under the lock.
+
+        Loads the newest snapshot instead when ``from_snapshot`` or in
+        snapshot-only mode, if it holds the default engine; a cold-start
+        engine it lacks is trained.
+
+        Raises:
+            RuntimeError: In snapshot-only mode, if there is no usable snapshot
+        """
+        async with self._lock:
+            if self.snapshot_dir and (from_snapshot or self.snapshot_only):
+                if await self._restore():
+                    recommenders = self._generation.recommenders
+                    if self.cold_start_engine and self.cold_start_engine not in recommenders:
+                        # Not in the snapshot (e.g. configured since); train it alone
+                        await self._rebuild([self.cold_start_engine])
+                    return self._generation.recommenders[self.default_engine]
+                if self.snapshot_only:
+                    raise RuntimeError(
+                        f"No model snapshot with the {self.default_engine} engine "
+                        f"in {self.snapshot_dir}"
+                    )
+
+            engines = [self.default_engine, self.cold_start_engine, *self._generation.recommenders]
+            engines = [engine for engine in dict.fromkeys(engines) if engine]
+            await self._rebuild(engines)
+            return self._generation.recommenders[self.default_engine]
+
+    async def _build(self, engine: str) -> None:
+        """Build one engine under the lock, unless a refresh built it meanwhile."""
+        async with self._lock:
+            if engine not in self._generation.recommenders:
+                await self._rebuild([engine])
+
+    def follow_in_forked_worker(self) -> None:
+        """Keep the models preloaded before a fork shared with the other workers.
+
+        Updating or rebuilding its own copy would give each worker private
+        pages for the whole model. With ``snapshot_dir``, the workers share
+        the model through it instead: one holds the publisher lock and keeps
+        the model current, the others follow its snapshots. Without it, no
+        loop runs and the preloaded models are served until the restart.
+        """
+        if self.snapshot_dir:
+            self.snapshot_shared = True
+            return
+
+        logger.warning(
+            "No MODEL_SNAPSHOT_DIR to share updates through; serving the preloaded models as is"
+        )
+        self._refresh_interval_seconds = 0
+        self._update_interval_seconds = 0
+
+    async def start(self) -> None:
+        """Start the background refresh and update loops.
+
+        A registry sharing its model first tries to become the publisher; a
+        follower also starts polling for newer snapshots.
+        """
+        if not self._tasks:
+            if self.snapshot_shared:
+                self.snapshot_only = not self._snapshot_store().try_lock_publisher()
+                logger.info(
+                    "%s shared model snapshots in %s",
+                    "Following" if self.snapshot_only else "Publishing",
+                    self.snapshot_dir,
+                )
+            self._tasks = [
+                asyncio.create_task(self._refresh_periodically()),
+                asyncio.create_task(self._update_periodically()),
+            ]
+            if self.snapshot_shared:
+                self._tasks.append(asyncio.create_task(self._follow_periodically()))
+
+    async def stop(self) -> None:
+        """Stop the background loops and hand the publisher role to another process."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        if self._snapshots is not None:
+            self._snapshots.unlock_publisher()
+
+    async def _rebuild(self, engines: list[str]) -> None:
+        """Stream interactions once, train new recommenders for ``engines`` and publish them.
+
+        Must be called with ``self._lock`` held.
+        """
+        inputs = {}
+        with self.training_pool.timed("load"):
+            async with self._session_factory() as session:
+                repository = SQLAlchemyInteractionRepository(session)
+                shared = [engine for engine in engines if engine not in RAW_WINDOW_ENGINES]
+                if shared:
+                    inputs = dict.fromkeys(shared, await self._load_interactions(repository))
+                for engine in engines:
+                    if engine in RAW_WINDOW_ENGINES:
+                        inputs[engine] = await self._load_interactions(
+                            repository, raw_window=RAW_WINDOW_ENGINES[engine]()
+                        )
+
+        rebuilt = {}
+        for engine in engines:
+            recommender = self._recommender_factories[engine](inputs[engine])
+            state = await self.training_pool.run(f"train:{engine}", train_detached, recommender)
+            vars(recommender).update(state)
+            rebuilt[engine] = recommender
+
+        columns = inputs[engines[0]]
+        self._publish(rebuilt, datetime.now(UTC), columns.users, columns.posts)
+        self._save_id_dictionaries()
+        if self.snapshot_dir and not self.snapshot_only:
+            await self._save_snapshot()
+
+    async def _save_snapshot(self) -> None:
+        """Save every published model that supports it as a new snapshot.
+
+        The models, their training time and the ID dictionaries all come from
+        the one generation published when the save starts. Must be called with
+        ``self._lock`` held, so no update modifies a model while it is written.
+        """
+        from app.infrastructure.ml.interaction_matrix import InteractionMatrixRecommender
+        from app.infrastructure.storage.model_snapshot import EngineSnapshot
+
+        generation = self._generation
+        engines = {}
+        for engine, recommender in generation.recommenders.items():
+            if isinstance(recommender, InteractionMatrixRecommender):
+                state = recommender.snapshot_state()
+                if state is not None:
+                    engines[engine] = EngineSnapshot(recommender.model_version, *state)
+        if not engines:
+            return
+
+        try:
+            self.snapshot_version = await asyncio.to_thread(
+                self._snapshot_store().save,
+                generation.trained_at,
+                generation.users,
+                generation.posts,
+                engines,
+                generation.updated_at,
+            )
+            self._published_at = asyncio.get_running_loop().time()
+        except OSError:
+            # Keep serving; the next rebuild tries again
+            logger.exception("Model snapshot not saved to %s", self.snapshot_dir)
+
+    async def _restore(self) -> bool:
+        """Publish the models of the newest snapshot, unless they are published already.
+
+        Must be called with ``self._lock`` held.
+
+        Returns:
+            True if the default engine is now served from the newest snapshot
+        """
+        store = self._snapshot_store()
+        version = store.current_version()
+        if version is None:
+            return False
+        if version == self.snapshot_version:
+            return True
+
+        try:
+            snapshot = await asyncio.to_thread(store.load, version)
+            restored = await asyncio.to_thread(self._restore_engines, snapshot)
+        except (OSError, ValueError, KeyError):
+            logger.exception("Model snapshot %s could not be loaded", version)
+            return False
+        if self.default_engine not in restored:
+            return False
+
+        # The snapshot's models index into its own dictionaries, published with them
+        self._publish(
+            restored,
+            snapshot.trained_at,
+            snapshot.users,
+            snapshot.posts,
+            updated_at=snapshot.updated_at,
+        )
+        self.snapshot_version = version
+        logger.info("Loaded model snapshot %s (%s)", version, ", ".join(restored))
+        return True
+
+    def _publish(
+        self,
+        recommenders: dict[str, RecommenderInterface],
+        trained_at: datetime,
+        users: "IdDictionary",
+        posts: "IdDictionary",
+        updated_at: datetime | None = None,
+        changed_users: set[str] | None = None,
+    ) -> None:
+        """Swap in a new generation: ``recommenders`` replacing their engines in the current one.
+
+        A single reference assignment, so a request sees either generation whole,
+        models and ID dictionaries together. The current generation's other
+        engines are kept only if they index into the same dictionaries; a
+        snapshot with its own dictionaries drops them, to be rebuilt on use.
+
+        Args:
+            recommenders: Engine name -> recommender to publish
+            trained_at: When the models were trained
+            users: User dictionary the models index into
+            posts: Post dictionary the models index into
+            updated_at: When incremental updates last changed the models, if ever
+            changed_users: Users whose rows an incremental update changed; ``None``
+                for trained or restored models, which start a new epoch
+        """
+        previous = self._generation
+        kept = previous.recommenders if previous.users is users and previous.posts is posts else {}
+        number = previous.number + 1
+        if changed_users is None:
+            epoch, user_changes = number, {}
+        else:
+            epoch = previous.epoch
+            user_changes = {**previous.user_changes, **dict.fromkeys(changed_users, number)}
+        self._generation = ModelGeneration(
+            number=number,
+            id=generation_id(trained_at, updated_at),
+            trained_at=trained_at,
+            recommenders={**kept, **recommenders},
+            cold_start_engine=self.cold_start_engine,
+            users=users,
+            posts=posts,
+            updated_at=updated_at,
+            epoch=epoch,
+            user_changes=user_changes,
+        )
+        self._retired.add(previous)
+        logger.info("Published model generation %s", self._generation.id)
+
+    def _restore_engines(self, snapshot: "ModelSnapshot") -> dict[str, RecommenderInterface]:
+        """Recommenders of the snapshot's engines this registry serves, in their saved state.
+
+        Engines saved by another engine version are skipped and trained as usual.
+        """
+        from app.domain.entities.interaction_columns import InteractionColumns
+        from app.infrastructure.ml.interaction_matrix import InteractionMatrixRecommender
+
+        restored = {}
+        for engine, saved in snapshot.engines.items():
+            if engine not in self._recommender_factories:
+                continue
+            columns = InteractionColumns.from_interactions([], snapshot.users, snapshot.posts)
+            recommender = self._recommender_factories[engine](columns)
+            if (
+                not isinstance(recommender, InteractionMatrixRecommender)
+                or recommender.model_version != saved.model_version
+            ):
+                continue
+            recommender.restore_state(saved.arrays, saved.metadata)
+            restored[engine] = recommender
+        return restored
+
+    def _snapshot_store(self) -> "ModelSnapshotStore":
+        """The snapshot directory, opened once; it holds the publisher lock."""
+        if self._snapshots is None:
+            from app.infrastructure.storage.model_snapshot import ModelSnapshotStore
+
+            self._snapshots = ModelSnapshotStore(
+                self.snapshot_dir, keep=get_settings().model_snapshot_keep
+            )
+        return self._snapshots
+
+    async def _load_interactions(
+        self, repository: SQLAlchemyInteractionRepository, raw_window: timedelta | None = None
+    ) -> "InteractionColumns":
+        """Load the training columns from the local snapshot if configured, else from SQL.
+
+        With ``INTERACTION_SNAPSHOT_DIR`` set, only rows newer than the
+        snapshot's watermark are read from the database; the snapshot itself
+        is read with Polars off the event loop. Weights decay with age and
+        old interactions are dropped as configured by ``WEIGHT_HALF_LIFE_DAYS*``
+        and ``TRAINING_WINDOW_DAYS``.
+
+        Args:
+            repository: Interaction repository of the current session
+            raw_window: Load one undecayed row per interaction of this recent
+                window instead (see ``RAW_WINDOW_ENGINES``)
+        """
+        from app.domain.entities.interaction_columns import TimeDecay
+
+        settings = get_settings()
+        users, posts = self._id_dictionaries()
+        decay = TimeDecay(settings.weight_half_life_days, settings.weight_half_life_days_by_type)
+        aggregate = settings.training_aggregate_in_sql and raw_window is None
+        options = {
+            "users": users,
+            "posts": posts,
+            "decay": decay if decay.enabled and raw_window is None else None,
+            "window": raw_window
+            or (
+                timedelta(days=settings.training_window_days)
+                if settings.training_window_days > 0
+                else None
+            ),
+        }
+        if settings.interaction_snapshot_dir:
+            from app.infrastructure.storage.interaction_snapshot import InteractionSnapshot
+
+            snapshot = InteractionSnapshot(settings.interaction_snapshot_dir)
+            await snapshot.sync(repository, batch_size=settings.training_load_batch_size)
+            return await asyncio.to_thread(snapshot.load_columns, aggregate=aggregate, **options)
+
+        load = (
+            repository.load_aggregated_interaction_columns
+            if aggregate
+            else repository.load_interaction_columns
+        )
+        return await load(batch_size=settings.training_load_batch_size, **options)
+
+    def _id_dictionaries(self) -> tuple["IdDictionary", "IdDictionary"]:
+        """The published generation's dictionaries, else ones loaded from ``ID_DICTIONARY_DIR``."""
+        generation = self._generation
+        if generation.users is not None and generation.posts is not None:
+            return generation.users, generation.posts
+        if self._users is None or self._posts is None:
+            from app.domain.entities.id_dictionary import IdDictionary
+
+            directory = get_settings().id_dictionary_dir
+            if directory:
+                self._users = IdDictionary.load(directory, "users")
+                self._posts = IdDictionary.load(directory, "posts")
+            else:
+                self._users, self._posts = IdDictionary(), IdDictionary()
+        return self._users, self._posts
+
+    def _save_id_dictionaries(self) -> None:
+        """Persist the published generation's dictionaries to ``ID_DICTIONARY_DIR``, if set."""
+        generation = self._generation
+        directory = get_settings().id_dictionary_dir
+        if not directory or generation.users is None or generation.posts is None:
+            return
+        try:
+            generation.users.save(directory, "users")
+            generation.posts.save(directory, "posts")
+        except ValueError:
+            # Another process rewrote the files; keep serving with the in-memory indices
+            logger.warning("ID dictionaries at %s diverged; not saved", directory)
+
+    async def _refresh_periodically(self) -> None:
+        """Warm the model on startup unless it was preloaded, then rebuild it periodically.
+
+        A follower of a shared model skips the rebuilds; it swaps in the
+        publisher's snapshots as they appear instead.
+        """
+        refresh = self.warm_start if self.recommender is None else None
+        while True:
+            try:
+                if refresh is not None:
+                    await refresh()
+            except Exception:
+                # Keep serving the previous model; the next tick retries.
+                logger.exception("Model refresh failed")
+
+            if not self._refresh_interval_seconds or self._refresh_interval_seconds <= 0:
+                return
+            await asyncio.sleep(self._refresh_interval_seconds)
+            refresh = None if self.snapshot_shared and self.snapshot_only else self.refresh
+
+    async def _update_periodically(self) -> None:
+        """Apply incremental updates on a short fixed interval."""
+        if not self._update_interval_seconds or self._update_interval_seconds <= 0:
+            return
+
+        while True:
+            await asyncio.sleep(self._update_interval_seconds)
+            try:
+                await self.update()
+            except Exception:
+                logger.exception("Incremental model update failed")
+
+    async def _follow_periodically(self) -> None:
+        """Swap in newer shared snapshots until the publisher role frees up, then take it."""
+        while True:
+            await asyncio.sleep(get_settings().model_snapshot_poll_seconds)
+            if not self.snapshot_only:
+                continue
+            try:
+                store = self._snapshot_store()
+                if store.try_lock_publisher():
+                    logger.info("Taking over publishing model snapshots to %s", self.snapshot_dir)
+                    self.snapshot_only = False
+                elif store.current_version() not in (None, self.snapshot_version):
+                    await self.refresh()
+            except Exception:
+                logger.exception("Following model snapshots failed")
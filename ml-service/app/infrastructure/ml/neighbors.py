@@ -0,0 +1,389 @@
+"""Nearest-neighbour index backends for user similarity search."""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import normalize
+
+from app.infrastructure.ml.delta_matrix import DeltaCSRMatrix
+
+
+class NeighborIndex(ABC):
+    """Cosine k-nearest-neighbour index over the rows of a sparse matrix."""
+
+    name: str = "base"
+
+    @abstractmethod
+    def fit(self, matrix: sparse.csr_matrix) -> "NeighborIndex":
+        """Index every row of ``matrix``."""
+        pass
+
+    @abstractmethod
+    def kneighbors(
+        self, queries: sparse.csr_matrix, n_neighbors: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find the nearest indexed rows for each query row.
+
+        Returns:
+            Cosine distances and row indices, both shaped (n_queries, n_neighbors),
+            closest first. Slots without a neighbour have distance 1 (similarity 0).
+        """
+        pass
+
+    @abstractmethod
+    def partial_fit(self, rows: np.ndarray, row_matrix: sparse.csr_matrix) -> None:
+        """Re-index rows that changed or were appended since ``fit``, and only them.
+
+        Fitted arrays are replaced, not modified, so a shallow copy of the
+        index taken before the call keeps answering from the old rows.
+
+        Args:
+            rows: Sorted indices of the changed rows
+            row_matrix: Their current content, one row per index in ``rows``
+        """
+        pass
+
+    def get_params(self) -> dict[str, float | int | str]:
+        """Tuning parameters, for experiment logging."""
+        return {"algorithm": self.name}
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Fitted arrays worth persisting in a model snapshot; none by default."""
+        return {}
+
+    def restore(self, matrix: sparse.csr_matrix, state: dict[str, np.ndarray]) -> "NeighborIndex":
+        """Index ``matrix`` reusing a saved ``state``; the default fits from scratch."""
+        return self.fit(matrix)
+
+
+class BruteForceIndex(NeighborIndex):
+    """Exact search: every query is compared against every indexed row.
+
+    The rows are kept as given, with their norms, and changed rows are held
+    aside (see ``DeltaCSRMatrix``), so neither fitting nor an update copies
+    the matrix.
+    """
+
+    name = "brute"
+
+    # Similarities computed at once per block of queries (64 MiB of float32)
+    block_elements = 16 * 1024 * 1024
+
+    def __init__(self):
+        self.estimator: NearestNeighbors | None = None
+        self._rows: DeltaCSRMatrix | None = None
+        self._norms: np.ndarray | None = None  # L2 norm of each row of the fitted matrix
+
+    def fit(self, matrix: sparse.csr_matrix) -> "BruteForceIndex":
+        """Store the matrix and its row norms for exhaustive cosine search."""
+        # Fitting only validates and stores the matrix; kept as the model logged with experiments
+        self.estimator = NearestNeighbors(metric="cosine", algorithm="brute")
+        self.estimator.fit(matrix)
+        self._rows = DeltaCSRMatrix(matrix)
+        self._norms = _row_norms(matrix)
+        return self
+
+    def partial_fit(self, rows: np.ndarray, row_matrix: sparse.csr_matrix) -> None:
+        """Replace the changed rows; the fitted ones are not copied."""
+        self._rows = self._rows.replace_rows(rows, row_matrix)
+
+    def kneighbors(
+        self, queries: sparse.csr_matrix, n_neighbors: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Exact cosine neighbours of each query row."""
+        matrix = self._rows
+        queries = normalize(queries, norm="l2", copy=True).astype(np.float32)
+        distances = np.ones((queries.shape[0], n_neighbors), dtype=np.float32)
+        indices = np.zeros((queries.shape[0], n_neighbors), dtype=np.int64)
+        k = min(n_neighbors, matrix.shape[0])
+        if k == 0:
+            return distances, indices
+
+        block_size = max(1, self.block_elements // matrix.shape[0])
+        for start in range(0, queries.shape[0], block_size):
+            block = queries[start : start + block_size]
+            similarities = np.zeros((block.shape[0], matrix.shape[0]), dtype=np.float32)
+            similarities[:, : matrix.base.shape[0]] = _cosine(block, matrix.base, self._norms)
+            if matrix.rows.size:
+                similarities[:, matrix.rows] = _cosine(
+                    block, matrix.delta, _row_norms(matrix.delta)
+                )
+
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            top_similarities = np.take_along_axis(similarities, top, axis=1)
+            order = np.argsort(-top_similarities, axis=1, kind="stable")
+            end = start + block.shape[0]
+            distances[start:end, :k] = np.clip(
+                1 - np.take_along_axis(top_similarities, order, axis=1), 0, 2
+            )
+            indices[start:end, :k] = np.take_along_axis(top, order, axis=1)
+
+        return distances, indices
+
+
+class RandomProjectionLSHIndex(NeighborIndex):
+    """Approximate search with random-hyperplane (SimHash) locality-sensitive hashing.
+
+    User rows are first reduced to ``n_components`` dimensions with a truncated
+    SVD, where users with shared tastes have a much smaller angle than in the raw
+    sparse space. Each of ``n_tables`` tables then hashes a reduced vector to
+    ``n_bits`` sign bits of random projections, so similar users tend to share a
+    bucket. Candidates from the query's buckets are re-ranked by exact cosine
+    similarity on the original rows.
+
+    Recall rises with more tables and falls with more bits; latency does the
+    opposite. ``max_candidates`` bounds the re-ranking work per query, keeping
+    the candidates found in the most tables.
+    """
+
+    name = "lsh"
+
+    def __init__(
+        self,
+        n_tables: int = 16,
+        n_bits: int = 10,
+        n_components: int = 64,
+        max_candidates: int = 2000,
+        random_state: int = 0,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            n_tables: Number of independent hash tables (higher recall, more work)
+            n_bits: Sign bits per table, at most 64 (smaller buckets, lower recall)
+            n_components: Dimensions of the reduced user vectors that are hashed
+            max_candidates: Cap on candidates re-ranked per query
+            random_state: Seed for the SVD and the projection
+        """
+        if not 1 <= n_bits <= 64:
+            raise ValueError(f"n_bits must be between 1 and 64, got {n_bits}")
+
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_components = n_components
+        self.max_candidates = max_candidates
+        self.random_state = random_state
+        self._svd: TruncatedSVD | None = None
+        self._projection: np.ndarray | None = None
+        self._normalized: DeltaCSRMatrix | None = None
+        self._codes: np.ndarray | None = None  # (n_rows, n_tables)
+        self._order: np.ndarray | None = None  # rows sorted by code, per table
+        self._sorted_codes: np.ndarray | None = None
+
+    def fit(self, matrix: sparse.csr_matrix) -> "RandomProjectionLSHIndex":
+        """Learn the reduction and hash every row into all tables."""
+        normalized = normalize(matrix, norm="l2", copy=True).astype(np.float32)
+        self._normalized = DeltaCSRMatrix(normalized)
+
+        n_components = max(1, min(self.n_components, min(matrix.shape) - 1))
+        self._svd = TruncatedSVD(n_components=n_components, random_state=self.random_state)
+        self._svd.fit(normalized)
+
+        rng = np.random.default_rng(self.random_state)
+        self._projection = rng.standard_normal(
+            (n_components, self.n_tables * self.n_bits), dtype=np.float32
+        )
+
+        self._codes = self._hash(normalized)
+        self._sort_buckets()
+        return self
+
+    def partial_fit(self, rows: np.ndarray, row_matrix: sparse.csr_matrix) -> None:
+        """Re-hash only the changed rows with the existing reduction.
+
+        Each table drops the changed rows' old entries and inserts the new ones
+        at their ``searchsorted`` positions; no other row is normalized, hashed
+        or re-sorted.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        normalized = normalize(row_matrix, norm="l2", copy=True).astype(np.float32)
+        new_codes = self._hash(normalized)
+
+        n_rows = max(self._codes.shape[0], int(rows[-1]) + 1 if rows.size else 0)
+        codes = np.zeros((n_rows, self.n_tables), dtype=np.uint64)
+        codes[: self._codes.shape[0]] = self._codes
+        codes[rows] = new_codes
+
+        stale = np.zeros(n_rows, dtype=bool)
+        stale[rows] = True
+        order, sorted_codes = [], []
+        for table in range(self.n_tables):
+            keep = ~stale[self._order[table]]
+            kept_codes = self._sorted_codes[table][keep]
+            by_code = np.argsort(new_codes[:, table], kind="stable")
+            at = np.searchsorted(kept_codes, new_codes[by_code, table], side="right")
+            order.append(np.insert(self._order[table][keep], at, rows[by_code]))
+            sorted_codes.append(np.insert(kept_codes, at, new_codes[by_code, table]))
+
+        self._normalized = self._normalized.replace_rows(rows, normalized)
+        self._codes = codes
+        self._order = np.stack(order)
+        self._sorted_codes = np.stack(sorted_codes)
+
+    def state(self) -> dict[str, np.ndarray]:
+        """The learned reduction, the normalized rows, the projection and the hash tables."""
+        if self._codes is None:
+            return {}
+        self._normalized = self._normalized.compacted()
+        normalized = self._normalized.base
+        return {
+            "components": self._svd.components_,
+            "normalized.data": normalized.data,
+            "normalized.indices": normalized.indices,
+            "normalized.indptr": normalized.indptr,
+            "projection": self._projection,
+            "codes": self._codes,
+            "order": self._order,
+            "sorted_codes": self._sorted_codes,
+        }
+
+    def restore(
+        self, matrix: sparse.csr_matrix, state: dict[str, np.ndarray]
+    ) -> "RandomProjectionLSHIndex":
+        """Reuse saved hash tables; refit if there are none or they used other parameters."""
+        if (
+            not state
+            or state["codes"].shape[0] > matrix.shape[0]
+            or state["codes"].shape[1] != self.n_tables
+            or state["projection"].shape[1] != self.n_tables * self.n_bits
+        ):
+            return self.fit(matrix)
+
+        components = state["components"]
+        self._svd = TruncatedSVD(n_components=components.shape[0])
+        self._svd.components_ = components
+        self._svd.n_features_in_ = components.shape[1]
+        self._projection = state["projection"]
+        # Saved rather than recomputed, so processes restoring it share one copy
+        normalized_indptr = state["normalized.indptr"]
+        self._normalized = DeltaCSRMatrix(
+            sparse.csr_matrix(
+                (state["normalized.data"], state["normalized.indices"], normalized_indptr),
+                shape=(normalized_indptr.size - 1, matrix.shape[1]),
+                copy=False,
+            )
+        )
+        self._codes = state["codes"]
+        self._order = state["order"]
+        self._sorted_codes = state["sorted_codes"]
+        return self
+
+    def kneighbors(
+        self, queries: sparse.csr_matrix, n_neighbors: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Approximate cosine neighbours of each query row."""
+        queries = normalize(queries, norm="l2", copy=True).astype(np.float32)
+        query_codes = self._hash(queries)
+        n_columns = self._normalized.shape[1]
+
+        # Bucket boundaries for every (query, table) pair in one pass per table
+        lo = np.empty(query_codes.shape, dtype=np.int64)
+        hi = np.empty(query_codes.shape, dtype=np.int64)
+        for table in range(self.n_tables):
+            lo[:, table] = np.searchsorted(self._sorted_codes[table], query_codes[:, table], "left")
+            hi[:, table] = np.searchsorted(
+                self._sorted_codes[table], query_codes[:, table], "right"
+            )
+
+        distances = np.ones((queries.shape[0], n_neighbors), dtype=np.float32)
+        indices = np.zeros((queries.shape[0], n_neighbors), dtype=np.int64)
+        for q in range(queries.shape[0]):
+            candidates = self._top_candidates(
+                np.concatenate([self._order[t, lo[q, t] : hi[q, t]] for t in range(self.n_tables)])
+            )
+            if candidates.size == 0:
+                continue
+
+            # Exact cosine re-ranking of the candidates
+            similarities = (
+                (self._normalized.take(candidates) @ _with_columns(queries[q], n_columns).T)
+                .toarray()
+                .ravel()
+            )
+            k = min(n_neighbors, candidates.size)
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top = top[np.argsort(-similarities[top], kind="stable")]
+            distances[q, :k] = np.clip(1 - similarities[top], 0, 2)
+            indices[q, :k] = candidates[top]
+
+        return distances, indices
+
+    def get_params(self) -> dict[str, float | int | str]:
+        """Tuning parameters, for experiment logging."""
+        return {
+            "algorithm": self.name,
+            "n_tables": self.n_tables,
+            "n_bits": self.n_bits,
+            "n_components": self.n_components,
+            "max_candidates": self.max_candidates,
+        }
+
+    def _top_candidates(self, hits: np.ndarray) -> np.ndarray:
+        """Up to ``max_candidates`` rows sharing the most buckets with the query.
+
+        Rows colliding in more tables are more likely to be close, so the cap
+        drops those sharing the fewest buckets rather than the newest rows.
+        """
+        candidates, collisions = np.unique(hits, return_counts=True)
+        if candidates.size <= self.max_candidates:
+            return candidates
+        top = np.argpartition(-collisions, self.max_candidates - 1)[: self.max_candidates]
+        return candidates[top]
+
+    def _hash(self, rows: sparse.csr_matrix) -> np.ndarray:
+        """Pack the projection sign bits of each reduced row into one uint64 code per table."""
+        # Columns appended after fit (new posts) are outside the learned reduction
+        n_features = self._svd.components_.shape[1]
+        reduced = normalize(self._svd.transform(rows[:, :n_features]))
+        bits = (reduced @ self._projection > 0).reshape(rows.shape[0], self.n_tables, self.n_bits)
+        weights = np.left_shift(np.uint64(1), np.arange(self.n_bits, dtype=np.uint64))
+        return (bits.astype(np.uint64) * weights).sum(axis=2, dtype=np.uint64)
+
+    def _sort_buckets(self) -> None:
+        """Sort rows by code in every table so buckets are contiguous ranges."""
+        self._order = np.argsort(self._codes.T, axis=1, kind="stable")
+        self._sorted_codes = np.take_along_axis(self._codes.T, self._order, axis=1)
+
+
+def _row_norms(matrix: sparse.csr_matrix) -> np.ndarray:
+    """L2 norm of each row of a sparse matrix."""
+    return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float32).ravel())
+
+
+def _with_columns(matrix: sparse.csr_matrix, n_columns: int) -> sparse.csr_matrix:
+    """``matrix`` cut or empty-padded to ``n_columns`` columns.
+
+    Posts appended after a row was indexed have no entries in it, so they
+    contribute nothing to a dot product with it.
+    """
+    if matrix.shape[1] > n_columns:
+        return matrix[:, :n_columns]
+    return sparse.csr_matrix(
+        (matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], n_columns)
+    )
+
+
+def _cosine(queries: sparse.csr_matrix, rows: sparse.csr_matrix, norms: np.ndarray) -> np.ndarray:
+    """Dense cosine similarities of L2-normalized queries to ``rows`` with the given norms."""
+    dots = (_with_columns(queries, rows.shape[1]) @ rows.T).toarray().astype(np.float32)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+def create_neighbor_index(kind: str = "brute", **params: int | float) -> NeighborIndex:
+    """Create a neighbour index by name.
+
+    Args:
+        kind: ``"brute"`` for exact search or ``"lsh"`` for random-projection LSH
+        **params: Constructor arguments for the LSH index (ignored by brute force)
+
+    Returns:
+        Unfitted neighbour index
+    """
+    if kind == BruteForceIndex.name:
+        return BruteForceIndex()
+    if kind == RandomProjectionLSHIndex.name:
+        return RandomProjectionLSHIndex(**params)
+    raise ValueError(f"Unknown neighbor index: {kind}")
@@ -0,0 +1,133 @@
+"""Offline precompute of top-N recommendations into the user_recommendation table."""
+
+import csv
+import io
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
+from app.domain.services.recommender_interface import RecommenderInterface
+from app.infrastructure.database.models import UserInteraction
+from app.infrastructure.ml.model_registry import ModelRegistry
+
+
+STAGING_TABLE = "user_recommendation_staging"
+COLUMNS = "id, user_id, post_id, score, generated_at, expires_at"
+
+
+def get_active_user_ids(session: Session, since: datetime) -> list[str]:
+    """Get IDs of users with at least one interaction since ``since``.
+
+    Args:
+        session: Database session
+        since: Start of the activity window
+
+    Returns:
+        List of user IDs
+    """
+    stmt = select(UserInteraction.user_id).where(UserInteraction.created_at >= since).distinct()
+    return list(session.execute(stmt).scalars().all())
+
+
+async def precompute_recommendations(
+    session: Session,
+    recommender: RecommenderInterface,
+    top_n: int = 150,
+    block_size: int = 1000,
+    ttl_hours: float = 24,
+    active_days: int = 30,
+) -> dict[str, Any]:
+    """Compute top-N recommendations for all active users and publish them as one generation.
+
+    Users are scored in blocks through ``generate_batch_recommendations`` and each
+    block is streamed with COPY into a temporary staging table. The previous
+    generation is then replaced in a single transaction, so readers see either
+    the old rows or the new ones, never a mix.
+
+    Args:
+        session: Synchronous database session (must be backed by psycopg2)
+        recommender: Trained recommender
+        top_n: Recommendations stored per user; at least the API's maximum limit
+            of 100 plus headroom for excluded posts, or requests fall back to online
+            scoring
+        block_size: Users scored per batch call
+        ttl_hours: Lifetime of the generation before it counts as expired
+        active_days: Users active within this many days are precomputed
+
+    Returns:
+        Statistics about the written generation
+    """
+    generated_at = datetime.now(UTC).replace(tzinfo=None)
+    expires_at = generated_at + timedelta(hours=ttl_hours)
+    user_ids = get_active_user_ids(session, generated_at - timedelta(days=active_days))
+
+    # Raw DBAPI cursor on the session's connection so COPY shares its transaction
+    cursor = session.connection().connection.cursor()
+    cursor.execute(
+        f"CREATE TEMP TABLE {STAGING_TABLE} "
+        "(LIKE user_recommendation INCLUDING DEFAULTS) ON COMMIT DROP"
+    )
+
+    rows_written = 0
+    for start in range(0, len(user_ids), block_size):
+        queries = [
+            RecommendationQuery(user_id=user_id, limit=top_n)
+            for user_id in user_ids[start : start + block_size]
+        ]
+        batches = await recommender.generate_batch_recommendations(queries)
+        rows_written += _copy_block(cursor, batches, generated_at, expires_at)
+
+    # Atomic generation swap
+    cursor.execute("DELETE FROM user_recommendation")
+    cursor.execute(
+        f"INSERT INTO user_recommendation ({COLUMNS}) SELECT {COLUMNS} FROM {STAGING_TABLE}"
+    )
+    session.commit()
+
+    return {
+        "users": len(user_ids),
+        "recommendations": rows_written,
+        "generated_at": generated_at.isoformat(),
+        "expires_at": expires_at.isoformat(),
+    }
+
+
+async def run_precompute(session: Session, **kwargs: Any) -> dict[str, Any]:
+    """Train a fresh recommender from the current interactions and precompute with it.
+
+    Args:
+        session: Synchronous database session used for writing
+        **kwargs: Forwarded to ``precompute_recommendations``
+
+    Returns:
+        Statistics about the written generation
+    """
+    recommender = await ModelRegistry(refresh_interval_seconds=None).refresh()
+    return await precompute_recommendations(session, recommender, **kwargs)
+
+
+def _copy_block(
+    cursor: Any,
+    batches: list[list[Recommendation]],
+    generated_at: datetime,
+    expires_at: datetime,
+) -> int:
+    """Stream one block of recommendations into the staging table with COPY."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = 0
+    for recommendations in batches:
+        for rec in recommendations:
+            writer.writerow(
+                (uuid4(), rec.user_id, rec.post_id, rec.score, generated_at, expires_at)
+            )
+            rows += 1
+
+    if rows:
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {STAGING_TABLE} ({COLUMNS}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return rows
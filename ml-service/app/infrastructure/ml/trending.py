@@ -0,0 +1,178 @@
+"""Time-decayed popularity recommender for users without history."""
+
+from dataclasses import replace
+
+import numpy as np
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import InteractionColumns
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
+from app.infrastructure.ml.interaction_matrix import InteractionMatrixRecommender
+
+
+# Largest growth exponent (in half-lives past the anchor) before scores are rebased
+_MAX_EXPONENT = 512.0
+_MICROSECONDS_PER_HOUR = 3_600_000_000
+
+
+class TrendingRecommender(InteractionMatrixRecommender):
+    """Ranks posts by their time-decayed interaction weight across all users.
+
+    A post's score sums its interaction weights, each halved every
+    ``half_life_hours`` of age. Scores are kept as float64 growth terms
+    ``2 ** ((created_at - anchor) / half_life)`` relative to a fixed anchor,
+    so an update only adds the new interactions' terms. Older terms fall
+    behind as newer ones grow, which is the decay, and the common scale does
+    not change the ranking. The anchor moves forward, rescaling every score
+    once, before the terms could overflow.
+
+    The best ``n_top`` posts are sorted after training and after each
+    update. A request walks that list, skipping excluded posts, in
+    O(limit), and needs no history, so it answers cold-start users. Uses the
+    shared ID dictionaries, watermark and ranking of the matrix engines but
+    no user-item matrix.
+
+    Each interaction must keep its own timestamp, so the engine trains on raw
+    rows only (see ``RAW_WINDOW_ENGINES`` in the model registry), never on
+    columns pre-aggregated per (user, post).
+    """
+
+    model_version = "trending_v1"
+    reason = "trending"
+
+    def __init__(
+        self,
+        interactions: InteractionColumns | list[Interaction],
+        half_life_hours: float = 24.0,
+        n_top: int = 1000,
+    ):
+        """Initialize recommender with interaction data.
+
+        Args:
+            interactions: User-post interactions, as columns or as entities
+            half_life_hours: Age at which an interaction counts half
+            n_top: Posts kept in the precomputed ranking
+        """
+        super().__init__(interactions)
+        self.half_life_hours = half_life_hours
+        self.n_top = n_top
+        self.scores = np.empty(0, dtype=np.float64)
+        self.anchor: np.datetime64 | None = None
+        self.top_posts = np.empty(0, dtype=np.int64)
+        self.top_scores = np.empty(0, dtype=np.float64)
+
+    async def train(self) -> None:
+        """Sum the decayed weights per post and rank the posts.
+
+        Raises:
+            ValueError: If the interactions are pre-aggregated per (user, post)
+        """
+        if self.interactions.weight_sums is not None:
+            # A pair's sum carries the training decay and only its latest timestamp
+            raise ValueError("Trending needs raw interaction rows, not pre-aggregated pairs")
+        if not self.interactions:
+            return
+
+        self._index_ids()
+        self.scores = np.zeros(self.n_posts, dtype=np.float64)
+        self.anchor = self.interactions.created_at.max()
+        self._add(self.interactions)
+        self._advance_watermark(self.interactions)
+        self._rank()
+
+    async def update(self, interactions: list[Interaction]) -> bool:
+        """Add the terms of interactions newer than the watermark and re-rank."""
+        if self.anchor is None:
+            return False
+
+        columns = self._unseen_interactions(interactions)
+        if not columns:
+            return True
+
+        self._index_ids()
+        # A padded copy: _add works in place, and the published scores must stay as they are
+        self.scores = np.pad(self.scores, (0, self.n_posts - self.scores.size))
+        self._add(columns)
+        self._advance_watermark(columns)
+        self._rank()
+        return True
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        """Return the top trending posts, whoever the user is."""
+        query = RecommendationQuery(
+            user_id=user_id, limit=limit, exclude_post_ids=exclude_post_ids or []
+        )
+        return self._recommend_batch([query])[0]
+
+    async def generate_batch_recommendations(
+        self, queries: list[RecommendationQuery]
+    ) -> list[list[Recommendation]]:
+        """Answer every query from the same precomputed ranking."""
+        return self._recommend_batch(queries)
+
+    def _snapshot_arrays(self) -> dict[str, np.ndarray]:
+        """The growth-term scores, their anchor and the ranking."""
+        return {
+            "scores": self.scores,
+            "anchor": np.array([self.anchor]),
+            "top_posts": self.top_posts,
+            "top_scores": self.top_scores,
+        }
+
+    def _restore_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        self.scores = arrays["scores"]
+        self.anchor = arrays["anchor"][0]
+        self.top_posts = arrays["top_posts"]
+        self.top_scores = arrays["top_scores"]
+
+    def _recommend_batch(self, queries: list[RecommendationQuery]) -> list[list[Recommendation]]:
+        """Slice the ranking per query, skipping its excluded posts."""
+        results = []
+        for query in queries:
+            exclude_idx = self._post_indices(query.exclude_post_ids)
+            # Excluded posts can only push the answer this far down the list
+            head = slice(0, query.limit + exclude_idx.size)
+            keep = ~np.isin(self.top_posts[head], exclude_idx)
+            results.append(
+                self._to_recommendations(
+                    query.user_id,
+                    self.top_posts[head][keep][: query.limit],
+                    self.top_scores[head][keep][: query.limit],
+                )
+            )
+        return results
+
+    def _add(self, interactions: InteractionColumns) -> None:
+        """Add each interaction's growth term to its post's score."""
+        # Raw rows: this engine's decay replaces the training decay weights() would apply
+        weights = replace(interactions, decay=None).weights().astype(np.float64)
+        exponents = self._exponents(interactions.created_at)
+        if exponents.max() > _MAX_EXPONENT:
+            newest = interactions.created_at.max()
+            self.scores *= np.exp2(-self._exponents(np.array([newest]))[0])
+            self.anchor = newest
+            exponents = self._exponents(interactions.created_at)
+
+        self.scores += np.bincount(
+            interactions.post_codes, weights=weights * np.exp2(exponents), minlength=self.n_posts
+        )
+
+    def _exponents(self, created_at: np.ndarray) -> np.ndarray:
+        """Half-lives elapsed between the anchor and each timestamp."""
+        elapsed = (created_at - self.anchor).astype("timedelta64[us]").astype(np.float64)
+        return elapsed / (self.half_life_hours * _MICROSECONDS_PER_HOUR)
+
+    def _rank(self) -> None:
+        """Sort the ``n_top`` best-scored posts, ties by index."""
+        positive = np.flatnonzero(self.scores > 0)
+        if positive.size > self.n_top:
+            kth = np.partition(-self.scores[positive], self.n_top - 1)[self.n_top - 1]
+            positive = positive[-self.scores[positive] <= kth]
+        order = np.lexsort((positive, -self.scores[positive]))[: self.n_top]
+        self.top_posts = positive[order]
+        self.top_scores = self.scores[self.top_posts]
@@ -0,0 +1,90 @@
+"""Resident and proportional memory of the serving processes, read from ``/proc``."""
+
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+_PROC = Path("/proc")
+
+
+@dataclass
+class ProcessMemory:
+    """Memory of one process, in bytes.
+
+    ``rss`` counts every resident page the process maps; ``pss`` divides
+    each page by the number of processes sharing it, so the PSS of a group
+    of processes sums to the memory they really use together.
+    """
+
+    pid: int
+    role: str
+    rss: int
+    pss: int
+    shared: int
+    private: int
+
+    def as_dict(self) -> dict[str, int | str]:
+        return asdict(self)
+
+
+def read_process_memory(pid: int, role: str = "process") -> ProcessMemory | None:
+    """Read a process's memory from ``/proc/<pid>/smaps_rollup``.
+
+    Args:
+        pid: Process ID
+        role: Label reported with the figures, e.g. ``"master"`` or ``"worker"``
+
+    Returns:
+        The memory, or ``None`` if the process is gone or ``/proc`` does not
+        provide it (non-Linux systems, kernels before 4.14)
+    """
+    try:
+        lines = (_PROC / str(pid) / "smaps_rollup").read_text().splitlines()
+    except OSError:
+        return None
+
+    kib: dict[str, int] = {}
+    for line in lines[1:]:
+        name, value, *_ = line.split()
+        kib[name.rstrip(":")] = int(value)
+    return ProcessMemory(
+        pid=pid,
+        role=role,
+        rss=kib.get("Rss", 0) * 1024,
+        pss=kib.get("Pss", 0) * 1024,
+        shared=(kib.get("Shared_Clean", 0) + kib.get("Shared_Dirty", 0)) * 1024,
+        private=(kib.get("Private_Clean", 0) + kib.get("Private_Dirty", 0)) * 1024,
+    )
+
+
+def child_pids(pid: int) -> list[int]:
+    """IDs of the live child processes of ``pid``."""
+    children = []
+    for entry in _PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses; fields follow the last ")"
+        parent = int(stat.rsplit(")", 1)[1].split()[1])
+        if parent == pid:
+            children.append(int(entry.name))
+    return sorted(children)
+
+
+def serving_processes(master_pid: int | None = None) -> list[ProcessMemory]:
+    """Memory of a preforking master and its workers, or of this process alone.
+
+    Args:
+        master_pid: Process the workers were forked from; ``None`` when this
+            process serves on its own
+    """
+    if master_pid is None:
+        pids = [(os.getpid(), "process")]
+    else:
+        pids = [(master_pid, "master")] + [(pid, "worker") for pid in child_pids(master_pid)]
+    processes = (read_process_memory(pid, role) for pid, role in pids)
+    return [process for process in processes if process is not None]
@@ -0,0 +1,231 @@
+"""Versioned snapshots of trained models as memory-mappable NumPy files."""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.domain.entities.id_dictionary import IdDictionary
+
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout changes; snapshots of another format are not loaded
+FORMAT_VERSION = 2
+_CURRENT_FILE = "CURRENT"
+_MANIFEST_FILE = "manifest.json"
+_PUBLISHER_LOCK_FILE = ".publisher.lock"
+
+
+@dataclass
+class EngineSnapshot:
+    """One engine's trained state: named arrays plus JSON metadata."""
+
+    model_version: str
+    arrays: dict[str, np.ndarray]
+    metadata: dict[str, Any]
+
+
+@dataclass
+class ModelSnapshot:
+    """The engines saved by one rebuild, with the ID dictionaries they index into."""
+
+    version: str
+    trained_at: datetime
+    users: IdDictionary
+    posts: IdDictionary
+    engines: dict[str, EngineSnapshot]
+    # When incremental updates last changed the models, if they did
+    updated_at: datetime | None = None
+
+
+class ModelSnapshotStore:
+    """Directory of model snapshots, one immutable subdirectory per version.
+
+    Layout::
+
+        root/
+          CURRENT                  # name of the newest complete snapshot
+          20250101T120000.000000Z/
+            manifest.json          # format, training time, engines and their arrays
+            users.keys.npy, users.order.npy, posts.keys.npy, posts.order.npy
+            user_based/user_item_matrix.data.npy, ...
+
+    A snapshot is written to a hidden temporary directory, renamed into
+    place and only then published by replacing ``CURRENT``, so readers
+    never see a partial one. Arrays are loaded with ``np.load(mmap_mode="r")``:
+    loading costs a few milliseconds whatever the model size, and the pages
+    are read from the OS page cache on first access, shared by every process
+    mapping the same files. Only the ``keep`` newest snapshots are kept.
+
+    Processes sharing a directory (e.g. uvicorn workers) elect a single
+    publisher with ``try_lock_publisher``; the lock is released when the
+    publisher exits, so another process can take over.
+    """
+
+    def __init__(self, root: str | Path, keep: int = 2):
+        """Open (or create on first save) a snapshot directory.
+
+        Args:
+            root: Directory holding the snapshots
+            keep: Snapshots kept after each save, the new one included
+        """
+        self.root = Path(root)
+        self.keep = max(keep, 1)
+        self._publisher_lock = None
+
+    def current_version(self) -> str | None:
+        """Version of the newest complete snapshot, if any."""
+        path = self.root / _CURRENT_FILE
+        if not path.exists():
+            return None
+        return path.read_text().strip() or None
+
+    def try_lock_publisher(self) -> bool:
+        """Become the directory's single publisher, unless another process is.
+
+        Returns:
+            True if this store holds the publisher lock (now or already)
+        """
+        if self._publisher_lock is not None:
+            return True
+        self.root.mkdir(parents=True, exist_ok=True)
+        lock = open(self.root / _PUBLISHER_LOCK_FILE, "a")  # noqa: SIM115 - held until unlocked
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return False
+        self._publisher_lock = lock
+        return True
+
+    def unlock_publisher(self) -> None:
+        """Give up the publisher lock, if held."""
+        if self._publisher_lock is not None:
+            self._publisher_lock.close()
+            self._publisher_lock = None
+
+    def save(
+        self,
+        trained_at: datetime,
+        users: IdDictionary,
+        posts: IdDictionary,
+        engines: dict[str, EngineSnapshot],
+        updated_at: datetime | None = None,
+    ) -> str:
+        """Write a snapshot and publish it as the current one.
+
+        Args:
+            trained_at: When the models were trained
+            users: User dictionary the engines' arrays are indexed by
+            posts: Post dictionary the engines' arrays are indexed by
+            engines: Engine name -> trained state
+            updated_at: When incremental updates last changed the models, if they did
+
+        Returns:
+            The new snapshot's version
+        """
+        # Named by save time: models updated since their training are saved again
+        version = datetime.now(UTC).strftime("%Y%m%dT%H%M%S.%fZ")
+        tmp = self.root / f".{version}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        users.save(tmp, "users")
+        posts.save(tmp, "posts")
+        manifest: dict[str, Any] = {
+            "format": FORMAT_VERSION,
+            "version": version,
+            "trained_at": trained_at.isoformat(),
+            "updated_at": updated_at.isoformat() if updated_at else None,
+            "engines": {},
+        }
+        for engine, snapshot in engines.items():
+            (tmp / engine).mkdir()
+            for name, array in snapshot.arrays.items():
+                np.save(tmp / engine / f"{name}.npy", array, allow_pickle=False)
+            manifest["engines"][engine] = {
+                "model_version": snapshot.model_version,
+                "metadata": snapshot.metadata,
+                "arrays": {
+                    name: {"dtype": array.dtype.str, "shape": list(array.shape)}
+                    for name, array in snapshot.arrays.items()
+                },
+            }
+        (tmp / _MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+        shutil.rmtree(self.root / version, ignore_errors=True)
+        os.replace(tmp, self.root / version)
+        current = self.root / f".{_CURRENT_FILE}.tmp"
+        current.write_text(version)
+        os.replace(current, self.root / _CURRENT_FILE)
+
+        self._prune(version)
+        return version
+
+    def load(self, version: str | None = None) -> ModelSnapshot | None:
+        """Map a snapshot's arrays read-only.
+
+        Args:
+            version: Snapshot to load; the current one by default
+
+        Returns:
+            The snapshot, or ``None`` if there is none
+
+        Raises:
+            ValueError: If the snapshot has another format or an array does not
+                match its manifest
+        """
+        version = version or self.current_version()
+        if version is None:
+            return None
+
+        directory = self.root / version
+        manifest = json.loads((directory / _MANIFEST_FILE).read_text())
+        if manifest["format"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Model snapshot {version} has format {manifest['format']}, "
+                f"expected {FORMAT_VERSION}"
+            )
+
+        engines = {}
+        for engine, saved in manifest["engines"].items():
+            arrays = {}
+            for name, spec in saved["arrays"].items():
+                array = np.load(directory / engine / f"{name}.npy", mmap_mode="r")
+                if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+                    raise ValueError(f"Model snapshot {version}: {engine}/{name} is corrupt")
+                arrays[name] = array
+            engines[engine] = EngineSnapshot(saved["model_version"], arrays, saved["metadata"])
+
+        return ModelSnapshot(
+            version=version,
+            trained_at=datetime.fromisoformat(manifest["trained_at"]),
+            users=IdDictionary.load(directory, "users", mmap=True),
+            posts=IdDictionary.load(directory, "posts", mmap=True),
+            engines=engines,
+            updated_at=(
+                datetime.fromisoformat(manifest["updated_at"])
+                if manifest.get("updated_at")
+                else None
+            ),
+        )
+
+    def _prune(self, current: str) -> None:
+        """Delete all but the ``keep`` newest snapshots; mapped files stay readable."""
+        versions = sorted(
+            path.name
+            for path in self.root.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+        for version in versions[: -self.keep]:
+            if version != current:
+                logger.info("Deleting model snapshot %s", version)
+                shutil.rmtree(self.root / version, ignore_errors=True)
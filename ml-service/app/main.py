@@ -1,16 +1,88 @@
 """FastAPI application entry point."""
 
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.infrastructure.cache.response_cache import ResponseCache
+from app.infrastructure.cache.single_flight import SingleFlight
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.database.connection import dispose_engines, get_async_engine
+from app.infrastructure.ml.compute_pool import ComputePool, ComputePoolFullError
+from app.infrastructure.ml.micro_batcher import MicroBatcher
+from app.infrastructure.ml.model_registry import ModelRegistry
 from app.presentation.api.routers import recommendations
 
 
+def create_model_registry(
+    compute_pool: ComputePool | None = None, training_pool: ComputePool | None = None
+) -> ModelRegistry:
+    """Create the model registry with the configured refresh and update schedule."""
+    settings = get_settings()
+    return ModelRegistry(
+        refresh_interval_seconds=settings.model_refresh_interval_seconds,
+        update_interval_seconds=settings.model_update_interval_seconds,
+        compute_pool=compute_pool,
+        training_pool=training_pool,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Own the database engine, the worker pools, the shared model registry and the caches."""
+    settings = get_settings()
+    get_async_engine()
+    compute_pool = ComputePool(settings.compute_workers, settings.compute_queue_size)
+    training_pool = ComputePool(
+        settings.training_workers, settings.compute_queue_size, kind=settings.training_executor
+    )
+    registry = getattr(app.state, "preloaded_registry", None)
+    if registry is None:
+        registry = create_model_registry(compute_pool, training_pool)
+    else:
+        # Loaded by app.serve before this worker was forked; scoring uses this worker's pools
+        registry.compute_pool, registry.training_pool = compute_pool, training_pool
+        registry.follow_in_forked_worker()
+    app.state.model_registry = registry
+    app.state.response_cache = (
+        ResponseCache(settings.response_cache_size, settings.response_cache_ttl_seconds)
+        if settings.response_cache_size > 0
+        else None
+    )
+    app.state.request_flights = SingleFlight()
+    app.state.micro_batcher = (
+        MicroBatcher(
+            settings.micro_batch_max_size, settings.micro_batch_max_delay_us, pool=compute_pool
+        )
+        if settings.micro_batch_max_size > 1
+        else None
+    )
+    await registry.start()
+    try:
+        yield
+    finally:
+        await registry.stop()
+        compute_pool.shutdown()
+        training_pool.shutdown()
+        await dispose_engines()
+
+
 app = FastAPI(
     title="Threads ML Service",
     description="ML-powered feed recommendation service",
     version="0.1.1",
+    lifespan=lifespan,
 )
 
+
+@app.exception_handler(ComputePoolFullError)
+async def compute_pool_full_handler(request: Request, exc: ComputePoolFullError) -> JSONResponse:
+    """Shed load when scoring is backed up instead of queueing without bound."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 # Include routers
 app.include_router(recommendations.router)
 
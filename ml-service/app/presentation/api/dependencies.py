@@ -1,14 +1,27 @@
 """FastAPI dependencies for dependency injection."""
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
+from contextlib import AbstractAsyncContextManager
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.application.use_cases.generate_batch_recommendations import (
+    GenerateBatchRecommendationsUseCase,
+)
 from app.application.use_cases.generate_recommendations import GenerateRecommendationsUseCase
+from app.domain.entities.model_generation import ModelGeneration
+from app.domain.services.recommender_interface import RecommenderInterface
+from app.infrastructure.cache.response_cache import ResponseCache
+from app.infrastructure.cache.single_flight import SingleFlight
+from app.infrastructure.config.settings import get_settings
 from app.infrastructure.database.connection import get_async_session
-from app.infrastructure.database.interaction_repository_impl import (
-    SQLAlchemyInteractionRepository,
+from app.infrastructure.database.recommendation_repository_impl import (
+    SQLAlchemyRecommendationRepository,
 )
+from app.infrastructure.ml.compute_pool import PooledRecommender
+from app.infrastructure.ml.micro_batcher import BatchedRecommender, MicroBatcher
+from app.infrastructure.ml.model_registry import ModelRegistry
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -17,9 +30,87 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_session_factory() -> Callable[[], AbstractAsyncContextManager[AsyncSession]]:
+    """Get the session factory, for endpoints that only open a session when needed."""
+    return get_async_session
+
+
+def get_model_registry(request: Request) -> ModelRegistry:
+    """Get the process-wide model registry created in the app lifespan."""
+    return request.app.state.model_registry
+
+
+def get_response_cache(request: Request) -> ResponseCache | None:
+    """Get the process-wide response cache, or ``None`` when it is disabled."""
+    return getattr(request.app.state, "response_cache", None)
+
+
+def get_request_flights(request: Request) -> SingleFlight:
+    """Get the process-wide coalescer of identical in-flight requests."""
+    return request.app.state.request_flights
+
+
+def get_server_master_pid(request: Request) -> int | None:
+    """Get the PID of the process this worker was forked from by ``app.serve``, if any."""
+    return getattr(request.app.state, "server_master_pid", None)
+
+
+def get_micro_batcher(request: Request) -> MicroBatcher | None:
+    """Get the process-wide micro-batcher, or ``None`` when batching is disabled."""
+    return getattr(request.app.state, "micro_batcher", None)
+
+
 async def get_generate_recommendations_use_case(
+    registry: ModelRegistry,
     session: AsyncSession,
+    engine: str | None = None,
+    batcher: MicroBatcher | None = None,
+    generation: ModelGeneration | None = None,
 ) -> GenerateRecommendationsUseCase:
-    """Get generate recommendations use case with dependencies injected."""
-    interaction_repo = SQLAlchemyInteractionRepository(session)
-    return GenerateRecommendationsUseCase(interaction_repo)
+    """Get generate recommendations use case backed by the shared model of ``engine``.
+
+    The models come from ``generation`` if the caller pinned one already,
+    else from the current generation; either way, the request finishes on
+    it even if a newer one is published meanwhile. Precomputed
+    recommendations are read through ``session`` when enabled and the
+    request uses the default engine, which is the one that produced them.
+    Users the engine has nothing for are answered by the cold-start engine.
+    With a ``batcher``, online scoring joins concurrent requests in one batch;
+    either way it runs on the registry's compute pool.
+    """
+    generation = generation or await registry.acquire(engine)
+    engine = engine or registry.default_engine
+    recommender = _offloaded(generation.recommenders[engine], registry, batcher)
+    cold_start_recommender = generation.cold_start_for(engine)
+    if cold_start_recommender is not None:
+        cold_start_recommender = _offloaded(cold_start_recommender, registry, batcher)
+    serve_precomputed = get_settings().serve_precomputed and engine == registry.default_engine
+    recommendation_repo = SQLAlchemyRecommendationRepository(session) if serve_precomputed else None
+    return GenerateRecommendationsUseCase(
+        recommender, recommendation_repo, cold_start_recommender, generation
+    )
+
+
+async def get_generate_batch_recommendations_use_case(
+    registry: ModelRegistry,
+    engine: str | None = None,
+) -> GenerateBatchRecommendationsUseCase:
+    """Get batch recommendations use case backed by the current generation of ``engine``."""
+    generation = await registry.acquire(engine)
+    engine = engine or registry.default_engine
+    recommender = _offloaded(generation.recommenders[engine], registry)
+    cold_start_recommender = generation.cold_start_for(engine)
+    if cold_start_recommender is not None:
+        cold_start_recommender = _offloaded(cold_start_recommender, registry)
+    return GenerateBatchRecommendationsUseCase(recommender, cold_start_recommender, generation)
+
+
+def _offloaded(
+    recommender: RecommenderInterface,
+    registry: ModelRegistry,
+    batcher: MicroBatcher | None = None,
+) -> RecommenderInterface:
+    """Score through the micro-batcher if given, else directly on the compute pool."""
+    if batcher is not None:
+        return BatchedRecommender(recommender, batcher)
+    return PooledRecommender(recommender, registry.compute_pool)
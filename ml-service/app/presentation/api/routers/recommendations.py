@@ -1,15 +1,44 @@
 """Recommendations API router."""
 
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.application.dto.recommendation_dto import (
+    GenerateBatchRecommendationsRequest as UseCaseBatchRequest,
+)
 from app.application.dto.recommendation_dto import GenerateRecommendationsRequest as UseCaseRequest
-from app.presentation.api.dependencies import get_db_session, get_generate_recommendations_use_case
+from app.infrastructure.cache.response_cache import ResponseCache
+from app.infrastructure.cache.single_flight import SingleFlight
+from app.infrastructure.ml.compute_pool import ComputePool
+from app.infrastructure.ml.micro_batcher import MicroBatcher
+from app.infrastructure.ml.model_registry import ModelRegistry
+from app.infrastructure.monitoring.process_memory import serving_processes
+from app.presentation.api.dependencies import (
+    get_generate_batch_recommendations_use_case,
+    get_generate_recommendations_use_case,
+    get_micro_batcher,
+    get_model_registry,
+    get_request_flights,
+    get_response_cache,
+    get_server_master_pid,
+    get_session_factory,
+)
 from app.presentation.schemas.recommendation_schemas import (
+    CacheStatsResponse,
+    ComputePoolStatsResponse,
+    ComputeStatsResponse,
+    GenerateBatchRecommendationsRequest,
+    GenerateBatchRecommendationsResponse,
     GenerateRecommendationsRequest,
     GenerateRecommendationsResponse,
+    ModelGenerationResponse,
+    ProcessMemoryResponse,
+    RefreshModelResponse,
+    ServerMemoryResponse,
 )
 
 
@@ -19,41 +48,223 @@ router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 @router.post("/generate", response_model=GenerateRecommendationsResponse)
 async def generate_recommendations(
     request: GenerateRecommendationsRequest,
-    session: Annotated[AsyncSession, Depends(get_db_session)],
+    registry: Annotated[ModelRegistry, Depends(get_model_registry)],
+    cache: Annotated[ResponseCache | None, Depends(get_response_cache)],
+    flights: Annotated[SingleFlight, Depends(get_request_flights)],
+    batcher: Annotated[MicroBatcher | None, Depends(get_micro_batcher)],
+    session_factory: Annotated[
+        Callable[[], AbstractAsyncContextManager[AsyncSession]], Depends(get_session_factory)
+    ],
 ) -> GenerateRecommendationsResponse:
     """Generate personalized recommendations for a user.
 
+    The request is answered by the model generation current when it
+    arrived, even if a newer one is published meanwhile. Repeated requests
+    are answered from the response cache until it expires, rebuilt models
+    are published or an update changes the user's rows, without touching
+    the model or the database.
+    Identical requests arriving while one is being scored share its result,
+    and different users scored at the same time share one batched model call.
+
     Args:
         request: Request containing user_id and parameters
-        session: Database session
+        registry: Registry holding the shared trained model
+        cache: Response cache, if enabled
+        flights: Coalesces identical in-flight requests
+        batcher: Groups concurrent scoring into batches, if enabled
+        session_factory: Opens a session for reading precomputed recommendations on a miss
 
     Returns:
         Response containing list of recommendations
     """
+    key = (
+        request.user_id,
+        request.limit,
+        frozenset(request.exclude_post_ids),
+        request.engine or registry.default_engine,
+    )
+    # Pinned before scoring, so the response is computed and cached for one generation;
+    # updates that did not touch this user keep the cached response valid
+    generation = await registry.acquire(request.engine)
+    changed_at = generation.changed_at(request.user_id)
+    cached = cache.get(key, generation.epoch, changed_at) if cache is not None else None
+    if cached is not None:
+        return cached
+
+    async def score() -> GenerateRecommendationsResponse:
+        # Convert API request to use case request
+        use_case_request = UseCaseRequest(
+            user_id=request.user_id,
+            limit=request.limit,
+            exclude_post_ids=request.exclude_post_ids,
+            engine=request.engine,
+        )
+
+        # Create use case with injected dependencies and execute it
+        async with session_factory() as session:
+            use_case = await get_generate_recommendations_use_case(
+                registry, session, request.engine, batcher, generation
+            )
+            result = await use_case.execute(use_case_request)
+
+        # Convert use case response to API response
+        response = GenerateRecommendationsResponse(
+            user_id=result.user_id,
+            recommendations=[
+                {
+                    "post_id": rec.post_id,
+                    "score": rec.score,
+                    "reason": rec.reason,
+                }
+                for rec in result.recommendations
+            ],
+            count=result.count,
+            model_version=result.model_version,
+            model_generation=result.model_generation,
+            trained_at=result.trained_at,
+        )
+        if cache is not None:
+            cache.put(key, response, generation.epoch, generation.number)
+        return response
+
+    return await flights.do((*key, generation.epoch, changed_at), score)
+
+
+@router.post("/generate_batch", response_model=GenerateBatchRecommendationsResponse)
+async def generate_batch_recommendations(
+    request: GenerateBatchRecommendationsRequest,
+    registry: Annotated[ModelRegistry, Depends(get_model_registry)],
+) -> GenerateBatchRecommendationsResponse:
+    """Generate personalized recommendations for many users in one call.
+
+    Args:
+        request: Request containing per-user user_id and parameters
+        registry: Registry holding the shared trained model
+
+    Returns:
+        Response containing one recommendation list per requested user
+    """
     # Create use case with injected dependencies
-    use_case = await get_generate_recommendations_use_case(session)
+    use_case = await get_generate_batch_recommendations_use_case(registry, request.engine)
 
     # Convert API request to use case request
-    use_case_request = UseCaseRequest(
-        user_id=request.user_id,
-        limit=request.limit,
-        exclude_post_ids=request.exclude_post_ids,
-    )
+    use_case_request = UseCaseBatchRequest.model_validate(request.model_dump())
 
     # Execute use case
     result = await use_case.execute(use_case_request)
 
     # Convert use case response to API response
-    return GenerateRecommendationsResponse(
-        user_id=result.user_id,
-        recommendations=[
-            {
-                "post_id": rec.post_id,
-                "score": rec.score,
-                "reason": rec.reason,
-            }
-            for rec in result.recommendations
-        ],
-        count=result.count,
-        model_version=result.model_version,
+    return GenerateBatchRecommendationsResponse.model_validate(result.model_dump())
+
+
+@router.post("/model/refresh", response_model=RefreshModelResponse)
+async def refresh_model(
+    registry: Annotated[ModelRegistry, Depends(get_model_registry)],
+) -> RefreshModelResponse:
+    """Rebuild the shared recommendation model from the latest interactions.
+
+    Args:
+        registry: Registry holding the shared trained model
+
+    Returns:
+        Response containing the time the new model was trained
+    """
+    await registry.refresh()
+    return RefreshModelResponse(
+        status="refreshed",
+        trained_at=registry.trained_at,
+        model_generation=registry.current.id,
+    )
+
+
+@router.get("/model", response_model=ModelGenerationResponse)
+async def model_generation(
+    registry: Annotated[ModelRegistry, Depends(get_model_registry)],
+) -> ModelGenerationResponse:
+    """Report the published model generation.
+
+    Args:
+        registry: Registry holding the shared trained model
+
+    Returns:
+        The generation's ID, training time, engines and snapshot, and how many
+        replaced generations in-flight requests still hold
+    """
+    generation = registry.current
+    return ModelGenerationResponse(
+        model_generation=generation.id,
+        trained_at=generation.trained_at,
+        engines=list(generation.recommenders),
+        snapshot_version=registry.snapshot_version,
+        retired_in_use=registry.retired_in_use,
+    )
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+async def cache_stats(
+    cache: Annotated[ResponseCache | None, Depends(get_response_cache)],
+    flights: Annotated[SingleFlight, Depends(get_request_flights)],
+) -> CacheStatsResponse:
+    """Report the response cache and request coalescing counters.
+
+    Args:
+        cache: Response cache, if enabled
+        flights: Coalesces identical in-flight requests
+
+    Returns:
+        Hit, miss, eviction, expiration and invalidation counts, the current
+        size and the number of requests that joined an in-flight one
+    """
+    if cache is None:
+        return CacheStatsResponse(enabled=False, coalesced=flights.coalesced)
+    return CacheStatsResponse(enabled=True, coalesced=flights.coalesced, **cache.stats().as_dict())
+
+
+@router.get("/memory", response_model=ServerMemoryResponse)
+async def memory_stats(
+    master_pid: Annotated[int | None, Depends(get_server_master_pid)],
+) -> ServerMemoryResponse:
+    """Report the RSS and PSS of the serving processes.
+
+    Args:
+        master_pid: Process the workers were forked from by ``app.serve``, if any
+
+    Returns:
+        The master and every worker under ``app.serve``, else this process
+        alone; empty where ``/proc`` does not provide the figures
+    """
+    processes = serving_processes(master_pid)
+    return ServerMemoryResponse(
+        processes=[ProcessMemoryResponse(**process.as_dict()) for process in processes],
+        total_pss=sum(process.pss for process in processes),
+    )
+
+
+@router.get("/compute", response_model=ComputeStatsResponse)
+async def compute_stats(
+    registry: Annotated[ModelRegistry, Depends(get_model_registry)],
+) -> ComputeStatsResponse:
+    """Report the worker pools running scoring, updates and training.
+
+    Args:
+        registry: Registry holding the shared trained model and its pools
+
+    Returns:
+        Per pool its size, backlog, rejections and the timing of each stage
+        (load, train per engine, update, score)
+    """
+    return ComputeStatsResponse(
+        compute=_pool_stats(registry.compute_pool), training=_pool_stats(registry.training_pool)
+    )
+
+
+def _pool_stats(pool: ComputePool) -> ComputePoolStatsResponse:
+    """Convert a pool's counters to the response schema."""
+    return ComputePoolStatsResponse(
+        kind=pool.kind,
+        workers=pool.workers,
+        queue_size=pool.queue_size,
+        pending=pool.pending,
+        rejected=pool.rejected,
+        stages={stage: stats.as_dict() for stage, stats in pool.stats().items()},
     )
@@ -1,10 +1,16 @@
 """Pydantic schemas for recommendation API."""
 
+from datetime import datetime
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
-class GenerateRecommendationsRequest(BaseModel):
-    """Request schema for generating recommendations."""
+RecommenderEngine = Literal["user_based", "item_based", "als", "trending"]
+
+
+class RecommendationRequestItem(BaseModel):
+    """Per-user parameters schema for generating recommendations."""
 
     user_id: str = Field(..., description="User ID to generate recommendations for")
     limit: int = Field(50, ge=1, le=100, description="Maximum number of recommendations")
@@ -13,6 +19,14 @@ class GenerateRecommendationsRequest(BaseModel):
     )
 
 
+class GenerateRecommendationsRequest(RecommendationRequestItem):
+    """Request schema for generating recommendations."""
+
+    engine: RecommenderEngine | None = Field(
+        None, description="Recommendation engine; the configured default when omitted"
+    )
+
+
 class RecommendationItem(BaseModel):
     """Single recommendation item."""
 
@@ -27,4 +41,114 @@ class GenerateRecommendationsResponse(BaseModel):
     user_id: str
     recommendations: list[RecommendationItem]
     count: int
-    model_version: str = "collaborative_filtering_v1"
+    # Engine that answered, and the generation and training time of its model;
+    # all None for precomputed recommendations, whose model is not recorded
+    model_version: str | None = "unknown"
+    model_generation: str | None = None
+    trained_at: datetime | None = None
+
+
+class GenerateBatchRecommendationsRequest(BaseModel):
+    """Request schema for generating recommendations for many users."""
+
+    requests: list[RecommendationRequestItem] = Field(
+        ..., min_length=1, max_length=500, description="Per-user recommendation requests"
+    )
+    engine: RecommenderEngine | None = Field(
+        None,
+        description="Recommendation engine for every user; the configured default when omitted",
+    )
+
+
+class GenerateBatchRecommendationsResponse(BaseModel):
+    """Response schema for batch recommendations."""
+
+    results: list[GenerateRecommendationsResponse]
+    count: int
+
+
+class RefreshModelResponse(BaseModel):
+    """Response schema for an explicit model rebuild."""
+
+    status: str
+    trained_at: datetime | None
+    model_generation: str | None = None
+
+
+class ModelGenerationResponse(BaseModel):
+    """Response schema for the published model generation."""
+
+    model_generation: str
+    trained_at: datetime | None
+    engines: list[str]
+    # Snapshot the models were saved as or loaded from, if any
+    snapshot_version: str | None
+    # Replaced generations not freed yet because in-flight requests still use them
+    retired_in_use: int
+
+
+class CacheStatsResponse(BaseModel):
+    """Response schema for the response cache and request coalescing counters."""
+
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    # Entries dropped because a model update changed their user since they were stored
+    stale: int = 0
+    size: int = 0
+    # Requests that awaited an identical in-flight request instead of scoring
+    coalesced: int = 0
+
+
+class StageTimingResponse(BaseModel):
+    """Response schema for the timing of one stage of model work."""
+
+    count: int
+    # Total seconds spent waiting for a worker and running, over all calls
+    queued_seconds: float
+    run_seconds: float
+    max_run_seconds: float
+
+
+class ComputePoolStatsResponse(BaseModel):
+    """Response schema for one worker pool."""
+
+    kind: str
+    # 0 when the work runs on the event loop
+    workers: int
+    queue_size: int
+    pending: int
+    # Calls turned away because the workers were busy and the queue full
+    rejected: int
+    stages: dict[str, StageTimingResponse]
+
+
+class ProcessMemoryResponse(BaseModel):
+    """Response schema for the memory of one serving process, in bytes."""
+
+    pid: int
+    # "master" and "worker" under app.serve, else "process"
+    role: str
+    rss: int
+    # Each page divided by the number of processes sharing it
+    pss: int
+    shared: int
+    private: int
+
+
+class ServerMemoryResponse(BaseModel):
+    """Response schema for the memory of the serving processes."""
+
+    processes: list[ProcessMemoryResponse]
+    # Memory the processes use together
+    total_pss: int
+
+
+class ComputeStatsResponse(BaseModel):
+    """Response schema for the scoring/update and training worker pools."""
+
+    compute: ComputePoolStatsResponse
+    training: ComputePoolStatsResponse
@@ -0,0 +1,170 @@
+"""Preload-and-fork server: load the models once, then fork uvicorn workers sharing them.
+
+``uvicorn app.main:app --workers N`` spawns fresh interpreters, each loading
+or training its own copy of the models. Run instead::
+
+    python -m app.serve --workers 4
+
+The master process loads the model registry (the newest snapshot with
+``MODEL_SNAPSHOT_DIR``, else a rebuild), binds the socket, moves every
+object it created into the permanent GC generation with ``gc.freeze()`` and
+forks the workers. The NumPy buffers and ID dictionaries are then shared
+copy-on-write: the collector never touches the frozen objects, so their
+pages stay shared until a worker replaces the model. Workers therefore only
+follow (see ``ModelRegistry.follow_in_forked_worker``): with
+``MODEL_SNAPSHOT_DIR``, one of them publishes and the others map its
+snapshots; without it, none updates or rebuilds. The master restarts
+workers that die and logs each one's RSS and PSS every
+``SERVER_MEMORY_REPORT_SECONDS``; ``GET /recommendations/memory`` reports
+the same figures from inside a worker.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.database.connection import dispose_engines
+from app.infrastructure.ml.model_registry import ModelRegistry
+from app.infrastructure.monitoring.process_memory import ProcessMemory, serving_processes
+from app.main import app, create_model_registry
+
+
+logger = logging.getLogger("app.serve")
+
+MIB = 1024 * 1024
+
+
+async def preload() -> ModelRegistry:
+    """Publish the models in a registry without pools, background loops or open connections.
+
+    Each worker's lifespan gives the registry its own pools and starts its loops.
+    """
+    registry = create_model_registry()
+    try:
+        await registry.warm_start()
+    finally:
+        # Connections must not be shared with the forked workers
+        await dispose_engines()
+    return registry
+
+
+def bind(host: str, port: int) -> socket.socket:
+    """Listening socket inherited by every worker."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def fork_worker(sock: socket.socket, log_level: str) -> int:
+    """Fork a worker serving the app on ``sock``; returns its PID in the master."""
+    pid = os.fork()
+    if pid:
+        return pid
+
+    # Worker: uvicorn installs its own shutdown handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    gc.enable()
+    status = 0
+    try:
+        uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+    except BaseException:
+        logger.exception("Worker %d crashed", os.getpid())
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def format_memory(processes: list[ProcessMemory]) -> str:
+    """One line: RSS, PSS and shared MiB per process, and the total PSS."""
+    parts = [
+        f"{p.role} {p.pid}: RSS {p.rss / MIB:.0f} PSS {p.pss / MIB:.0f} "
+        f"shared {p.shared / MIB:.0f} MiB"
+        for p in processes
+    ]
+    total = sum(p.pss for p in processes) / MIB
+    return f"{'; '.join(parts)}; total PSS {total:.0f} MiB"
+
+
+def supervise(
+    sock: socket.socket, workers: int, log_level: str, memory_report_seconds: float
+) -> None:
+    """Fork ``workers`` workers, replace those that die, and stop them on SIGTERM or SIGINT."""
+    children = {fork_worker(sock, log_level) for _ in range(workers)}
+    stopping = False
+
+    def stop(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    next_report = time.monotonic() + memory_report_seconds
+    while children:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid:
+            children.discard(pid)
+            if not stopping:
+                logger.warning("Worker %d exited with status %d; forking another", pid, status)
+                children.add(fork_worker(sock, log_level))
+            continue
+
+        if memory_report_seconds > 0 and time.monotonic() >= next_report:
+            logger.info("Memory: %s", format_memory(serving_processes(os.getpid())))
+            next_report += memory_report_seconds
+        time.sleep(0.2)
+
+
+def main() -> None:
+    """Parse the command line, preload the models and serve them from forked workers."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Serve the app from workers forked after preload")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.server_workers,
+        help="Worker processes (default: SERVER_WORKERS)",
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    # Nothing allocated while loading needs collecting; freeze it all before forking
+    gc.disable()
+    start = time.perf_counter()
+    registry = asyncio.run(preload())
+    logger.info(
+        "Preloaded model generation %s in %.2fs",
+        registry.current.id,
+        time.perf_counter() - start,
+    )
+    app.state.preloaded_registry = registry
+    app.state.server_master_pid = os.getpid()
+    sock = bind(args.host, args.port)
+    gc.freeze()
+
+    logger.info("Forking %d workers on %s:%d", args.workers, args.host, args.port)
+    supervise(sock, args.workers, args.log_level, settings.server_memory_report_seconds)
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
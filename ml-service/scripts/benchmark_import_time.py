@@ -0,0 +1,125 @@
+"""Measure how long importing the service takes, to catch startup regressions.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the median cumulative import time, the slowest modules and any heavy
+module that serving should not load at startup. Exits non-zero when a budget
+is exceeded or a forbidden module is imported, so it can gate CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Only needed for training or diagnostics; importing them at startup is a regression
+HEAVY_MODULES = (
+    "mlflow",
+    "matplotlib",
+    "seaborn",
+    "polars",
+    "pandas",
+    "sklearn",
+    "scipy",
+    "numpy",
+    "psycopg2",
+    "asyncpg",
+)
+
+
+def run_importtime(module: str) -> dict[str, int]:
+    """Import ``module`` in a fresh interpreter and parse ``-X importtime`` output.
+
+    Args:
+        module: Dotted module name to import
+
+    Returns:
+        Cumulative import time in microseconds per imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative: dict[str, int] = {}
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.removeprefix("import time:").split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def loaded_heavy_modules(module: str) -> list[str]:
+    """List the heavy modules present in ``sys.modules`` after importing ``module``."""
+    code = (
+        f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    output = result.stdout.strip().splitlines()
+    return [name for name in (output[-1] if output else "").split(",") if name]
+
+
+def run_benchmark(args: argparse.Namespace) -> int:
+    """Run the benchmark and print a report.
+
+    Returns:
+        Process exit code (1 if a budget was exceeded)
+    """
+    runs = [run_importtime(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+    heavy = loaded_heavy_modules(args.module)
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs")
+    print(f"  runs: {', '.join(f'{t:.1f}' for t in totals_ms)} ms")
+    print("\nslowest modules (cumulative, last run):")
+    for name, micros in sorted(runs[-1].items(), key=lambda item: -item[1])[1 : args.top + 1]:
+        print(f"  {micros / 1000:>8.1f} ms  {name}")
+    print(f"\nheavy modules loaded: {', '.join(heavy) or 'none'}")
+
+    if args.output:
+        report = {
+            "module": args.module,
+            "median_ms": median_ms,
+            "runs_ms": totals_ms,
+            "heavy_modules": heavy,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    failed = False
+    if heavy:
+        print("FAIL: heavy modules imported at startup")
+        failed = True
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"FAIL: median {median_ms:.1f} ms exceeds budget {args.max_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark service import time")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters (default: 5)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules shown (default: 15)")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median exceeds this budget")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    sys.exit(run_benchmark(parser.parse_args()))
@@ -0,0 +1,124 @@
+"""Benchmark approximate user-similarity search against exact brute force.
+
+Builds a synthetic clustered user-item matrix, then reports index build time,
+per-query latency and recall@k of each LSH configuration relative to the exact
+cosine neighbours returned by brute force.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.infrastructure.ml.neighbors import (
+    BruteForceIndex,
+    NeighborIndex,
+    RandomProjectionLSHIndex,
+)
+
+
+def make_clustered_matrix(
+    n_users: int, n_posts: int, n_clusters: int, per_user: int, seed: int = 0
+) -> sparse.csr_matrix:
+    """Generate users that mostly interact with their cluster's posts.
+
+    Args:
+        n_users: Number of rows
+        n_posts: Number of columns
+        n_clusters: Number of interest groups
+        per_user: Interactions per user
+        seed: Random seed
+
+    Returns:
+        Float32 CSR user-item matrix
+    """
+    rng = np.random.default_rng(seed)
+    clusters = rng.integers(0, n_clusters, n_users)
+    cluster_posts = rng.integers(0, n_posts, (n_clusters, max(per_user * 4, 1)))
+
+    rows = np.repeat(np.arange(n_users), per_user)
+    from_cluster = rng.random(rows.size) < 0.8
+    cols = np.where(
+        from_cluster,
+        cluster_posts[clusters[rows], rng.integers(0, cluster_posts.shape[1], rows.size)],
+        rng.integers(0, n_posts, rows.size),
+    )
+    weights = rng.choice(np.array([0.1, 0.3, 0.7, 1.0], dtype=np.float32), rows.size)
+    return sparse.coo_matrix((weights, (rows, cols)), shape=(n_users, n_posts)).tocsr()
+
+
+def time_queries(
+    index: NeighborIndex, queries: sparse.csr_matrix, k: int
+) -> tuple[np.ndarray, float]:
+    """Run one query at a time, as the API does, and return indices and mean latency (ms)."""
+    indices = np.empty((queries.shape[0], k), dtype=np.int64)
+    start = time.perf_counter()
+    for q in range(queries.shape[0]):
+        _, indices[q] = index.kneighbors(queries[q], n_neighbors=k)
+    return indices, (time.perf_counter() - start) * 1000 / queries.shape[0]
+
+
+def recall_at_k(approximate: np.ndarray, exact: np.ndarray) -> float:
+    """Mean fraction of the exact neighbours that the approximate search found."""
+    hits = [np.intersect1d(a, e).size for a, e in zip(approximate, exact, strict=True)]
+    return float(np.mean(hits)) / exact.shape[1]
+
+
+def run_benchmark(args: argparse.Namespace) -> None:
+    """Benchmark brute force and each LSH configuration."""
+    print(f"Generating {args.users} users x {args.posts} posts...")
+    matrix = make_clustered_matrix(args.users, args.posts, args.clusters, args.per_user)
+    rng = np.random.default_rng(1)
+    queries = matrix[rng.choice(matrix.shape[0], args.queries, replace=False)]
+
+    start = time.perf_counter()
+    brute = BruteForceIndex().fit(matrix)
+    build_ms = (time.perf_counter() - start) * 1000
+    exact, brute_ms = time_queries(brute, queries, args.k)
+
+    print(f"\n{'index':<32} {'build ms':>10} {'query ms':>10} {f'recall@{args.k}':>10}")
+    print(f"{'brute':<32} {build_ms:>10.1f} {brute_ms:>10.3f} {1.0:>10.3f}")
+
+    for n_tables in args.tables:
+        for n_bits in args.bits:
+            start = time.perf_counter()
+            lsh = RandomProjectionLSHIndex(
+                n_tables=n_tables, n_bits=n_bits, max_candidates=args.max_candidates
+            ).fit(matrix)
+            build_ms = (time.perf_counter() - start) * 1000
+            approximate, query_ms = time_queries(lsh, queries, args.k)
+            name = f"lsh tables={n_tables} bits={n_bits}"
+            print(
+                f"{name:<32} {build_ms:>10.1f} {query_ms:>10.3f} "
+                f"{recall_at_k(approximate, exact):>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark neighbour index recall and latency")
+    parser.add_argument("--users", type=int, default=50000, help="Users (default: 50000)")
+    parser.add_argument("--posts", type=int, default=100000, help="Posts (default: 100000)")
+    parser.add_argument("--clusters", type=int, default=200, help="Interest groups (default: 200)")
+    parser.add_argument(
+        "--per-user", type=int, default=30, help="Interactions per user (default: 30)"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Query users (default: 200)")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours per query (default: 5)")
+    parser.add_argument(
+        "--tables", type=int, nargs="+", default=[8, 16, 32], help="LSH table counts to try"
+    )
+    parser.add_argument(
+        "--bits", type=int, nargs="+", default=[8, 10, 12], help="LSH bits per table to try"
+    )
+    parser.add_argument(
+        "--max-candidates", type=int, default=2000, help="Re-ranked candidates cap (default: 2000)"
+    )
+
+    run_benchmark(parser.parse_args())
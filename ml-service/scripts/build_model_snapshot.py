@@ -0,0 +1,68 @@
+"""Train the serving models and save them as a model snapshot.
+
+Run as the training job when serving processes set MODEL_SNAPSHOT_ONLY: they
+load the snapshot written here instead of training themselves. Trains the
+default and cold-start engines, exactly as a serving process would rebuild
+them, and publishes the result as the current snapshot. Not needed with
+MODEL_SNAPSHOT_SHARED, where one serving process publishes for the others.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.infrastructure.config.settings import get_settings
+from app.infrastructure.database.connection import dispose_engines
+from app.infrastructure.ml.model_registry import ModelRegistry
+from app.infrastructure.storage.model_snapshot import ModelSnapshotStore
+
+
+async def main(directory: str, engine: str | None) -> None:
+    """Train once, save the snapshot and time loading it back.
+
+    Args:
+        directory: Snapshot root directory
+        engine: Default engine to train (RECOMMENDER_ENGINE by default)
+    """
+    registry = ModelRegistry(default_engine=engine, snapshot_dir=directory, snapshot_only=False)
+
+    start = time.perf_counter()
+    try:
+        await registry.refresh()
+    finally:
+        await dispose_engines()
+    print(
+        f"✓ Trained and saved snapshot {registry.snapshot_version} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+    start = time.perf_counter()
+    snapshot = ModelSnapshotStore(directory).load(registry.snapshot_version)
+    print(
+        f"✓ Mapped {', '.join(snapshot.engines)} ({len(snapshot.users)} users, "
+        f"{len(snapshot.posts)} posts) in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Train the models and save a snapshot")
+    parser.add_argument(
+        "--dir",
+        default=settings.model_snapshot_dir or "data/models",
+        help="Snapshot directory (default: MODEL_SNAPSHOT_DIR or data/models)",
+    )
+    parser.add_argument(
+        "--engine",
+        default=None,
+        help="Default engine to train (default: RECOMMENDER_ENGINE)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.dir, args.engine))
@@ -0,0 +1,87 @@
+"""Precompute top-N recommendations for all active users into user_recommendation.
+
+Trains the recommender on the current interactions, scores active users in
+blocks and atomically replaces the previous generation of stored rows.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.infrastructure.database.connection import get_sync_session
+from app.infrastructure.ml.precompute import run_precompute
+
+
+def main(top_n: int, block_size: int, ttl_hours: float, active_days: int) -> None:
+    """Run the precompute job once.
+
+    Args:
+        top_n: Recommendations stored per user
+        block_size: Users scored per batch call
+        ttl_hours: Lifetime of the generation
+        active_days: Users active within this many days are precomputed
+    """
+    session = get_sync_session()
+
+    try:
+        stats = asyncio.run(
+            run_precompute(
+                session,
+                top_n=top_n,
+                block_size=block_size,
+                ttl_hours=ttl_hours,
+                active_days=active_days,
+            )
+        )
+        print(
+            f"✓ Stored {stats['recommendations']} recommendations for {stats['users']} users "
+            f"(expires at {stats['expires_at']})"
+        )
+    except Exception as e:
+        session.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute top-N recommendations")
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=150,
+        help="Recommendations stored per user (default: 150)",
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=1000,
+        help="Users scored per batch (default: 1000)",
+    )
+    parser.add_argument(
+        "--ttl-hours",
+        type=float,
+        default=24,
+        help="Hours until the stored generation expires (default: 24)",
+    )
+    parser.add_argument(
+        "--active-days",
+        type=int,
+        default=30,
+        help="Precompute users active within this many days (default: 30)",
+    )
+
+    args = parser.parse_args()
+
+    main(
+        top_n=args.top_n,
+        block_size=args.block_size,
+        ttl_hours=args.ttl_hours,
+        active_days=args.active_days,
+    )
@@ -1,11 +1,19 @@
 """End-to-end tests for recommendations API."""
 
 import pytest
+import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
 from app.main import app
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def app_lifespan():
+    """Run the app lifespan so the shared model registry exists."""
+    async with app.router.lifespan_context(app):
+        yield
+
+
 @pytest.mark.asyncio
 async def test_generate_recommendations_endpoint():
     """POST /recommendations/generate should return recommendations."""
@@ -0,0 +1,161 @@
+"""Unit tests for the implicit ALS recommender."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.recommendation import RecommendationQuery
+from app.infrastructure.ml.als_recommender import ImplicitALSRecommender
+
+
+@pytest.fixture
+def interactions():
+    """Two taste groups: posts a-d are liked together, as are posts w-z."""
+    base = datetime(2025, 1, 1)
+    likes = {f"user{i}": ["a", "b", "c", "d"][: 2 + i % 3] for i in range(8)}
+    likes.update({f"other{i}": ["w", "x", "y", "z"][: 2 + i % 3] for i in range(8)})
+    likes["newcomer"] = ["a"]
+    return [
+        Interaction(
+            id=f"{user_id}-{post_id}",
+            user_id=user_id,
+            post_id=post_id,
+            interaction_type="like",
+            created_at=base + timedelta(minutes=offset),
+        )
+        for user_id, posts in likes.items()
+        for offset, post_id in enumerate(posts)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_factors_are_float32_and_recommendations_follow_taste(interactions):
+    """Training yields float32 factors; users get unseen posts from their own group."""
+    recommender = ImplicitALSRecommender(interactions, factors=2, n_workers=2)
+    await recommender.train()
+
+    assert recommender.user_factors.shape == (len(recommender.users), 2)
+    assert recommender.item_factors.shape == (len(recommender.posts), 2)
+    assert recommender.user_factors.dtype == recommender.item_factors.dtype == np.float32
+
+    recommendations = await recommender.generate_recommendations("newcomer", limit=3)
+    assert {r.post_id for r in recommendations} == {"b", "c", "d"}
+    assert recommendations[0].score == 1.0
+    assert all(r.reason == "matrix_factorization" for r in recommendations)
+    assert recommender.model_version == "implicit_als_v1"
+
+
+@pytest.mark.asyncio
+async def test_batch_recommendations_match_single_requests(interactions):
+    """Batch scoring gives each user the same answer as a single request."""
+    recommender = ImplicitALSRecommender(interactions, factors=2)
+    await recommender.train()
+
+    queries = [
+        RecommendationQuery(user_id="user1", limit=2),
+        RecommendationQuery(user_id="unknown-user"),
+        RecommendationQuery(user_id="other3", limit=5, exclude_post_ids=["z"]),
+    ]
+    batch = await recommender.generate_batch_recommendations(queries)
+
+    assert batch[1] == []
+    assert "z" not in {r.post_id for r in batch[2]}
+    for query, recommendations in zip(queries, batch, strict=True):
+        single = await recommender.generate_recommendations(
+            query.user_id, limit=query.limit, exclude_post_ids=query.exclude_post_ids
+        )
+        # Row-wise and batched matmuls may round differently in float32
+        assert [r.post_id for r in recommendations] == [r.post_id for r in single]
+        assert [r.score for r in recommendations] == pytest.approx(
+            [r.score for r in single], rel=1e-4
+        )
+
+
+@pytest.mark.asyncio
+async def test_batch_scoring_in_blocks_matches_one_block(interactions):
+    """Scoring a batch a few queries at a time gives the same recommendations."""
+    recommender = ImplicitALSRecommender(interactions, factors=2)
+    await recommender.train()
+    queries = [RecommendationQuery(user_id=user_id, limit=3) for user_id in recommender.users]
+
+    whole = await recommender.generate_batch_recommendations(queries)
+    recommender.score_block_elements = 2 * len(recommender.posts)
+    blocks = await recommender.generate_batch_recommendations(queries)
+
+    for block_result, whole_result in zip(blocks, whole, strict=True):
+        assert [r.post_id for r in block_result] == [r.post_id for r in whole_result]
+        assert [r.score for r in block_result] == pytest.approx(
+            [r.score for r in whole_result], rel=1e-4
+        )
+
+
+def test_conjugate_gradient_converges_to_exact_solution():
+    """With enough steps the row solve matches the closed-form least-squares solution."""
+    rng = np.random.default_rng(0)
+    recommender = ImplicitALSRecommender([], factors=6, regularization=0.5, cg_steps=50)
+    fixed = rng.standard_normal((10, 6)).astype(np.float32)
+    rows = sparse.csr_matrix(np.array([[0.7, 0, 1.0, 0, 0.1, 0, 0, 0, 0, 0.3]], np.float32))
+
+    solved = recommender._solve_block(rows, fixed, fixed.T @ fixed, np.zeros((1, 6), np.float32))
+
+    confidence = 1 + recommender.alpha * rows.toarray()[0]
+    lhs = fixed.T @ (confidence[:, None] * fixed) + 0.5 * np.eye(6)
+    rhs = fixed.T @ (confidence * (rows.toarray()[0] > 0))
+    np.testing.assert_allclose(solved[0], np.linalg.solve(lhs, rhs), rtol=1e-3, atol=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_update_folds_in_new_users_against_fixed_post_factors(interactions):
+    """New users are solved against the existing post factors without retraining."""
+    recommender = ImplicitALSRecommender(interactions, factors=2)
+    await recommender.train()
+    item_factors = recommender.item_factors.copy()
+
+    later = recommender.watermark + timedelta(minutes=1)
+    assert await recommender.update([Interaction("n1", "late-user", "w", "like", later)])
+
+    np.testing.assert_array_equal(recommender.item_factors, item_factors)
+    recommendations = await recommender.generate_recommendations("late-user", limit=3)
+    assert {r.post_id for r in recommendations} == {"x", "y", "z"}
+
+
+@pytest.mark.asyncio
+async def test_update_shares_the_trained_factors_and_replaces_only_changed_rows(interactions):
+    """No factor array is copied; the re-solved rows equal a solve against padded factors."""
+    recommender = ImplicitALSRecommender(interactions, factors=2)
+    # Two re-solved rows of 17 would otherwise be merged into a copy right away
+    recommender.delta_compaction_ratio = 0.5
+    await recommender.train()
+    trained_users = recommender._user_factors.base
+    trained_posts = recommender.item_factors
+    before = trained_users.copy()
+
+    later = recommender.watermark + timedelta(minutes=1)
+    assert await recommender.update(
+        [
+            Interaction("n1", "user1", "new-post", "like", later),
+            Interaction("n2", "late-user", "x", "like", later),
+        ]
+    )
+
+    assert recommender.item_factors is trained_posts
+    assert recommender._user_factors.base is trained_users
+    np.testing.assert_array_equal(trained_users, before)
+
+    changed = np.array([recommender._user_index("user1"), recommender._user_index("late-user")])
+    padded = np.zeros((recommender.n_posts, 2), dtype=np.float32)
+    padded[: trained_posts.shape[0]] = trained_posts
+    initial = np.zeros((2, 2), dtype=np.float32)
+    initial[0] = before[changed[0]]
+    expected = recommender._solve_block(
+        recommender._matrix.take(changed), padded, padded.T @ padded, initial
+    )
+
+    factors = recommender.user_factors
+    assert factors.shape == (recommender.n_users, 2)
+    np.testing.assert_allclose(factors[changed], expected, rtol=1e-5)
+    unchanged = np.setdiff1d(np.arange(before.shape[0]), changed)
+    np.testing.assert_array_equal(factors[unchanged], before[unchanged])
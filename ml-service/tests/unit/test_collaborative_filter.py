@@ -2,10 +2,12 @@
 
 from datetime import datetime
 
+import numpy as np
 import pytest
+from scipy import sparse
 
 from app.domain.entities.interaction import Interaction
-from app.domain.entities.recommendation import Recommendation
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
 from app.infrastructure.ml.collaborative_filter import CollaborativeFilterRecommender
 
 
@@ -302,3 +304,128 @@ async def test_large_dataset_visualization(large_interaction_dataset):
     assert all(isinstance(r, Recommendation) for r in recommendations)
     assert all(r.user_id == "user1" for r in recommendations)
     assert all(0 <= r.score <= 1.0 for r in recommendations)
+
+
+@pytest.mark.asyncio
+async def test_user_item_matrix_is_sparse_float32():
+    """Matrix should be float32 CSR with repeated interactions summed."""
+    interactions = [
+        Interaction("1", "user1", "post1", "view", datetime.now()),
+        Interaction("2", "user1", "post1", "view", datetime.now()),
+        Interaction("3", "user1", "post2", "like", datetime.now()),
+        Interaction("4", "user2", "post2", "share", datetime.now()),
+    ]
+
+    recommender = CollaborativeFilterRecommender(interactions=interactions)
+    await recommender.train()
+
+    matrix = recommender.user_item_matrix
+    assert sparse.isspmatrix_csr(matrix)
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (2, 2)
+    assert matrix.nnz == 3
+    assert matrix[0, 0] == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_recommendations_skip_seen_posts_and_respect_limit(large_interaction_dataset):
+    """Top-k selection should drop seen posts and return at most ``limit`` items."""
+    recommender = CollaborativeFilterRecommender(
+        interactions=large_interaction_dataset,
+        n_neighbors=8,
+    )
+    await recommender.train()
+
+    all_recommendations = await recommender.generate_recommendations("user11", limit=100)
+    top_two = await recommender.generate_recommendations("user11", limit=2)
+
+    seen = {i.post_id for i in large_interaction_dataset if i.user_id == "user11"}
+    assert all(r.post_id not in seen for r in all_recommendations)
+    assert len(all_recommendations) > 2
+    assert [r.post_id for r in top_two] == [r.post_id for r in all_recommendations[:2]]
+    assert top_two[0].score == 1.0
+
+
+@pytest.mark.asyncio
+async def test_batch_recommendations_match_single_requests(large_interaction_dataset):
+    """Batch scoring should give each user the same answer as a single request."""
+    recommender = CollaborativeFilterRecommender(
+        interactions=large_interaction_dataset,
+        n_neighbors=5,
+    )
+    await recommender.train()
+
+    queries = [
+        RecommendationQuery(user_id="user1", limit=3),
+        RecommendationQuery(user_id="unknown-user", limit=3),
+        RecommendationQuery(user_id="user6", limit=5, exclude_post_ids=["python"]),
+        RecommendationQuery(user_id="user14", limit=10),
+    ]
+
+    batch = await recommender.generate_batch_recommendations(queries)
+
+    assert len(batch) == len(queries)
+    assert batch[1] == []
+    for query, recommendations in zip(queries, batch, strict=True):
+        single = await recommender.generate_recommendations(
+            query.user_id, limit=query.limit, exclude_post_ids=query.exclude_post_ids
+        )
+        assert recommendations == single
+
+
+@pytest.mark.asyncio
+async def test_incremental_update_matches_full_training(large_interaction_dataset):
+    """Folding a delta into the model should give the same matrix as a full retrain."""
+    base = datetime(2025, 1, 1)
+    for offset, interaction in enumerate(large_interaction_dataset):
+        interaction.created_at = base.replace(minute=offset % 60, hour=offset // 60)
+    history, delta = large_interaction_dataset[:60], large_interaction_dataset[60:]
+
+    incremental = CollaborativeFilterRecommender(interactions=history)
+    await incremental.train()
+    assert incremental.watermark == max(i.created_at for i in history)
+
+    # The repository returns rows at the watermark again; they must not double count
+    since = [i for i in large_interaction_dataset if i.created_at >= incremental.watermark]
+    assert await incremental.update(since)
+    assert await incremental.update(since[-1:])
+    assert incremental.watermark == max(i.created_at for i in delta)
+
+    full = CollaborativeFilterRecommender(interactions=large_interaction_dataset)
+    await full.train()
+
+    assert incremental.user_item_matrix.shape == full.user_item_matrix.shape
+    for user_idx, user_id in enumerate(full.users):
+        for post_idx, post_id in enumerate(full.posts):
+            assert incremental.user_item_matrix[
+                incremental.users.get(user_id), incremental.posts.get(post_id)
+            ] == pytest.approx(full.user_item_matrix[user_idx, post_idx])
+
+    recommendations = await incremental.generate_recommendations("user20", limit=5)
+    assert len(recommendations) > 0
+
+
+@pytest.mark.asyncio
+async def test_update_rebuilds_only_the_changed_rows(large_interaction_dataset):
+    """An update leaves the trained matrix untouched and keeps the changed rows aside."""
+    recommender = CollaborativeFilterRecommender(interactions=large_interaction_dataset)
+    await recommender.train()
+    trained = recommender._matrix.base
+    user_idx = recommender.users.get("user1")
+    before = recommender._matrix.take(np.array([user_idx])).toarray()
+
+    later = datetime.now()
+    assert await recommender.update([Interaction("new", "user1", "golang", "like", later)])
+
+    assert recommender._matrix.base is trained
+    assert recommender.model._rows.base is trained
+    assert recommender._matrix.rows.tolist() == [user_idx]
+    row = recommender._matrix.take(np.array([user_idx])).toarray()
+    golang = recommender.posts.get("golang")
+    assert row[0, golang] > before[0, golang]
+    assert np.array_equal(np.delete(row, golang), np.delete(before, golang))
+
+    # Reading the whole matrix merges the changed rows
+    merged = recommender.user_item_matrix
+    assert merged[user_idx, golang] == pytest.approx(row[0, golang])
+    assert recommender._matrix.rows.size == 0
@@ -0,0 +1,96 @@
+"""Unit tests for the worker pools running model work off the event loop."""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import InteractionColumns
+from app.infrastructure.ml.compute_pool import ComputePool, ComputePoolFullError
+from app.infrastructure.ml.model_registry import train_detached
+from app.infrastructure.ml.trending import TrendingRecommender
+
+
+async def blocking(seconds: float, name: str = "") -> str:
+    """Stand-in for an engine method: synchronous work inside a coroutine."""
+    time.sleep(seconds)
+    return name
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_while_a_worker_computes():
+    """Ticks continue during the call, and its queue wait and run time are recorded."""
+    pool = ComputePool(workers=1)
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(heartbeat())
+    assert await pool.run("train", blocking, 0.2, "done") == "done"
+    task.cancel()
+    pool.shutdown()
+
+    assert ticks >= 5
+    stats = pool.stats()["train"]
+    assert stats.count == 1
+    assert stats.run_seconds >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_workers_and_queue_are_rejected():
+    """One running, one queued, the third is turned away instead of waiting."""
+    pool = ComputePool(workers=1, queue_size=1)
+    running = [asyncio.create_task(pool.run("score", blocking, 0.1)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ComputePoolFullError):
+        await pool.run("score", blocking, 0.1)
+
+    await asyncio.gather(*running)
+    pool.shutdown()
+    assert pool.rejected == 1
+    assert pool.stats()["score"].count == 2
+
+
+@pytest.mark.asyncio
+async def test_call_that_never_reached_a_worker_is_not_counted():
+    """A failed submission frees its place; later calls are admitted and run."""
+    pool = ComputePool(workers=1, queue_size=0)
+    submit = pool._executor.submit
+
+    def broken_submit(*args, **kwargs):
+        raise RuntimeError("cannot schedule new futures")
+
+    pool._executor.submit = broken_submit
+    with pytest.raises(RuntimeError):
+        await pool.run("score", blocking, 0.0)
+    assert pool.pending == 0
+
+    pool._executor.submit = submit
+    assert await pool.run("score", blocking, 0.0, "done") == "done"
+    pool.shutdown()
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_process_pool_trains_a_copy_and_keeps_the_shared_dictionaries():
+    """The trained state comes back; the ID dictionaries stay the registry's own."""
+    columns = InteractionColumns.from_interactions(
+        [Interaction("1", "user1", "post1", "like", datetime(2025, 1, 1))]
+    )
+    recommender = TrendingRecommender(columns)
+    pool = ComputePool(workers=1, kind="process")
+
+    state = await pool.run("train", train_detached, recommender)
+    pool.shutdown()
+    vars(recommender).update(state)
+
+    assert recommender.posts is columns.posts
+    recommendations = await recommender.generate_recommendations("anyone")
+    assert [r.post_id for r in recommendations] == ["post1"]
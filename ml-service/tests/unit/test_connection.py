@@ -0,0 +1,23 @@
+"""Unit tests for database engine and session management."""
+
+import pytest
+
+from app.infrastructure.database import connection
+
+
+@pytest.mark.asyncio
+async def test_dispose_engines_makes_the_next_use_create_new_engines():
+    """Both engines and their session factories are rebuilt after disposal."""
+    sync_engine = connection.get_sync_engine()
+    async_engine = connection.get_async_engine()
+    sync_factory = connection._sync_session_factory()
+    async_factory = connection._async_session_factory()
+
+    await connection.dispose_engines()
+
+    assert connection.get_sync_engine() is not sync_engine
+    assert connection.get_async_engine() is not async_engine
+    assert connection._sync_session_factory() is not sync_factory
+    assert connection._sync_session_factory().kw["bind"] is connection.get_sync_engine()
+    assert connection._async_session_factory() is not async_factory
+    await connection.dispose_engines()
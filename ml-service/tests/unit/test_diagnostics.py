@@ -0,0 +1,80 @@
+"""Unit tests for background training diagnostics."""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.ml import collaborative_filter, diagnostics
+from app.infrastructure.ml.collaborative_filter import CollaborativeFilterRecommender
+from app.infrastructure.ml.diagnostics import DiagnosticsWorker
+
+
+@pytest.fixture
+def interactions():
+    """Seven users spread over eleven posts."""
+    return [
+        Interaction(str(i), f"user{i % 7}", f"post{i % 11}", "like", datetime.now())
+        for i in range(60)
+    ]
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Capture snapshots handed to the worker instead of logging them."""
+    snapshots = []
+    monkeypatch.setattr(collaborative_filter, "record_training", snapshots.append)
+    return snapshots
+
+
+def test_worker_drops_jobs_when_full_and_survives_failures():
+    """A full queue drops new jobs without blocking; a failing job does not stop the worker."""
+    worker = DiagnosticsWorker(max_queue_size=1)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def block():
+        started.set()
+        release.wait()
+
+    assert worker.submit(block)  # occupies the worker thread
+    started.wait()
+    assert worker.submit(lambda: 1 / 0)  # fills the queue
+    assert not worker.submit(lambda: ran.append("dropped"))
+    assert worker.dropped == 1
+
+    release.set()
+    worker.join()
+    assert worker.submit(lambda: ran.append("after failure"))
+    worker.join()
+    assert ran == ["after failure"]
+
+
+@pytest.mark.asyncio
+async def test_training_records_nothing_by_default(monkeypatch, interactions, recorded):
+    """Diagnostics are opt-in."""
+    monkeypatch.setattr(diagnostics, "get_settings", lambda: Settings())
+
+    await CollaborativeFilterRecommender(interactions).train()
+
+    assert recorded == []
+
+
+@pytest.mark.asyncio
+async def test_training_records_a_small_detached_sample(monkeypatch, interactions, recorded):
+    """When sampled, training hands over parameters, metrics and a bounded matrix sample."""
+    settings = Settings(diagnostics_enabled=True, diagnostics_sample_size=4)
+    monkeypatch.setattr(diagnostics, "get_settings", lambda: settings)
+
+    recommender = CollaborativeFilterRecommender(interactions)
+    await recommender.train()
+
+    (snapshot,) = recorded
+    assert snapshot.params["n_users"] == 7
+    assert 0 < snapshot.metrics["matrix_sparsity"] < 1
+    assert snapshot.matrix_sample.shape == (4, 4)
+    assert snapshot.matrix_sample is not recommender.user_item_matrix
+    assert len(snapshot.user_labels) == len(snapshot.post_labels) == 4
+    assert snapshot.sklearn_model is recommender.model.estimator
@@ -0,0 +1,147 @@
+"""Unit tests for the generate recommendations use case."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from app.application.dto.recommendation_dto import GenerateRecommendationsRequest
+from app.application.use_cases.generate_recommendations import GenerateRecommendationsUseCase
+from app.domain.entities.model_generation import ModelGeneration
+from app.domain.entities.recommendation import Recommendation
+from app.domain.repositories.recommendation_repository import RecommendationRepository
+from app.domain.services.recommender_interface import RecommenderInterface
+
+
+class StubRecommender(RecommenderInterface):
+    """Recommender returning a single fixed online recommendation."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def train(self) -> None:
+        pass
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        self.calls += 1
+        return [Recommendation(user_id=user_id, post_id="online", score=1.0)]
+
+
+class StubRecommendationRepository(RecommendationRepository):
+    """Repository serving a fixed list of stored recommendations."""
+
+    def __init__(self, stored: list[Recommendation]):
+        self.stored = stored
+
+    async def get_user_recommendations(self, user_id: str, limit: int) -> list[Recommendation]:
+        return self.stored[:limit]
+
+
+@pytest.mark.asyncio
+async def test_serves_precomputed_recommendations_without_scoring():
+    """Stored recommendations should be served and excluded posts filtered out."""
+    stored = [
+        Recommendation(user_id="user1", post_id=f"post{i}", score=1.0 - i / 10) for i in range(5)
+    ]
+    recommender = StubRecommender()
+    use_case = GenerateRecommendationsUseCase(recommender, StubRecommendationRepository(stored))
+
+    result = await use_case.execute(
+        GenerateRecommendationsRequest(user_id="user1", limit=3, exclude_post_ids=["post1"])
+    )
+
+    assert [r.post_id for r in result.recommendations] == ["post0", "post2", "post3"]
+    assert recommender.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_precomputed_responses_do_not_claim_the_serving_model():
+    """Rows written by the offline job report no engine or generation; online ones do."""
+    generation = ModelGeneration(number=1, id="g1", trained_at=datetime(2025, 1, 1, tzinfo=UTC))
+    stored = [Recommendation(user_id="user1", post_id=f"post{i}", score=1.0) for i in range(3)]
+    use_case = GenerateRecommendationsUseCase(
+        StubRecommender(), StubRecommendationRepository(stored), generation=generation
+    )
+
+    precomputed = await use_case.execute(GenerateRecommendationsRequest(user_id="user1", limit=3))
+    online = await use_case.execute(GenerateRecommendationsRequest(user_id="user1", limit=5))
+
+    assert (precomputed.model_version, precomputed.model_generation) == (None, None)
+    assert precomputed.trained_at is None
+    assert online.model_generation == "g1"
+    assert online.trained_at == generation.trained_at
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_online_scoring_on_miss():
+    """A user without stored recommendations should be scored online."""
+    recommender = StubRecommender()
+    use_case = GenerateRecommendationsUseCase(recommender, StubRecommendationRepository([]))
+
+    result = await use_case.execute(GenerateRecommendationsRequest(user_id="user1", limit=3))
+
+    assert [r.post_id for r in result.recommendations] == ["online"]
+    assert recommender.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_scores_online_when_limit_exceeds_stored_rows():
+    """A stored list shorter than the limit should not be served truncated."""
+    stored = [Recommendation(user_id="user1", post_id=f"post{i}", score=1.0) for i in range(3)]
+    recommender = StubRecommender()
+    use_case = GenerateRecommendationsUseCase(recommender, StubRecommendationRepository(stored))
+
+    result = await use_case.execute(GenerateRecommendationsRequest(user_id="user1", limit=5))
+
+    assert [r.post_id for r in result.recommendations] == ["online"]
+    assert recommender.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_scores_online_when_exclusions_drain_stored_rows():
+    """Exclusions leaving fewer stored rows than the limit should fall back to scoring."""
+    stored = [Recommendation(user_id="user1", post_id=f"post{i}", score=1.0) for i in range(5)]
+    recommender = StubRecommender()
+    use_case = GenerateRecommendationsUseCase(recommender, StubRecommendationRepository(stored))
+
+    result = await use_case.execute(
+        GenerateRecommendationsRequest(
+            user_id="user1", limit=3, exclude_post_ids=["post0", "post1", "post2"]
+        )
+    )
+
+    assert [r.post_id for r in result.recommendations] == ["online"]
+    assert recommender.calls == 1
+
+
+class EmptyRecommender(StubRecommender):
+    """Recommender with nothing for any user, like a user-based model for new users."""
+
+    model_version = "empty_v1"
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        self.calls += 1
+        return []
+
+
+@pytest.mark.asyncio
+async def test_cold_start_recommender_answers_users_without_recommendations():
+    """An empty online result falls back to the cold-start engine and reports its version."""
+    cold_start = StubRecommender()
+    cold_start.model_version = "trending_v1"
+    use_case = GenerateRecommendationsUseCase(EmptyRecommender(), None, cold_start)
+
+    result = await use_case.execute(GenerateRecommendationsRequest(user_id="new-user", limit=3))
+
+    assert [r.post_id for r in result.recommendations] == ["online"]
+    assert result.model_version == "trending_v1"
+    assert cold_start.calls == 1
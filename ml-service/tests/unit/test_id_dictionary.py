@@ -0,0 +1,45 @@
+"""Tests for the append-only ID dictionary."""
+
+import pytest
+
+from app.domain.entities.id_dictionary import IdDictionary
+
+
+def test_intern_assigns_stable_indices_in_first_seen_order():
+    """Existing IDs keep their index; new ones are appended as first seen."""
+    dictionary = IdDictionary(["user-b", "user-a"])
+
+    indices = dictionary.intern(["user-c", "user-a", "user-é", "user-c"])
+
+    assert indices.tolist() == [2, 1, 3, 2]
+    assert list(dictionary) == ["user-b", "user-a", "user-c", "user-é"]
+    assert dictionary[3] == "user-é"
+    assert dictionary.get("user-b") == 0
+    assert dictionary.get("missing") is None
+    assert dictionary.lookup(["user-c", "missing", "a-much-longer-id"]).tolist() == [2, -1, -1]
+    assert dictionary.decode([1, 0]) == ["user-a", "user-b"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """A loaded (or memory-mapped) dictionary keeps every index and can keep growing."""
+    dictionary = IdDictionary(["p1", "p10", "p2"])
+    dictionary.save(tmp_path, "posts")
+
+    for mmap in (False, True):
+        loaded = IdDictionary.load(tmp_path, "posts", mmap=mmap)
+        assert list(loaded) == ["p1", "p10", "p2"]
+        assert loaded.intern(["p3", "p2"]).tolist() == [3, 2]
+
+    assert len(IdDictionary.load(tmp_path, "users")) == 0
+
+
+def test_save_refuses_to_overwrite_a_diverged_dictionary(tmp_path):
+    """Saving only extends the files; a conflicting index order is rejected."""
+    IdDictionary(["a", "b"]).save(tmp_path, "users")
+    IdDictionary(["a", "b", "c"]).save(tmp_path, "users")
+
+    with pytest.raises(ValueError):
+        IdDictionary(["b", "a", "c"]).save(tmp_path, "users")
+    with pytest.raises(ValueError):
+        IdDictionary(["a"]).save(tmp_path, "users")
+    assert list(IdDictionary.load(tmp_path, "users")) == ["a", "b", "c"]
@@ -0,0 +1,129 @@
+"""Unit tests for columnar interaction loading."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import (
+    INTERACTION_TYPES,
+    UNKNOWN_TYPE,
+    InteractionColumns,
+    InteractionColumnsBuilder,
+    TimeDecay,
+)
+from app.infrastructure.ml.item_based_filter import ItemBasedRecommender
+
+
+def test_columns_encode_ids_and_types_as_small_ints():
+    """IDs become int32 codes into vocabularies and types int8 categories."""
+    now = datetime(2024, 1, 1)
+    interactions = [
+        Interaction("1", "user1", "post1", "like", now),
+        Interaction("2", "user2", "post1", "view", now),
+        Interaction("3", "user1", "post2", "bookmark", now),
+    ]
+
+    columns = InteractionColumns.from_interactions(interactions)
+
+    assert columns.user_codes.dtype == np.int32
+    assert columns.type_codes.dtype == np.int8
+    assert columns.users.decode(columns.user_codes) == ["user1", "user2", "user1"]
+    assert columns.posts.decode(columns.post_codes) == ["post1", "post1", "post2"]
+    assert columns.type_codes.tolist() == [
+        INTERACTION_TYPES.index("like"),
+        INTERACTION_TYPES.index("view"),
+        UNKNOWN_TYPE,
+    ]
+    assert columns.weights() == pytest.approx([i.get_weight() for i in interactions])
+
+
+def test_builder_keeps_only_ids_at_the_newest_timestamp_across_chunks():
+    """Chunks share vocabularies, and the watermark IDs follow the newest rows."""
+    start = datetime(2024, 1, 1)
+    builder = InteractionColumnsBuilder()
+    builder.append([("1", "user1", "post1", "like", start + timedelta(minutes=2))])
+    builder.append(
+        [
+            ("2", "user2", "post1", "view", start),
+            ("3", "user1", "post2", "share", start + timedelta(minutes=2)),
+        ]
+    )
+
+    columns = builder.build()
+
+    assert len(columns) == 3
+    assert list(columns.users) == ["user1", "user2"]
+    assert columns.user_codes.tolist() == [0, 1, 0]
+    assert columns.watermark == start + timedelta(minutes=2)
+    assert columns.watermark_ids == {"1", "3"}
+
+
+def test_empty_columns_have_no_watermark():
+    """An empty table yields empty arrays of the right types."""
+    columns = InteractionColumnsBuilder().build()
+
+    assert len(columns) == 0
+    assert columns.watermark is None
+    assert columns.created_at.dtype == np.dtype("datetime64[us]")
+
+
+@pytest.mark.asyncio
+async def test_aggregated_pairs_train_the_same_matrix_as_raw_rows():
+    """Summed (user, post) pairs give the engine the same user-item matrix."""
+    start = datetime(2024, 1, 1)
+    interactions = [
+        Interaction("1", "user1", "post1", "view", start),
+        Interaction("2", "user1", "post1", "view", start + timedelta(minutes=1)),
+        Interaction("3", "user1", "post2", "like", start),
+        Interaction("4", "user2", "post1", "share", start + timedelta(minutes=2)),
+    ]
+    builder = InteractionColumnsBuilder()
+    builder.append_aggregated(
+        [
+            ("user1", "post1", 0.2, start + timedelta(minutes=1)),
+            ("user1", "post2", 0.7, start),
+            ("user2", "post1", 1.0, start + timedelta(minutes=2)),
+        ]
+    )
+    aggregated = builder.build()
+
+    raw = ItemBasedRecommender(interactions)
+    pairs = ItemBasedRecommender(aggregated)
+    await raw.train()
+    await pairs.train()
+
+    assert aggregated.watermark == start + timedelta(minutes=2)
+    assert (raw.user_item_matrix != pairs.user_item_matrix).nnz == 0
+    assert (raw.last_interacted != pairs.last_interacted).nnz == 0
+
+
+def test_builder_rejects_mixing_raw_and_aggregated_rows():
+    """A builder holds either raw rows or pre-aggregated pairs."""
+    builder = InteractionColumnsBuilder()
+    builder.append_aggregated([("user1", "post1", 0.2, datetime(2024, 1, 1))])
+
+    with pytest.raises(ValueError):
+        builder.append([("1", "user1", "post1", "view", datetime(2024, 1, 1))])
+
+
+def test_time_decay_halves_weights_per_type_half_life():
+    """Each type decays with its own half-life, measured back from the reference."""
+    now = datetime(2024, 1, 31)
+    interactions = [
+        Interaction("1", "user1", "post1", "view", now - timedelta(days=2)),
+        Interaction("2", "user1", "post2", "like", now - timedelta(days=30)),
+        Interaction("3", "user2", "post1", "share", now - timedelta(days=30)),
+        Interaction("4", "user2", "post2", "bookmark", now - timedelta(days=7)),
+        Interaction("5", "user2", "post3", "view", now + timedelta(days=1)),
+    ]
+    decay = TimeDecay(half_life_days=7, half_life_days_by_type={"view": 1, "like": 30, "share": 0})
+
+    columns = InteractionColumns.from_interactions(interactions, decay=decay.at(now))
+
+    assert columns.weights().dtype == np.float32
+    assert columns.weights() == pytest.approx([0.1 / 4, 0.7 / 2, 1.0, 0.1 / 2, 0.2])
+    assert not TimeDecay(half_life_days_by_type={"view": 0}).enabled
+    with pytest.raises(ValueError):
+        decay.factors(columns.type_codes, columns.created_at)
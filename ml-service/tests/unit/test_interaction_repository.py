@@ -0,0 +1,42 @@
+"""Unit tests for the SQLAlchemy interaction repository."""
+
+from datetime import datetime
+
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.infrastructure.database.interaction_repository_impl import (
+    SQLAlchemyInteractionRepository,
+)
+from app.infrastructure.database.models import UserInteraction
+
+
+class RecordingSession:
+    """Session that records added objects instead of writing them."""
+
+    def __init__(self):
+        self.added = []
+        self.flushes = 0
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def flush(self):
+        self.flushes += 1
+
+
+@pytest.mark.asyncio
+async def test_repository_implements_every_port_method():
+    """The real repository is instantiable, so no abstract method of the port is missing."""
+    session = RecordingSession()
+    repository = SQLAlchemyInteractionRepository(session)
+
+    await repository.save_interaction(
+        Interaction("1", "user1", "post1", "like", datetime(2025, 1, 1), {"source": "feed"})
+    )
+
+    assert session.flushes == 1
+    [saved] = session.added
+    assert isinstance(saved, UserInteraction)
+    assert (saved.id, saved.user_id, saved.post_id) == ("1", "user1", "post1")
+    assert saved.interaction_metadata == {"source": "feed"}
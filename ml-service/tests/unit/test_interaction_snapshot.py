@@ -0,0 +1,130 @@
+"""Unit tests for the local Parquet interaction snapshot."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import InteractionColumns, TimeDecay
+from app.infrastructure.storage.interaction_snapshot import InteractionSnapshot
+
+
+START = datetime(2024, 1, 1, 12)
+
+
+class FakeRepository:
+    """Serves rows oldest first, like the SQL repository with ``ordered=True``."""
+
+    def __init__(self, interactions: list[Interaction]):
+        self.interactions = interactions
+        self.since: list[datetime | None] = []
+
+    async def iter_interaction_rows(self, since=None, batch_size=50_000, ordered=False):
+        self.since.append(since)
+        rows = sorted(
+            (
+                (i.id, i.user_id, i.post_id, i.interaction_type, i.created_at)
+                for i in self.interactions
+                if since is None or i.created_at >= since
+            ),
+            key=lambda row: row[4],
+        )
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+
+@pytest.fixture
+def interactions():
+    """Interactions over three days, two of them sharing the newest timestamp."""
+    return [
+        Interaction("1", "user1", "post1", "view", START),
+        Interaction("2", "user1", "post1", "like", START + timedelta(hours=1)),
+        Interaction("3", "user2", "post2", "share", START + timedelta(days=1)),
+        Interaction("4", "user2", "post1", "click", START + timedelta(days=2)),
+        Interaction("5", "user3", "post2", "view", START + timedelta(days=2)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_appends_from_the_watermark_into_day_partitions(tmp_path, interactions):
+    """A second sync reads only from the watermark and skips rows already written."""
+    snapshot = InteractionSnapshot(tmp_path)
+    repository = FakeRepository(interactions[:4])
+
+    assert await snapshot.sync(repository, batch_size=2) == 4
+    repository.interactions = interactions
+    assert await snapshot.sync(repository, batch_size=2) == 1
+    assert await snapshot.sync(repository, batch_size=2) == 0
+
+    assert repository.since[1:] == [START + timedelta(days=2)] * 2
+    assert sorted(p.name for p in tmp_path.glob("day=*")) == [
+        "day=2024-01-01",
+        "day=2024-01-02",
+        "day=2024-01-03",
+    ]
+    # Closed days are compacted to one file
+    assert len(list((tmp_path / "day=2024-01-01").glob("*.parquet"))) == 1
+    assert snapshot.read_state().watermark_ids == {"4", "5"}
+
+
+@pytest.mark.asyncio
+async def test_loaded_columns_match_columns_built_from_the_database(tmp_path, interactions):
+    """Raw and aggregated snapshot reads train the same matrix as SQL-loaded columns."""
+    snapshot = InteractionSnapshot(tmp_path)
+    await snapshot.sync(FakeRepository(interactions), batch_size=2)
+    expected = InteractionColumns.from_interactions(interactions)
+
+    raw = snapshot.load_columns(aggregate=False)
+    aggregated = snapshot.load_columns(aggregate=True)
+
+    assert len(raw) == 5
+    assert len(aggregated) == 4
+    for columns in (raw, aggregated):
+        assert columns.watermark == expected.watermark
+        assert columns.watermark_ids == expected.watermark_ids
+        weights = {
+            (columns.users[u], columns.posts[p]): 0.0
+            for u, p in zip(columns.user_codes, columns.post_codes, strict=True)
+        }
+        for u, p, w in zip(columns.user_codes, columns.post_codes, columns.weights(), strict=True):
+            weights[columns.users[u], columns.posts[p]] += w
+        assert weights == pytest.approx(
+            {
+                ("user1", "post1"): 0.8,
+                ("user2", "post2"): 1.0,
+                ("user2", "post1"): 0.3,
+                ("user3", "post2"): 0.1,
+            }
+        )
+
+
+@pytest.mark.asyncio
+async def test_decay_and_window_match_between_raw_and_aggregated_reads(tmp_path, interactions):
+    """Per-type decay from the watermark is applied before summing; old days are dropped."""
+    snapshot = InteractionSnapshot(tmp_path)
+    await snapshot.sync(FakeRepository(interactions), batch_size=2)
+    decay = TimeDecay(half_life_days=1.0, half_life_days_by_type={"share": 0})
+
+    raw = snapshot.load_columns(aggregate=False, decay=decay, window=timedelta(days=1))
+    aggregated = snapshot.load_columns(aggregate=True, decay=decay, window=timedelta(days=1))
+
+    assert raw.decay.reference == START + timedelta(days=2)
+    for columns in (raw, aggregated):
+        weights = {
+            (columns.users[u], columns.posts[p]): w
+            for u, p, w in zip(
+                columns.user_codes, columns.post_codes, columns.weights(), strict=True
+            )
+        }
+        # Shares do not decay; day-old interactions of other types weigh half
+        assert weights == pytest.approx(
+            {("user2", "post2"): 1.0, ("user2", "post1"): 0.3, ("user3", "post2"): 0.1}
+        )
+
+
+def test_empty_snapshot_loads_no_rows(tmp_path):
+    """Before the first sync the snapshot is empty, not an error."""
+    columns = InteractionSnapshot(tmp_path).load_columns()
+
+    assert len(columns) == 0
+    assert columns.watermark is None
@@ -0,0 +1,105 @@
+"""Unit tests for the item-based collaborative filtering recommender."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.recommendation import RecommendationQuery
+from app.infrastructure.ml.item_based_filter import ItemBasedRecommender
+
+
+@pytest.fixture
+def interactions():
+    """Posts a, b and c are liked together; x and y form a separate pair."""
+    base = datetime(2025, 1, 1)
+    likes = {
+        "user1": ["a", "b", "c"],
+        "user2": ["a", "b"],
+        "user3": ["b", "c"],
+        "user4": ["x", "y"],
+        "user5": ["x", "y", "a"],
+        "user6": ["a"],
+    }
+    result = []
+    for user_id, posts in likes.items():
+        for offset, post_id in enumerate(posts):
+            result.append(
+                Interaction(
+                    id=f"{user_id}-{post_id}",
+                    user_id=user_id,
+                    post_id=post_id,
+                    interaction_type="like",
+                    created_at=base + timedelta(minutes=offset),
+                )
+            )
+    return result
+
+
+@pytest.mark.asyncio
+async def test_item_similarity_is_cosine_pruned_to_k(interactions):
+    """Neighbour lists hold cosine similarities, exclude the post itself and keep K."""
+    recommender = ItemBasedRecommender(interactions, n_similar_posts=2, block_size=2)
+    await recommender.train()
+
+    similarity = recommender.item_similarity
+    assert similarity.shape == (5, 5)
+    assert np.all(np.diff(similarity.indptr) <= 2)
+    assert similarity.diagonal().sum() == 0
+
+    a, b = recommender.posts.get("a"), recommender.posts.get("b")
+    # a: users 1, 2, 5, 6; b: users 1, 2, 3 -> 2 / sqrt(4 * 3)
+    assert similarity[a, b] == pytest.approx(2 / np.sqrt(12))
+
+
+@pytest.mark.asyncio
+async def test_recommends_neighbours_of_recent_posts(interactions):
+    """Users get unseen posts similar to the ones they touched, tagged with the engine."""
+    recommender = ItemBasedRecommender(interactions)
+    await recommender.train()
+
+    recommendations = await recommender.generate_recommendations("user6", limit=10)
+
+    assert recommendations[0].post_id == "b"
+    assert "a" not in {r.post_id for r in recommendations}
+    assert all(r.reason == "item_based_filtering" for r in recommendations)
+    assert recommender.model_version == "item_based_v1"
+
+    batch = await recommender.generate_batch_recommendations(
+        [RecommendationQuery(user_id="user6", limit=10), RecommendationQuery(user_id="nobody")]
+    )
+    assert batch == [recommendations, []]
+
+
+@pytest.mark.asyncio
+async def test_only_recent_posts_are_scored(interactions):
+    """Older posts beyond ``n_recent_posts`` no longer contribute neighbours."""
+    recommender = ItemBasedRecommender(interactions, n_recent_posts=1)
+    await recommender.train()
+
+    # user5 touched x, y, then a; only a's neighbours (b, c) remain candidates
+    recommendations = await recommender.generate_recommendations("user5", limit=10)
+    assert {r.post_id for r in recommendations} <= {"b", "c"}
+
+
+@pytest.mark.asyncio
+async def test_update_folds_new_history_and_keeps_neighbour_lists(interactions):
+    """Incremental updates extend user histories without recomputing item lists."""
+    recommender = ItemBasedRecommender(interactions)
+    await recommender.train()
+    similarity = recommender.item_similarity
+
+    new = [
+        Interaction("n1", "user6", "x", "like", recommender.watermark + timedelta(minutes=1)),
+        Interaction(
+            "n2", "user7", "new-post", "like", recommender.watermark + timedelta(minutes=2)
+        ),
+    ]
+    assert await recommender.update(new)
+
+    assert recommender.item_similarity.shape == (6, 6)
+    assert recommender.item_similarity[:5, :5].nnz == similarity.nnz
+    recommendations = await recommender.generate_recommendations("user6", limit=10)
+    assert "y" in {r.post_id for r in recommendations}
+    assert await recommender.generate_recommendations("user7") == []
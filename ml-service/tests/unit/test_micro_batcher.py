@@ -0,0 +1,76 @@
+"""Unit tests for the micro-batching scheduler."""
+
+import asyncio
+
+import pytest
+
+from app.domain.entities.recommendation import Recommendation, RecommendationQuery
+from app.domain.services.recommender_interface import RecommenderInterface
+from app.infrastructure.ml.micro_batcher import BatchedRecommender, MicroBatcher
+
+
+class RecordingRecommender(RecommenderInterface):
+    """Answers each user with one post named after them and records batch sizes."""
+
+    model_version = "recording_v1"
+
+    def __init__(self, fail: bool = False):
+        self.batch_sizes: list[int] = []
+        self.fail = fail
+
+    async def train(self) -> None:
+        pass
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        raise AssertionError("single-user calls should be batched")
+
+    async def generate_batch_recommendations(
+        self, queries: list[RecommendationQuery]
+    ) -> list[list[Recommendation]]:
+        self.batch_sizes.append(len(queries))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return [
+            [Recommendation(user_id=q.user_id, post_id=f"post-{q.user_id}", score=1.0)]
+            for q in queries
+        ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_answered_by_batched_model_calls():
+    """Calls within the delay share one batch; a full batch flushes at once."""
+    recommender = RecordingRecommender()
+    batched = BatchedRecommender(recommender, MicroBatcher(max_batch_size=4, max_delay_us=1000))
+
+    results = await asyncio.gather(
+        *(batched.generate_recommendations(f"user{i}", limit=5) for i in range(6))
+    )
+
+    assert [r[0].post_id for r in results] == [f"post-user{i}" for i in range(6)]
+    assert recommender.batch_sizes == [4, 2]
+    assert batched.model_version == "recording_v1"
+
+
+@pytest.mark.asyncio
+async def test_recommenders_are_batched_separately_and_errors_reach_every_caller():
+    """A batch never mixes models, and a failed batch fails each of its callers."""
+    batcher = MicroBatcher(max_batch_size=10, max_delay_us=100)
+    healthy, failing = RecordingRecommender(), RecordingRecommender(fail=True)
+    query = RecommendationQuery(user_id="user", limit=5)
+
+    results = await asyncio.gather(
+        batcher.submit(healthy, query),
+        batcher.submit(failing, query),
+        batcher.submit(failing, query),
+        return_exceptions=True,
+    )
+
+    assert results[0][0].post_id == "post-user"
+    assert [type(r) for r in results[1:]] == [RuntimeError, RuntimeError]
+    assert (healthy.batch_sizes, failing.batch_sizes) == ([1], [2])
+    assert (batcher.batches, batcher.queries) == (2, 3)
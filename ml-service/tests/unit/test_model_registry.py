@@ -0,0 +1,287 @@
+"""Unit tests for the process-wide model registry."""
+
+import asyncio
+import gc
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import InteractionColumns
+from app.domain.entities.recommendation import Recommendation
+from app.domain.services.recommender_interface import RecommenderInterface
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.ml import model_registry
+from app.infrastructure.ml.model_registry import ModelRegistry
+
+
+class FakeRecommender(RecommenderInterface):
+    """Recommender that only counts how often it was trained."""
+
+    def __init__(self, interactions: InteractionColumns):
+        self.interactions = interactions
+        self.train_calls = 0
+        self.watermark = interactions.watermark
+
+    async def train(self) -> None:
+        await asyncio.sleep(0)
+        self.train_calls += 1
+
+    async def generate_recommendations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        exclude_post_ids: list[str] | None = None,
+    ) -> list[Recommendation]:
+        return []
+
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registry whose repository returns a fixed interaction list."""
+    interactions = [Interaction("1", "user1", "post1", "like", datetime.now())]
+    loads: list[tuple[str, object, object]] = []
+
+    class FakeRepository:
+        def __init__(self, session):
+            pass
+
+        async def load_interaction_columns(
+            self, batch_size, users=None, posts=None, decay=None, window=None
+        ):
+            loads.append(("raw", decay, window))
+            return InteractionColumns.from_interactions(interactions, users, posts)
+
+        async def load_aggregated_interaction_columns(
+            self, batch_size, users=None, posts=None, decay=None, window=None
+        ):
+            loads.append(("aggregated", decay, window))
+            return InteractionColumns.from_interactions(interactions, users, posts)
+
+        async def get_interactions_since(self, since):
+            return [i for i in interactions if i.created_at >= since]
+
+    monkeypatch.setattr(model_registry, "SQLAlchemyInteractionRepository", FakeRepository)
+    built: list[FakeRecommender] = []
+
+    def factory(interactions):
+        recommender = FakeRecommender(interactions)
+        built.append(recommender)
+        return recommender
+
+    registry = ModelRegistry(
+        session_factory=fake_session,
+        recommender_factories={"default": factory, "other": factory, "trending": factory},
+        default_engine="default",
+        cold_start_engine="",
+    )
+    registry.built = built
+    registry.loads = loads
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_trained_model(registry):
+    """Concurrent first requests should train the model exactly once."""
+    results = await asyncio.gather(*(registry.get_recommender() for _ in range(10)))
+
+    assert len(registry.built) == 1
+    assert all(r is registry.built[0] for r in results)
+    assert registry.built[0].train_calls == 1
+    assert registry.trained_at is not None
+
+
+@pytest.mark.asyncio
+async def test_refresh_swaps_in_new_model(registry):
+    """An explicit refresh should publish a freshly trained model."""
+    first = await registry.get_recommender()
+    second = await registry.refresh()
+
+    assert second is not first
+    assert await registry.get_recommender() is second
+
+
+@pytest.mark.asyncio
+async def test_pinned_generation_outlives_a_refresh_until_released(registry):
+    """A request keeps its generation whole across a swap; the old one is then freed."""
+    registry.cold_start_engine = "other"
+    pinned = await registry.acquire()
+    default, cold_start = pinned.recommenders["default"], pinned.cold_start_for("default")
+
+    await registry.refresh()
+    current = registry.current
+
+    assert current.number == pinned.number + 1
+    assert current.trained_at > pinned.trained_at
+    assert current.id != pinned.id
+    assert pinned.recommenders["default"] is default
+    assert pinned.cold_start_for("default") is cold_start
+    assert current.recommenders["default"] is not default
+    assert registry.retired_in_use == 1
+
+    del pinned, default, cold_start
+    gc.collect()
+    assert registry.retired_in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_preloaded_registry_is_not_trained_again_when_started(registry):
+    """Workers forked by app.serve start their loops on the models loaded before the fork."""
+    await registry.refresh()
+    await registry.start()
+    await asyncio.sleep(0.01)
+    await registry.stop()
+
+    assert len(registry.built) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_publishes_a_new_generation_and_leaves_the_pinned_one_intact(monkeypatch):
+    """Updates fold into a copy of the model; a request pinned before keeps the old one."""
+    from app.infrastructure.ml.collaborative_filter import CollaborativeFilterRecommender
+    from app.infrastructure.ml.neighbors import RandomProjectionLSHIndex
+
+    base = datetime(2025, 1, 1)
+    likes = {
+        "user1": ["a", "b", "c"],
+        "user2": ["a", "b"],
+        "user3": ["b", "c", "d"],
+        "user4": ["d"],
+    }
+    interactions = [
+        Interaction(f"{user}-{post}", user, post, "like", base + timedelta(hours=offset))
+        for user, posts in likes.items()
+        for offset, post in enumerate(posts)
+    ]
+
+    class FakeRepository:
+        def __init__(self, session):
+            pass
+
+        async def load_aggregated_interaction_columns(
+            self, batch_size, users=None, posts=None, decay=None, window=None
+        ):
+            return InteractionColumns.from_interactions(interactions, users, posts, decay)
+
+        async def get_interactions_since(self, since):
+            return [i for i in interactions if i.created_at >= since]
+
+    monkeypatch.setattr(model_registry, "SQLAlchemyInteractionRepository", FakeRepository)
+    registry = ModelRegistry(
+        session_factory=fake_session,
+        recommender_factories={
+            "default": lambda columns: CollaborativeFilterRecommender(
+                columns,
+                n_neighbors=2,
+                neighbor_index=RandomProjectionLSHIndex(n_tables=4, n_bits=2),
+            )
+        },
+        default_engine="default",
+        cold_start_engine="",
+    )
+    pinned = await registry.acquire()
+    published = pinned.recommenders["default"]
+    index, watermark = published.model, published.watermark
+    before = await published.generate_recommendations("user2")
+
+    interactions.append(Interaction("new-1", "user2", "c", "like", base + timedelta(days=1)))
+    assert await registry.update() is True
+    current = registry.current
+
+    assert current.number == pinned.number + 1
+    assert current.trained_at == pinned.trained_at
+    assert current.id != pinned.id and current.id.startswith(pinned.id)
+    # Same epoch: only user2's cached responses are outdated
+    assert current.epoch == pinned.epoch
+    assert current.changed_at("user2") == current.number
+    assert current.changed_at("user4") == pinned.epoch
+    assert current.recommenders["default"] is not published
+    assert current.recommenders["default"].watermark > watermark
+    assert published.model is index and published.watermark == watermark
+    assert await published.generate_recommendations("user2") == before
+    # user2 now has "c" and is no longer recommended it, by the new generation only
+    updated = await current.recommenders["default"].generate_recommendations("user2")
+    assert "c" in [r.post_id for r in before]
+    assert "c" not in [r.post_id for r in updated]
+
+    # Nothing new: no generation is published
+    assert await registry.update() is True
+    assert registry.current is current
+
+
+@pytest.mark.asyncio
+async def test_update_rebuilds_when_engine_cannot_update_incrementally(registry):
+    """Engines without incremental support should be retrained by update()."""
+    assert await registry.update() is False
+
+    first = await registry.get_recommender()
+    assert await registry.update() is True
+
+    assert registry.recommender is not first
+    assert len(registry.built) == 2
+
+
+@pytest.mark.asyncio
+async def test_other_engine_is_built_on_first_use_and_refreshed(registry):
+    """Selecting a second engine builds it lazily; refresh rebuilds every built engine."""
+    default = await registry.get_recommender()
+    other = await registry.get_recommender("other")
+
+    assert other is not default
+    assert await registry.get_recommender("other") is other
+    assert len(registry.built) == 2
+
+    await registry.refresh()
+    assert len(registry.built) == 4
+    assert await registry.get_recommender("other") is not other
+
+    with pytest.raises(ValueError):
+        await registry.get_recommender("missing")
+
+
+@pytest.mark.asyncio
+async def test_cold_start_engine_is_refreshed_with_the_default(registry):
+    """The cold-start engine is warmed by refresh and never falls back to itself."""
+    registry.cold_start_engine = "other"
+
+    await registry.refresh()
+
+    assert len(registry.built) == 2
+    assert await registry.get_cold_start_recommender() is registry.built[1]
+    assert await registry.get_cold_start_recommender("other") is None
+
+
+@pytest.mark.asyncio
+async def test_trending_is_trained_on_recent_raw_rows_without_the_training_decay(
+    registry, monkeypatch
+):
+    """Trending gets one undecayed row per recent interaction; the others get the aggregate."""
+    monkeypatch.setattr(
+        model_registry,
+        "get_settings",
+        lambda: Settings(weight_half_life_days=7, trending_half_life_hours=6),
+    )
+    registry.cold_start_engine = "trending"
+
+    await registry.refresh()
+
+    assert [kind for kind, _, _ in registry.loads] == ["aggregated", "raw"]
+    assert registry.loads[0][1] is not None
+    assert registry.loads[1][1:] == (None, timedelta(hours=120))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_and_cold_requests_share_one_rebuild(registry):
+    """A request during the startup refresh waits for it instead of training again."""
+    results = await asyncio.gather(
+        registry.refresh(), registry.refresh(), registry.get_recommender()
+    )
+
+    assert len(registry.built) == 1
+    assert all(r is registry.built[0] for r in results)
@@ -0,0 +1,281 @@
+"""Unit tests for memory-mapped model snapshots."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import InteractionColumns, TimeDecay
+from app.domain.entities.recommendation import RecommendationQuery
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.ml import model_registry
+from app.infrastructure.ml.als_recommender import ImplicitALSRecommender
+from app.infrastructure.ml.collaborative_filter import CollaborativeFilterRecommender
+from app.infrastructure.ml.item_based_filter import ItemBasedRecommender
+from app.infrastructure.ml.model_registry import ModelRegistry
+from app.infrastructure.ml.neighbors import RandomProjectionLSHIndex
+from app.infrastructure.ml.trending import TrendingRecommender
+from app.infrastructure.storage.model_snapshot import EngineSnapshot, ModelSnapshotStore
+
+
+BASE = datetime(2025, 1, 1)
+
+ENGINES = {
+    "user_based": lambda columns: CollaborativeFilterRecommender(columns, n_neighbors=2),
+    "lsh": lambda columns: CollaborativeFilterRecommender(
+        columns, n_neighbors=2, neighbor_index=RandomProjectionLSHIndex(n_tables=4, n_bits=2)
+    ),
+    "item_based": ItemBasedRecommender,
+    "als": lambda columns: ImplicitALSRecommender(columns, factors=2, n_workers=1),
+    "trending": TrendingRecommender,
+}
+
+
+def interactions() -> list[Interaction]:
+    """Users 1-3 share posts a-c, users 4-5 share x and y."""
+    likes = {
+        "user1": ["a", "b", "c"],
+        "user2": ["a", "b"],
+        "user3": ["b", "c", "d"],
+        "user4": ["x", "y"],
+        "user5": ["x", "y", "a"],
+    }
+    return [
+        Interaction(f"{user}-{post}", user, post, "like", BASE + timedelta(hours=offset))
+        for user, posts in likes.items()
+        for offset, post in enumerate(posts)
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", list(ENGINES))
+async def test_restored_model_answers_like_the_trained_one_and_keeps_updating(engine, tmp_path):
+    """Arrays come back memory-mapped, recommendations are identical and updates still work."""
+    decay = TimeDecay(half_life_days=7).at(BASE + timedelta(hours=2))
+    trained = ENGINES[engine](InteractionColumns.from_interactions(interactions(), decay=decay))
+    await trained.train()
+    store = ModelSnapshotStore(tmp_path)
+    arrays, metadata = trained.snapshot_state()
+    updated_at = datetime.now(UTC)
+    version = store.save(
+        updated_at - timedelta(minutes=1),
+        trained.users,
+        trained.posts,
+        {engine: EngineSnapshot(trained.model_version, arrays, metadata)},
+        updated_at,
+    )
+
+    snapshot = store.load()
+    assert snapshot.version == version
+    assert snapshot.updated_at == updated_at
+    saved = snapshot.engines[engine]
+    assert all(isinstance(array, np.memmap) for array in saved.arrays.values())
+    restored = ENGINES[engine](
+        InteractionColumns.from_interactions([], snapshot.users, snapshot.posts)
+    )
+    restored.restore_state(saved.arrays, saved.metadata)
+
+    queries = [RecommendationQuery(user_id=f"user{i}", limit=5) for i in range(1, 6)]
+    assert await restored.generate_batch_recommendations(
+        queries
+    ) == await trained.generate_batch_recommendations(queries)
+    assert restored.interactions.decay == decay
+
+    new = [
+        Interaction("new-1", "user6", "a", "like", BASE + timedelta(days=1)),
+        Interaction("new-2", "user2", "e", "share", BASE + timedelta(days=1)),
+    ]
+    assert await restored.update(new)
+    assert await trained.update(new)
+    assert await restored.generate_batch_recommendations(
+        queries
+    ) == await trained.generate_batch_recommendations(queries)
+
+
+def test_only_the_newest_snapshots_are_kept(tmp_path):
+    """Older versions are pruned once a new snapshot is published."""
+    store = ModelSnapshotStore(tmp_path, keep=2)
+    columns = InteractionColumns.from_interactions(interactions())
+    versions = [
+        store.save(BASE + timedelta(minutes=minute), columns.users, columns.posts, {})
+        for minute in range(3)
+    ]
+
+    assert store.current_version() == versions[-1]
+    assert sorted(path.name for path in tmp_path.iterdir() if path.is_dir()) == versions[1:]
+
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+
+@pytest.mark.asyncio
+async def test_second_registry_serves_the_snapshot_without_loading_interactions(
+    monkeypatch, tmp_path
+):
+    """A rebuild saves a snapshot; a new process's first request restores it instead."""
+    loads = []
+
+    class FakeRepository:
+        def __init__(self, session):
+            pass
+
+        async def load_interaction_columns(
+            self, batch_size, users=None, posts=None, decay=None, window=None
+        ):
+            loads.append(batch_size)
+            return InteractionColumns.from_interactions(interactions(), users, posts)
+
+    monkeypatch.setattr(model_registry, "SQLAlchemyInteractionRepository", FakeRepository)
+
+    def create_registry():
+        return ModelRegistry(
+            session_factory=fake_session,
+            recommender_factories={"trending": TrendingRecommender},
+            default_engine="trending",
+            cold_start_engine="",
+            snapshot_dir=str(tmp_path),
+            snapshot_only=False,
+        )
+
+    trainer = create_registry()
+    await trainer.refresh()
+    assert trainer.snapshot_version is not None
+
+    server = create_registry()
+    recommender = await server.get_recommender()
+
+    assert len(loads) == 1
+    assert server.snapshot_version == trainer.snapshot_version
+    assert server.trained_at == trainer.trained_at
+    expected = await trainer.recommender.generate_recommendations("anyone")
+    assert await recommender.generate_recommendations("anyone") == expected
+
+    # The restored dictionaries are published with the engines, and saved from there
+    generation = server.current
+    assert generation.users is recommender.users and generation.posts is recommender.posts
+    saved = []
+    store = server._snapshot_store()
+    monkeypatch.setattr(store, "save", lambda *args: saved.append(args) or "saved")
+    server.snapshot_only = False
+    async with server._lock:
+        await server._save_snapshot()
+    assert saved[0][:3] == (generation.trained_at, generation.users, generation.posts)
+
+
+@pytest.mark.asyncio
+async def test_shared_model_is_published_once_followed_and_taken_over(monkeypatch, tmp_path):
+    """One registry trains and publishes; the other maps its snapshots and inherits the role."""
+    loads = []
+
+    class FakeRepository:
+        def __init__(self, session):
+            pass
+
+        async def load_interaction_columns(
+            self, batch_size, users=None, posts=None, decay=None, window=None
+        ):
+            loads.append(batch_size)
+            return InteractionColumns.from_interactions(interactions(), users, posts)
+
+    monkeypatch.setattr(model_registry, "SQLAlchemyInteractionRepository", FakeRepository)
+    monkeypatch.setattr(
+        model_registry, "get_settings", lambda: Settings(model_snapshot_poll_seconds=0.01)
+    )
+
+    def create_registry():
+        return ModelRegistry(
+            session_factory=fake_session,
+            recommender_factories={"trending": TrendingRecommender},
+            default_engine="trending",
+            cold_start_engine="",
+            snapshot_dir=str(tmp_path),
+            snapshot_shared=True,
+        )
+
+    async def wait_for(condition):
+        for _ in range(200):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError("condition not reached")
+
+    publisher, follower = create_registry(), create_registry()
+    await publisher.start()
+    await publisher.get_recommender()
+    await follower.start()
+    await follower.get_recommender()
+
+    assert not publisher.snapshot_only
+    assert follower.snapshot_only
+    assert len(loads) == 1
+    assert follower.snapshot_version == publisher.snapshot_version
+    assert not await follower.update()
+
+    await publisher.refresh()
+    await wait_for(lambda: follower.snapshot_version == publisher.snapshot_version)
+    assert len(loads) == 2
+
+    await publisher.stop()
+    await wait_for(lambda: not follower.snapshot_only)
+    await follower.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("shared", [True, False])
+async def test_forked_worker_keeps_the_preloaded_arrays_after_an_update_tick(
+    monkeypatch, tmp_path, shared
+):
+    """Workers follow the publisher, or serve the preloaded models as is; neither copies them."""
+    rows = interactions()
+
+    class FakeRepository:
+        def __init__(self, session):
+            pass
+
+        async def load_aggregated_interaction_columns(
+            self, batch_size, users=None, posts=None, decay=None, window=None
+        ):
+            return InteractionColumns.from_interactions(rows, users, posts)
+
+        async def get_interactions_since(self, since):
+            return [i for i in rows if i.created_at >= since]
+
+    monkeypatch.setattr(model_registry, "SQLAlchemyInteractionRepository", FakeRepository)
+
+    def create_registry(interval_seconds):
+        return ModelRegistry(
+            session_factory=fake_session,
+            recommender_factories={"lsh": ENGINES["lsh"]},
+            default_engine="lsh",
+            cold_start_engine="",
+            refresh_interval_seconds=interval_seconds,
+            update_interval_seconds=interval_seconds,
+            snapshot_dir=str(tmp_path) if shared else "",
+            snapshot_shared=False,
+        )
+
+    # app.serve preloads in the master; another worker already holds the publisher lock
+    worker = create_registry(0.01)
+    await worker.warm_start()
+    preloaded = worker.current
+    matrix = preloaded.recommenders["lsh"].user_item_matrix
+    publisher = create_registry(0)
+    if shared:
+        publisher.snapshot_shared = True
+        await publisher.start()
+
+    worker.follow_in_forked_worker()
+    await worker.start()
+    rows.append(Interaction("new-1", "user6", "a", "like", BASE + timedelta(days=1)))
+    await asyncio.sleep(0.1)
+    await worker.stop()
+    await publisher.stop()
+
+    assert worker.snapshot_only == shared
+    assert worker.current is preloaded
+    assert preloaded.recommenders["lsh"].user_item_matrix is matrix
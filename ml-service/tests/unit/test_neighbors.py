@@ -0,0 +1,106 @@
+"""Tests for nearest-neighbour index backends"""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from app.infrastructure.ml.neighbors import (
+    BruteForceIndex,
+    RandomProjectionLSHIndex,
+    create_neighbor_index,
+)
+
+
+def make_clustered_matrix(n_users: int = 400, n_posts: int = 600, n_clusters: int = 8):
+    """Users in the same cluster interact with overlapping post ranges."""
+    rng = np.random.default_rng(0)
+    posts_per_cluster = n_posts // n_clusters
+    rows, cols = [], []
+    for user in range(n_users):
+        offset = (user % n_clusters) * posts_per_cluster
+        picked = rng.choice(posts_per_cluster, size=15, replace=False) + offset
+        rows.extend([user] * len(picked))
+        cols.extend(picked)
+    data = np.ones(len(rows), dtype=np.float32)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n_users, n_posts))
+
+
+def test_lsh_neighbours_share_the_query_cluster():
+    """LSH neighbours come from the same cluster as brute-force ones"""
+    matrix = make_clustered_matrix()
+    index = RandomProjectionLSHIndex(n_tables=8, n_bits=6, n_components=16).fit(matrix)
+
+    distances, indices = index.kneighbors(matrix[:40], n_neighbors=5)
+
+    assert distances.shape == indices.shape == (40, 5)
+    assert np.all(np.diff(distances, axis=1) >= 0)
+    assert np.mean(indices % 8 == np.arange(40)[:, None] % 8) > 0.9
+
+
+def test_lsh_candidate_cap_keeps_rows_colliding_most():
+    """Capped candidates favour rows sharing the most buckets, not the lowest indices"""
+    matrix = make_clustered_matrix()
+    # The query's cluster (users 0, 8, 16, ...) moved to the highest row indices
+    cluster = np.arange(0, matrix.shape[0], 8)
+    order = np.concatenate([np.setdiff1d(np.arange(matrix.shape[0]), cluster), cluster])
+    matrix = matrix[order]
+    index = RandomProjectionLSHIndex(n_tables=8, n_bits=3, n_components=16, max_candidates=40)
+    index.fit(matrix)
+
+    _, indices = index.kneighbors(matrix[-1], n_neighbors=10)
+
+    assert np.mean(indices[0] >= matrix.shape[0] - cluster.size) > 0.9
+
+
+def test_lsh_partial_fit_indexes_appended_rows():
+    """Rows appended after fit become findable after partial_fit"""
+    matrix = make_clustered_matrix()
+    index = RandomProjectionLSHIndex(n_tables=8, n_bits=6, n_components=16).fit(matrix)
+
+    index.partial_fit(np.array([matrix.shape[0]]), matrix[3])
+    _, indices = index.kneighbors(matrix[3], n_neighbors=2)
+
+    assert set(indices[0]) == {3, matrix.shape[0]}
+
+
+def test_partial_fit_reuses_untouched_rows_and_buckets():
+    """Only changed rows are re-hashed; the fitted rows and the other bucket entries are kept"""
+    matrix = make_clustered_matrix()
+    rows = np.array([5, 17, matrix.shape[0]])
+    changed = sparse.vstack([matrix[9], matrix[30], matrix[3]], format="csr")
+    updated = sparse.vstack([matrix, matrix[3]], format="lil")
+    updated[rows] = changed
+    updated = updated.tocsr()
+
+    index = RandomProjectionLSHIndex(n_tables=8, n_bits=6, n_components=16).fit(matrix)
+    normalized, order = index._normalized.base, index._order
+    hashed = []
+    hash_rows = index._hash
+    index._hash = lambda r: hashed.append(r.shape[0]) or hash_rows(r)
+    index.partial_fit(rows, changed)
+
+    assert hashed == [rows.size]
+    assert index._normalized.base is normalized
+    for table in range(index.n_tables):
+        # Untouched rows keep their relative order; changed rows sit in their new buckets
+        new_order, old_order = index._order[table], order[table]
+        assert np.array_equal(
+            new_order[~np.isin(new_order, rows)], old_order[~np.isin(old_order, rows)]
+        )
+        assert np.all(index._sorted_codes[table][:-1] <= index._sorted_codes[table][1:])
+    assert set(index.kneighbors(matrix[3], n_neighbors=2)[1][0]) == {3, matrix.shape[0]}
+
+    brute = BruteForceIndex().fit(matrix)
+    brute.partial_fit(rows, changed)
+    distances, _ = brute.kneighbors(updated[:40], n_neighbors=5)
+    expected, _ = BruteForceIndex().fit(updated).kneighbors(updated[:40], n_neighbors=5)
+    assert brute._rows.base is matrix
+    np.testing.assert_allclose(distances, expected, atol=1e-6)
+
+
+def test_create_neighbor_index():
+    """Factory returns the requested backend and rejects unknown names"""
+    assert isinstance(create_neighbor_index("brute"), BruteForceIndex)
+    assert isinstance(create_neighbor_index("lsh", n_tables=4), RandomProjectionLSHIndex)
+    with pytest.raises(ValueError):
+        create_neighbor_index("faiss")
@@ -0,0 +1,55 @@
+"""Unit tests for reading the serving processes' memory from /proc."""
+
+import os
+import signal
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.infrastructure.monitoring.process_memory import (
+    child_pids,
+    read_process_memory,
+    serving_processes,
+)
+
+
+pytestmark = pytest.mark.skipif(
+    not Path("/proc/self/smaps_rollup").exists(), reason="needs Linux /proc smaps_rollup"
+)
+
+
+def test_forked_child_shares_the_parents_arrays():
+    """Pages loaded before the fork count as shared in both processes, not twice."""
+    model = np.ones(64 * 1024 * 1024 // 8)
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: read the array, report ready and wait to be measured
+        os.close(read)
+        float(model.sum())
+        os.write(write, b"x")
+        time.sleep(30)
+        os._exit(0)
+
+    try:
+        os.close(write)
+        os.read(read, 1)
+        assert pid in child_pids(os.getpid())
+        child = read_process_memory(pid, "worker")
+        processes = serving_processes(os.getpid())
+    finally:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    assert child.shared >= model.nbytes
+    assert child.pss < child.rss - model.nbytes // 4
+    assert processes[0].role == "master"
+    assert pid in [p.pid for p in processes if p.role == "worker"]
+
+
+def test_gone_process_reads_as_none():
+    """A worker that exited between listing and reading is skipped."""
+    assert read_process_memory(2**22 + 1) is None
+    assert serving_processes()[0].pid == os.getpid()
@@ -0,0 +1,74 @@
+"""Unit tests for the in-process response cache."""
+
+from app.infrastructure.cache.response_cache import ResponseCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl_and_count_hits_and_misses():
+    """A hit within the TTL, then a miss once the entry expired."""
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=10, ttl_seconds=30, clock=clock)
+
+    assert cache.get("user1", version=1) is None
+    cache.put("user1", "response", version=1)
+    assert cache.get("user1", version=1) == "response"
+
+    clock.now = 30.0
+    assert cache.get("user1", version=1) is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations, stats.size) == (1, 2, 1, 0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Reading an entry protects it from the next eviction."""
+    cache = ResponseCache(max_entries=2, ttl_seconds=30)
+    cache.put("a", 1, version=1)
+    cache.put("b", 2, version=1)
+    cache.get("a", version=1)
+
+    cache.put("c", 3, version=1)
+
+    assert cache.get("b", version=1) is None
+    assert cache.get("a", version=1) == 1
+    assert cache.get("c", version=1) == 3
+    assert cache.stats().evictions == 1
+
+
+def test_new_model_version_drops_every_entry_and_stale_values_are_not_stored():
+    """A swap invalidates the cache; a response computed by the old model is discarded."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=30)
+    cache.put("a", "old", version=1)
+
+    assert cache.get("a", version=2) is None
+    cache.put("b", "computed before the swap", version=1)
+
+    assert len(cache) == 0
+    assert cache.stats().invalidations == 1
+    cache.put("b", "new", version=2)
+    assert cache.get("b", version=2) == "new"
+
+
+def test_update_drops_only_the_entries_it_changed():
+    """Entries computed before their key last changed are stale; the others survive."""
+    cache = ResponseCache(max_entries=10, ttl_seconds=30)
+    cache.put("user1", "before", version=1, computed_by=1)
+    cache.put("user2", "before", version=1, computed_by=1)
+
+    # Generation 2 updated user1 only, keeping the version (epoch) 1
+    assert cache.get("user1", version=1, changed_at=2) is None
+    assert cache.get("user2", version=1, changed_at=1) == "before"
+
+    cache.put("user1", "after", version=1, computed_by=2)
+    assert cache.get("user1", version=1, changed_at=2) == "after"
+    stats = cache.stats()
+    assert (stats.stale, stats.invalidations, stats.size) == (1, 0, 2)
@@ -0,0 +1,74 @@
+"""Unit tests for single-flight coalescing."""
+
+import asyncio
+
+import pytest
+
+from app.infrastructure.cache.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_computation():
+    """Callers for the same key get one result; other keys run separately."""
+    flights = SingleFlight()
+    calls: list[str] = []
+    release = asyncio.Event()
+
+    async def compute(key: str) -> str:
+        calls.append(key)
+        await release.wait()
+        return f"result-{key}"
+
+    waiting = [
+        asyncio.create_task(flights.do(key, lambda key=key: compute(key)))
+        for key in ("a", "a", "a", "b")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiting) == ["result-a"] * 3 + ["result-b"]
+    assert sorted(calls) == ["a", "b"]
+    assert (flights.started, flights.coalesced, len(flights)) == (2, 2, 0)
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller_and_free_the_key():
+    """A failure is raised to all waiters and the next call starts afresh."""
+    flights = SingleFlight()
+
+    async def fail() -> None:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flights.do("k", fail), flights.do("k", fail), return_exceptions=True
+    )
+
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert flights.started == 1
+
+    async def succeed() -> str:
+        return "ok"
+
+    assert await flights.do("k", succeed) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_computation():
+    """The first caller going away leaves the work running for the others."""
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.do("k", compute))
+    second = asyncio.create_task(flights.do("k", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,24 @@
+"""Unit test guarding the modules loaded when the app is imported."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+HEAVY_MODULES = ("mlflow", "matplotlib", "seaborn", "polars", "pandas", "sklearn", "scipy")
+
+
+def test_importing_app_does_not_load_heavy_modules():
+    """Training and diagnostics dependencies stay unloaded until first use."""
+    code = (
+        f"import sys, app.main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip().splitlines()[-1:] in ([], [""])
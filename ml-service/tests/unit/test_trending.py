@@ -0,0 +1,127 @@
+"""Unit tests for the trending (cold-start) recommender."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.domain.entities.interaction import Interaction
+from app.domain.entities.interaction_columns import (
+    InteractionColumns,
+    InteractionColumnsBuilder,
+    TimeDecay,
+)
+from app.domain.entities.recommendation import RecommendationQuery
+from app.infrastructure.ml.trending import TrendingRecommender
+
+
+NOW = datetime(2025, 1, 10)
+
+
+def like(id_: str, post_id: str, age: timedelta) -> Interaction:
+    return Interaction(id_, f"user-{id_}", post_id, "like", NOW - age)
+
+
+@pytest.fixture
+def interactions():
+    """Post old has the most likes, but two days ago; post new has fewer, today."""
+    return [
+        *(like(f"o{i}", "old", timedelta(days=2)) for i in range(3)),
+        *(like(f"n{i}", "new", timedelta(hours=1)) for i in range(2)),
+        like("m", "mid", timedelta(hours=12)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recent_posts_outrank_older_more_popular_ones(interactions):
+    """Scores halve every half-life, and any user, known or not, gets the same ranking."""
+    recommender = TrendingRecommender(interactions, half_life_hours=12)
+    await recommender.train()
+
+    recommendations = await recommender.generate_recommendations("brand-new-user", limit=2)
+
+    assert [r.post_id for r in recommendations] == ["new", "mid"]
+    assert recommendations[0].score == 1.0
+    assert {r.reason for r in recommendations} == {"trending"}
+    assert recommender.model_version == "trending_v1"
+
+    batch = await recommender.generate_batch_recommendations(
+        [
+            RecommendationQuery(user_id="a", limit=2, exclude_post_ids=["new", "unknown"]),
+            RecommendationQuery(user_id="b", limit=5),
+        ]
+    )
+    assert [r.post_id for r in batch[0]] == ["mid", "old"]
+    assert [r.post_id for r in batch[1]] == ["new", "mid", "old"]
+
+
+@pytest.mark.asyncio
+async def test_update_matches_a_full_retrain(interactions):
+    """Adding the delta's growth terms ranks posts exactly as retraining on everything."""
+    delta = [
+        Interaction("d1", "user-d", "fresh", "share", NOW + timedelta(hours=2)),
+        Interaction("d2", "user-d", "old", "like", NOW + timedelta(hours=3)),
+    ]
+    incremental = TrendingRecommender(interactions[:4], half_life_hours=12, n_top=2)
+    await incremental.train()
+    assert await incremental.update(interactions[4:] + delta)
+    # Rows at the watermark are returned again and must not count twice
+    assert await incremental.update(delta[-1:])
+
+    full = TrendingRecommender(interactions + delta, half_life_hours=12, n_top=2)
+    await full.train()
+
+    assert incremental.top_posts.size == 2
+    assert incremental.posts.decode(incremental.top_posts) == full.posts.decode(full.top_posts)
+    ratio = incremental.top_scores / full.top_scores
+    assert ratio == pytest.approx(np.full(2, ratio[0]))
+
+
+@pytest.mark.asyncio
+async def test_anchor_is_rebased_before_scores_overflow(interactions):
+    """Updates far past the anchor rescale the scores instead of overflowing."""
+    recommender = TrendingRecommender(interactions, half_life_hours=1)
+    await recommender.train()
+
+    later = Interaction("late", "user-late", "late", "view", NOW + timedelta(days=60))
+    assert await recommender.update([later])
+
+    assert np.isfinite(recommender.scores).all()
+    assert recommender.posts.decode(recommender.top_posts[:1]) == ["late"]
+
+
+@pytest.mark.asyncio
+async def test_untrained_recommender_cannot_update():
+    """Updates before the first training ask the registry for a rebuild."""
+    recommender = TrendingRecommender([])
+    await recommender.train()
+
+    assert not await recommender.update([like("x", "post", timedelta(0))])
+    assert await recommender.generate_recommendations("user") == []
+
+
+@pytest.mark.asyncio
+async def test_training_decay_does_not_change_the_trending_scores(interactions):
+    """Raw rows carrying the training decay are scored by the trending half-life alone."""
+    decayed = InteractionColumns.from_interactions(interactions, decay=TimeDecay(1.0).at(NOW))
+    plain = InteractionColumns.from_interactions(interactions)
+    with_decay = TrendingRecommender(decayed, half_life_hours=12)
+    without_decay = TrendingRecommender(plain, half_life_hours=12)
+    await with_decay.train()
+    await without_decay.train()
+
+    assert with_decay.scores == pytest.approx(without_decay.scores)
+
+
+@pytest.mark.asyncio
+async def test_pre_aggregated_columns_with_a_decay_are_rejected():
+    """Summed, decayed (user, post) pairs lose the timestamps trending scores need."""
+    builder = InteractionColumnsBuilder()
+    builder.append_aggregated(
+        [("user1", "old", 0.5, NOW - timedelta(days=2)), ("user1", "new", 2.0, NOW)]
+    )
+    columns = builder.build()
+    columns.decay = TimeDecay(1.0).at(NOW)
+
+    with pytest.raises(ValueError):
+        await TrendingRecommender(columns).train()
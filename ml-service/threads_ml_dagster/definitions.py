@@ -4,10 +4,15 @@ import os
 from dagster import Definitions, load_assets_from_package_module
 
 from threads_ml_dagster.load_generation import assets, jobs, resources, schedules
+from threads_ml_dagster.recommendations import assets as recommendation_assets
+from threads_ml_dagster.recommendations.schedules import precompute_job, precompute_schedule
 
 # Load all load generation assets
 load_gen_assets = load_assets_from_package_module(assets)
 
+# Load offline recommendation assets
+recommendation_asset_defs = load_assets_from_package_module(recommendation_assets)
+
 # Define load generation resources
 load_gen_resources = {
     "db": resources.DBResource(),
@@ -19,8 +24,8 @@ load_gen_resources = {
 
 # Create combined definitions
 defs = Definitions(
-    assets=load_gen_assets,
-    jobs=[jobs.continuous_simulation, jobs.manual_simulation],
-    schedules=[schedules.continuous_schedule],
+    assets=[*load_gen_assets, *recommendation_asset_defs],
+    jobs=[jobs.continuous_simulation, jobs.manual_simulation, precompute_job],
+    schedules=[schedules.continuous_schedule, precompute_schedule],
     resources=load_gen_resources,
 )
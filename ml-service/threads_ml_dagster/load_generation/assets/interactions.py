@@ -10,13 +10,17 @@ from sqlalchemy import select
 from app.infrastructure.database.models import Post, UserInteraction
 from app.infrastructure.database.queries import extract_interest_from_bio, get_fake_users
 
+# Most users /recommendations/generate_batch accepts in one request
+BATCH_REQUEST_MAX_USERS = 500
+
 
 @asset(deps=["fake_users", "generated_posts"], required_resource_keys={"db", "ollama"})
 def simulated_interactions(context):
     """Simulate realistic user interactions (views, likes, comments) based on ML recommendations.
 
     Algorithm Overview:
-    1. For each fake user, call the recommendation API to get personalized post suggestions
+    1. Call the batch recommendation API to get personalized post suggestions for all fake users,
+       up to BATCH_REQUEST_MAX_USERS users per request
     2. The recommendation system uses collaborative filtering to predict relevant posts
     3. Fetch recommended posts from database and filter out user's own posts
     4. For each recommended post, use Ollama LLM to decide if user would interact:
@@ -54,22 +58,41 @@ def simulated_interactions(context):
     # ML service API URL (using service name for DNS)
     ml_service_url = "http://ml-service:8000"
 
-    # Each fake user gets recommendations and interacts
+    users_with_interest = []
     for user in fake_user_list:
         interest = extract_interest_from_bio(user.bio)
         if not interest:
             context.log.debug(f"No interest found for user {user.username}, skipping")
             continue
+        users_with_interest.append((user, interest))
 
-        # Get recommended posts for this user via API
-        try:
+    if not users_with_interest:
+        session.close()
+        return {"status": "success", "interactions": 0}
+
+    # Get recommended posts for all users, in as few batch API calls as the API allows
+    results_by_user = {}
+    try:
+        for start in range(0, len(users_with_interest), BATCH_REQUEST_MAX_USERS):
+            chunk = users_with_interest[start:start + BATCH_REQUEST_MAX_USERS]
             response = requests.post(
-                f"{ml_service_url}/recommendations/generate",
-                json={"user_id": user.id, "limit": 5},
-                timeout=10
+                f"{ml_service_url}/recommendations/generate_batch",
+                json={"requests": [{"user_id": user.id, "limit": 5} for user, _ in chunk]},
+                timeout=30
             )
             response.raise_for_status()
-            result = response.json()
+            results_by_user.update(
+                (result["user_id"], result) for result in response.json()["results"]
+            )
+    except Exception as e:
+        context.log.error(f"Error getting batch recommendations: {e}")
+        session.close()
+        return {"status": "error", "interactions": 0}
+
+    # Each fake user interacts with their recommendations
+    for user, interest in users_with_interest:
+        try:
+            result = results_by_user.get(user.id, {})
 
             context.log.info(f"Recommendation API response for {user.username}: {result}")
 
@@ -163,7 +186,7 @@ def simulated_interactions(context):
             context.log.info(f"User {user.username} evaluated {posts_evaluated} posts")
 
         except Exception as e:
-            context.log.error(f"Error getting recommendations for user {user.username}: {e}")
+            context.log.error(f"Error processing recommendations for user {user.username}: {e}")
             continue
 
     session.commit()
@@ -0,0 +1 @@
+"""Dagster definitions for offline recommendation jobs."""
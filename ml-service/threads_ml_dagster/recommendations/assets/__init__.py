@@ -0,0 +1 @@
+"""Dagster assets."""
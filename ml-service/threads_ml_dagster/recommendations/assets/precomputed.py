@@ -0,0 +1,33 @@
+"""Dagster asset for materializing precomputed recommendations."""
+
+import asyncio
+
+from dagster import asset
+
+from app.infrastructure.ml.precompute import run_precompute
+
+
+@asset(required_resource_keys={"db"})
+def precomputed_recommendations(context):
+    """Materialize top-N recommendations for all active users into user_recommendation.
+
+    Trains the recommender on current interactions, scores active users in blocks,
+    COPYs the rows into a staging table and swaps the whole generation in one
+    transaction. The API serves from this table and only scores online on a miss.
+    """
+    db = context.resources.db
+    session = db()
+
+    try:
+        stats = asyncio.run(run_precompute(session))
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    context.log.info(
+        f"Precompute complete: {stats['recommendations']} recommendations "
+        f"for {stats['users']} users, expires at {stats['expires_at']}"
+    )
+    return stats
@@ -0,0 +1,16 @@
+"""Recommendation precompute job and schedule (every hour)."""
+
+from dagster import AssetSelection, ScheduleDefinition, define_asset_job
+
+
+precompute_job = define_asset_job(
+    name="precompute_recommendations",
+    selection=AssetSelection.keys("precomputed_recommendations"),
+)
+
+# Schedule: Every hour, well within the default 24h expiry
+precompute_schedule = ScheduleDefinition(
+    job=precompute_job,
+    cron_schedule="0 * * * *",
+    name="precompute_recommendations_schedule",
+)